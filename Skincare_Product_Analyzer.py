@@ -1,57 +1,95 @@
 import dash
-from dash import dcc, html, Input, Output, State, dash_table
+from dash import dcc, html, Input, Output, State, ALL, Patch, dash_table
 import pandas as pd
+import plotly
 import plotly.express as px
 import plotly.graph_objects as go
 from dash.exceptions import PreventUpdate
 import numpy as np
-import ast 
+import json
+import hashlib
+import os
 import textwrap
+import threading
+import time
+from functools import lru_cache
+from src.catalog_store import (
+    SNAPSHOT_DIR, SKIN_TYPE_COLS, read_snapshot, clean_product_frame,
+    get_ingredient_lists, split_ingredient_ids, build_ingredient_postings, postings_to_index, build_ingredient_details_store
+)
+from src.ingredient_rules import (
+    ALLERGEN_GROUPS, INTERACTION_RULES, build_keyword_matcher, get_keyword_patterns,
+    scan_catalog, build_rule_arrays, build_rule_masks, rules_fingerprint
+)
+from src.filter_engine import build_filter_columns, compute_filter_mask, label_mask
+from src.search_index import split_search_tokens, search_rows
+from src.ingredient_suggest import build_ingredient_suggester, suggest_completions, suggest_corrections, is_known_ingredient
+from src.similarity import build_ingredient_vectors, top_k_similar
+from src.near_duplicates import minhash_signatures, find_duplicate_clusters, NUM_PERM, MINHASH_SEED
+from src.substitutions import build_substitution_graph, get_alternatives, expand_ingredients
+from src.ingredient_stats import ALL_CATEGORIES, count_ingredients, ingredient_frequency_table, top_ingredient_ids
+from src.box_stats import box_plot_stats
+from src.render_cache import build_render_cache, get_cached_render, put_cached_render, get_render_cache_stats
 
 # --- Data Loading ---
+# Prefer the memory-mapped snapshot written by the prep pipeline, so every worker process
+# shares one copy of the numeric columns and index arrays; fall back to the CSV
 try:
-    df_final = pd.read_csv('data/processed/final_products_ingredients.csv', low_memory=False)
-except FileNotFoundError:
-    print("ERROR: 'data/processed/final_products_ingredients.csv' not found. Please ensure the file exists in the 'data' directory.")
-    df_final = pd.DataFrame({
-        'category': pd.Series(dtype='str'),
-        'Brand': pd.Series(dtype='str'),
-        'Name': pd.Series(dtype='str'),
-        'Price': pd.Series(dtype='float'),
-        'Ingredients': pd.Series(dtype='str'),
-        'review_score': pd.Series(dtype='float'),
-        'n_of_loves': pd.Series(dtype='int'),
-        'n_of_reviews': pd.Series(dtype='int'),
-        'paula_ingredient_details': pd.Series(dtype='str'),
-        'Combination': pd.Series(dtype='int'), 
-        'Dry': pd.Series(dtype='int'),
-        'Normal': pd.Series(dtype='int'), 
-        'Oily': pd.Series(dtype='int'),
-        'Sensitive': pd.Series(dtype='int'),
-        'clean_product': pd.Series(dtype='int')
-    })
-
-# Ensure essential columns exist
-essential_cols = ['category', 'Brand', 'Name', 'Price', 'Ingredients', 'review_score', 'n_of_loves', 'n_of_reviews', 'paula_ingredient_details']
-for col in essential_cols:
-    if col not in df_final.columns:
-        df_final[col] = None if col not in ['Price', 'review_score', 'n_of_loves', 'n_of_reviews'] else 0
-
-skin_type_cols = ['Combination', 'Dry', 'Normal', 'Oily', 'Sensitive']
-
-if 'Price' in df_final.columns:
-    df_final['Price'] = pd.to_numeric(df_final['Price'], errors='coerce').fillna(0)
-if 'review_score' in df_final.columns:
-    df_final['review_score'] = pd.to_numeric(df_final['review_score'], errors='coerce').fillna(0)
-if 'n_of_loves' in df_final.columns:
-    df_final['n_of_loves'] = pd.to_numeric(df_final['n_of_loves'], errors='coerce').fillna(0)
-if 'n_of_reviews' in df_final.columns:
-    df_final['n_of_reviews'] = pd.to_numeric(df_final['n_of_reviews'], errors='coerce').fillna(0)
-
-for col in ['review_score', 'n_of_loves', 'n_of_reviews', 'Price']:
-    if col in df_final.columns:
-        df_final[col] = pd.to_numeric(df_final[col], errors='coerce')
-        df_final.loc[df_final[col] == 0, col] = np.nan
+    snapshot = read_snapshot(SNAPSHOT_DIR)
+    df_final = snapshot['products']
+except (FileNotFoundError, ImportError):
+    snapshot = None
+    try:
+        df_final = pd.read_csv('data/processed/final_products_ingredients.csv', low_memory=False)
+    except FileNotFoundError:
+        print("ERROR: 'data/processed/final_products_ingredients.csv' not found. Please ensure the file exists in the 'data' directory.")
+        df_final = pd.DataFrame({
+            'category': pd.Series(dtype='str'),
+            'Brand': pd.Series(dtype='str'),
+            'Name': pd.Series(dtype='str'),
+            'Price': pd.Series(dtype='float'),
+            'Ingredients': pd.Series(dtype='str'),
+            'review_score': pd.Series(dtype='float'),
+            'n_of_loves': pd.Series(dtype='int'),
+            'n_of_reviews': pd.Series(dtype='int'),
+            'paula_ingredient_details': pd.Series(dtype='str'),
+            'Combination': pd.Series(dtype='int'), 
+            'Dry': pd.Series(dtype='int'),
+            'Normal': pd.Series(dtype='int'), 
+            'Oily': pd.Series(dtype='int'),
+            'Sensitive': pd.Series(dtype='int'),
+            'clean_product': pd.Series(dtype='int')
+        })
+    df_final = clean_product_frame(df_final)
+
+skin_type_cols = SKIN_TYPE_COLS
+
+# Number of distinct filter states whose matching rows are kept in memory
+FILTER_CACHE_SIZE = 256
+# Maximum number of products sent to the product search dropdown per response
+SEARCH_RESULT_LIMIT = 50
+# Number of similar products listed by the dupe finder
+SIMILAR_PRODUCTS_LIMIT = 10
+# Number of same-formula groups listed per category, widest price spread first
+PRICE_GROUPS_LIMIT = 25
+# Shorter ingredient lists are scraping placeholders ('no info', 'visit the ... boutique'), not formulas
+MIN_FORMULA_INGREDIENTS = 3
+# Number of ingredients shown in the most common ingredients chart
+TOP_INGREDIENTS_LIMIT = 20
+# Serialized size budget of the per-product ingredient analysis renders kept in memory
+RENDER_CACHE_MAX_BYTES = 64 * 2**20
+# Number of most loved products whose analyses are rendered at startup (0 disables the pre-warm)
+RENDER_PREWARM_PRODUCTS = 0
+# Layout properties of the comparison plots that change with the plotted rows; the rest
+# of each plot type's layout is fixed, so redraws of the same plot type only send these
+DATA_LAYOUT_PROPERTIES = [('title', 'text'), ('height',), ('xaxis', 'title', 'text'), ('xaxis', 'categoryarray'), ('yaxis', 'title', 'text'),
+                          ('legend', 'title', 'text')]
+# Above this many points the price/review scatter is drawn with WebGL instead of SVG markers
+WEBGL_SCATTER_THRESHOLD = 1000
+# Above this many points the scatter is aggregated server-side into a price x review score grid
+DENSITY_SCATTER_THRESHOLD = 20000
+# Number of bins along each axis of the aggregated price x review score grid
+DENSITY_GRID_SIZE = 50
 
 # Use 'category' as the primary category column
 categories = sorted(df_final['category'].dropna().unique()) if 'category' in df_final.columns else []
@@ -81,40 +119,6 @@ allergen_options = [
     {'label': 'Talc', 'value': 'talc_group'},
     {'label': 'BHA/BHT (Preservatives)', 'value': 'bha_bht_group'}
 ]
-ALLERGEN_GROUPS = {
-    'fragrance_parfum': ['fragrance', 'parfum'],
-    'fragrance_components': ['linalool', 'limonene', 'citronellol', 'geraniol', 'citral', 'eugenol', 'coumarin', 'farnesol', 'hexyl cinnamal', 'hydroxycitronellal', 'isoeugenol', 'benzyl alcohol', 'benzyl benzoate', 'benzyl salicylate', 'anisyl alcohol', 'amyl cinnamal', 'cinnamyl alcohol', 'cinnamal', 'alpha-isomethyl ionone', 'methyl 2-octynoate', 'evernia prunastri', 'evernia furfuracea'],
-    'parabens_group': ['paraben', 'methylparaben', 'ethylparaben', 'propylparaben', 'butylparaben', 'isobutylparaben', 'isopropylparaben'],
-    'sulfates_group': ['sodium lauryl sulfate', 'sodium laureth sulfate', 'sls', 'sles', 'ammonium lauryl sulfate', 'ammonium laureth sulfate', 'als', 'ales', 'sodium C14-16 olefin sulfonate'],
-    'drying_alcohols': ['alcohol denat.', 'sd alcohol', 'ethanol', 'isopropyl alcohol', 'alcohol'],
-    'silicones_group': ['dimethicone', 'cyclomethicone', 'cyclopentasiloxane', 'cyclohexasiloxane','dimethiconol', 'phenyl trimethicone', 'amodimethicone', 'cyclotetrasiloxane','cetyl dimethicone', 'dimethicone copolyol', 'stearyl dimethicone', '-siloxane', '-cone'],
-    'chemical_sunscreens_group': ['oxybenzone', 'avobenzone', 'octinoxate', 'ethylhexyl methoxycinnamate', 'octisalate', 'ethylhexyl salicylate', 'homosalate', 'octocrylene', 'benzophenone-3', 'benzophenone-4', 'ensulizole', 'phenylbenzimidazole sulfonic acid', 'ecamsule', 'terephthalylidene dicamphor sulfonic acid', 'drometrizole trisiloxane'],
-    'formaldehyde_releasers_group': ['dmdm hydantoin', 'imidazolidinyl urea', 'diazolidinyl urea', 'quaternium-15', 'bronopol', '2-bromo-2-nitropropane-1,3-diol', '5-bromo-5-nitro-1,3-dioxane','sodium hydroxymethylglycinate', 'methenamine', 'benzylhemiformal'],
-    'mi_mci_group': ['methylisothiazolinone', 'mi', 'mit', 'methylchloroisothiazolinone', 'mci', 'mcit', 'cmIT'],
-    'propylene_glycol_group': ['propylene glycol', 'pg', '1,2-propanediol'],
-    'cocamidopropyl_betaine_group': ['cocamidopropyl betaine', 'capb'],
-    'phenoxyethanol_group': ['phenoxyethanol'],
-    'lanolin_group': ['lanolin', 'lanolin alcohol', 'adeps lanae', 'lanolin cera', 'lanolin oil', 'hydrogenated lanolin', 'wool fat', 'wool wax'],
-    'artificial_colorants_group': ['ci 19140', 'ci 42090', 'ci 16035', 'ci 17200', 'ci 60730', 'ci 15850', 'ci 45410','fd&c yellow no. 5', 'fd&c blue no. 1', 'fd&c red no. 40','d&c red no. 33', 'ext. d&c violet no. 2', 'd&c red no. 6', 'd&c red no. 27','yellow 5', 'blue 1', 'red 40', 'red 33', 'violet 2', 'red 6', 'red 27'],
-    'mineral_oil_petrolatum_group': ['mineral oil', 'paraffinum liquidum', 'liquid paraffin', 'huile minerale','petrolatum', 'white petrolatum', 'petroleum jelly', 'vaseline'],
-    'talc_group': ['talc', 'talcum powder', 'cosmetic talc'],
-    'bha_bht_group': ['bha', 'butylated hydroxyanisole', 'bht', 'butylated hydroxytoluene']
-}
-INTERACTION_RULES = [
-    {'ingredients': ['retinol', 'glycolic acid'], 'warning': 'Interaction: Retinol + Glycolic Acid (AHA).'},
-    {'ingredients': ['retinol', 'salicylic acid'], 'warning': 'Interaction: Retinol + Salicylic Acid (BHA).'},
-    {'ingredients': ['ascorbic acid', 'niacinamide'], 'warning': 'Interaction: Vit C (Ascorbic) + Niacinamide.'},
-    {'ingredients': ['benzoyl peroxide', 'retinol'], 'warning': 'Interaction: Benzoyl Peroxide + Retinol (and other retinoids like tretinoin, adapalene). Can deactivate each other (especially tretinoin) and increase irritation. Some forms of adapalene are stable with BPO. Generally best to alternate (e.g., BPO in AM, Retinol in PM) or use specialized combination products.'},
-    {'ingredients': ['benzoyl peroxide', 'tretinoin'], 'warning': 'Interaction: Benzoyl Peroxide + Tretinoin. High risk of deactivation of tretinoin and increased irritation. Avoid simultaneous use unless specifically formulated together.'},
-    {'ingredients': ['benzoyl peroxide', 'adapalene'], 'warning': 'Interaction: Benzoyl Peroxide + Adapalene. Generally more stable together than BPO + other retinoids, but still potential for irritation. Often formulated together in products like Epiduo.'},
-    {'ingredients': ['ascorbic acid', 'glycolic acid'], 'warning': 'Interaction: Vit C (L-Ascorbic Acid forms) + Glycolic Acid (AHA). Potential for increased irritation, photosensitivity, and compromised skin barrier, especially at high concentrations or low pH. Use with caution, ensure stable formulations, or alternate.'},
-    {'ingredients': ['ascorbic acid', 'lactic acid'], 'warning': 'Interaction: Vit C (L-Ascorbic Acid forms) + Lactic Acid (AHA). Potential for increased irritation, photosensitivity, and compromised skin barrier. Use with caution or alternate.'},
-    {'ingredients': ['ascorbic acid', 'salicylic acid'], 'warning': 'Interaction: Vit C (L-Ascorbic Acid forms) + Salicylic Acid (BHA). Potential for increased irritation and dryness. Use with caution or alternate.'},
-    {'ingredients': ['copper peptides', 'ascorbic acid'], 'warning': 'Interaction: Copper Peptides + Vit C (Direct forms like L-Ascorbic Acid). May oxidize and reduce efficacy of both ingredients. Best to use at different times of day or use Vitamin C derivatives.'},
-    {'ingredients': ['benzoyl peroxide', 'ascorbic acid'], 'warning': 'Interaction: Benzoyl Peroxide + Vit C (L-Ascorbic Acid). Benzoyl peroxide can oxidize L-Ascorbic Acid, reducing its effectiveness. Apply at different times of day.'},
-    {'ingredients': ['retinol', 'ascorbic acid'], 'warning': 'Interaction: Retinol + Vit C (L-Ascorbic Acid). Can increase irritation due to different pH requirements for optimal stability/penetration and combined exfoliant effects. Often recommended to use at different times of day (e.g., Vit C in AM, Retinol in PM).'},
-    {'ingredients': ['alpha hydroxy acid', 'beta hydroxy acid'], 'warning': 'Interaction: AHA (e.g., Glycolic, Lactic) + BHA (Salicylic Acid). Using multiple strong exfoliants together can lead to over-exfoliation, irritation, and damaged skin barrier. Introduce slowly and monitor skin response; often better to alternate.'}
-]
 
 app = dash.Dash(__name__, suppress_callback_exceptions=True)
 
@@ -138,7 +142,17 @@ app.layout = html.Div([
         html.Div([
             html.H3("Search & Select Products", className="content-card-title"),
             html.Label("Ingredients to Exclude:", style={'fontWeight': 400, 'fontSize': '1rem', 'color': '#222', 'marginBottom': '4px'}),
-            dcc.Input(id='base-exclude-ingredients', type='text', style={'width': '100%', 'marginBottom': '10px', 'fontSize': '0.95rem', 'boxSizing': 'border-box', 'padding': '6px'}),
+            dcc.Input(id='base-exclude-ingredients', type='text', style={'width': '100%', 'marginBottom': '4px', 'fontSize': '0.95rem', 'boxSizing': 'border-box', 'padding': '6px'}),
+            html.Div(id='exclude-ingredient-suggestions', style={'marginBottom': '4px', 'fontSize': '0.85rem'}),
+            dcc.Checklist(id='exclude-alternatives-checklist', options=[{'label': ' Also exclude their alternatives', 'value': 1}], value=[], style={'marginBottom': '10px', 'fontSize': '0.9rem'}),
+            html.Label("Allergens to Exclude:", style={'fontWeight': 400, 'fontSize': '0.95rem', 'marginBottom': '4px'}),
+            dcc.Dropdown(
+                id='base-exclude-allergens',
+                options=allergen_options,
+                placeholder="Select allergen groups...",
+                multi=True,
+                style={'width': '100%', 'marginBottom': '10px', 'fontSize': '0.95rem'}
+            ),
             html.Label("Category:", style={'fontWeight': 400, 'fontSize': '0.95rem', 'marginBottom': '4px'}),
             dcc.Dropdown(
                 id='base-category-dropdown',
@@ -159,6 +173,18 @@ app.layout = html.Div([
             dcc.Checklist(id='skin-type-checklist', options=[{'label': st, 'value': st} for st in skin_type_cols], value=[], inline=True, style={'marginBottom': '10px', 'fontSize': '0.95rem'}),
             html.Label("Clean Product:", style={'fontWeight': 400, 'fontSize': '0.95rem', 'marginBottom': '4px'}),
             dcc.Checklist(id='clean-product-checklist', options=[{'label': 'Yes', 'value': 1}], value=[], style={'marginBottom': '10px', 'fontSize': '0.95rem'}),
+            html.Label("Interaction Conflicts:", style={'fontWeight': 400, 'fontSize': '0.95rem', 'marginBottom': '4px'}),
+            dcc.RadioItems(
+                id='interaction-conflict-filter',
+                options=[
+                    {'label': 'Show all', 'value': 'all'},
+                    {'label': 'Only conflicts', 'value': 'only'},
+                    {'label': 'Exclude conflicts', 'value': 'exclude'}
+                ],
+                value='all',
+                inline=True,
+                style={'marginBottom': '10px', 'fontSize': '0.95rem'}
+            ),
             html.Button('Apply Filters', id='btn-initial-search', n_clicks=0, style={'marginBottom': '18px', 'padding': '6px 12px', 'fontSize': '0.95rem'}),
             html.Label("Select Product(s):", style={'fontWeight': 400, 'fontSize': '0.95rem', 'marginBottom': '4px'}),
             dcc.Dropdown(id='product-search-dropdown-single', options=[],multi=True, placeholder="Type to search for a product...", searchable=True, style={'marginBottom': '10px', 'fontSize': '0.95rem'})
@@ -169,7 +195,9 @@ app.layout = html.Div([
                 value='reviews-price-tab',
                 children=[
                     dcc.Tab(label='Compare Price & Reviews', value='reviews-price-tab', className='custom-tab', selected_className='custom-tab--selected'),
-                    dcc.Tab(label='In-Depth Ingredient Analysis', value='ingredient-analysis-tab', className='custom-tab', selected_className='custom-tab--selected')
+                    dcc.Tab(label='In-Depth Ingredient Analysis', value='ingredient-analysis-tab', className='custom-tab', selected_className='custom-tab--selected'),
+                    dcc.Tab(label='Routine Conflict Checker', value='routine-tab', className='custom-tab', selected_className='custom-tab--selected'),
+                    dcc.Tab(label='Same Formula, Different Price', value='duplicates-tab', className='custom-tab', selected_className='custom-tab--selected')
                 ], 
                 className="custom-tabs-container", 
                 style={'marginBottom': '0'}
@@ -179,226 +207,561 @@ app.layout = html.Div([
     ], style={'display': 'flex','columnGap': '32px'})
 ])
 # --- Helper Functions ---
-def split_ingredients(ingredients_str):
+
+def rows_containing_all(ingredient_list):
     """
-    Split a semicolon-separated ingredients string into a list of individual ingredients.
-    
+    Look up the rows that contain every one of the given ingredients.
+
     Args:
-        ingredients_str (str): String containing ingredients separated by semicolons
-        
+        ingredient_list (list): Normalized (stripped, lowercase) ingredient names
+
     Returns:
-        list: List of individual ingredients, stripped and converted to lowercase
+        ndarray: Sorted array of row positions
     """
-    if pd.isna(ingredients_str) or not str(ingredients_str).strip(): return []
-    return [ing.strip().lower() for ing in str(ingredients_str).split(';') if ing.strip()]
+    if not ingredient_list or any(ing not in ingredient_index for ing in ingredient_list):
+        return np.empty(0, dtype=np.int32)
+    postings = sorted((ingredient_index[ing] for ing in ingredient_list), key=len)
+    result = postings[0]
+    for ing_rows in postings[1:]:
+        result = np.intersect1d(result, ing_rows, assume_unique=True)
+    return result
 
-def parse_paula_details(details_val):
+def find_interaction_conflicts(product_masks):
     """
-    Parse Paula's Choice ingredient details from string or list format into a list of dictionaries.
-    
+    Evaluate every interaction rule against a batch of product masks at once.
+
     Args:
-        details_val (str/list): String representation of list or actual list of ingredient details
-        
+        product_masks (ndarray): uint64 ingredient masks, one per product
+
     Returns:
-        list: List of dictionaries containing ingredient information
+        ndarray: Bool matrix of shape (len(product_masks), len(INTERACTION_RULES)),
+                 True where all of a rule's ingredients are present
     """
-    if isinstance(details_val, list):
-        if all(isinstance(item, dict) for item in details_val):
-            return details_val
-        else:
-            return []
-    if isinstance(details_val, str):
-        try:
-            parsed = ast.literal_eval(details_val)
-            if isinstance(parsed, list) and all(isinstance(item, dict) for item in parsed):
-                return parsed
-        except Exception:
-            pass
-    return []
-
-def get_product_warnings(product_ingredients_set, selected_allergens_groups_keys):
-    """
-    Generate warnings for a product based on its ingredients and selected allergen groups.
-    
+    product_masks = np.asarray(product_masks, dtype=np.uint64)
+    return (product_masks[:, None] & interaction_rule_masks[None, :]) == interaction_rule_masks[None, :]
+
+def get_interaction_hits(row_pos):
+    """
+    Look up the interaction rules that fire for a product.
+
     Args:
-        product_ingredients_set (set): Set of ingredients in the product
-        selected_allergens_groups_keys (list): List of allergen group keys to check
-        
+        row_pos (int): Row position of the product in df_final
+
     Returns:
-        list: List of warning messages for allergens and ingredient interactions
+        list: Rules from INTERACTION_RULES whose ingredients are all in the product
     """
-    warnings = []
-    
-    # Check for allergens in selected groups
-    for allergen_key in selected_allergens_groups_keys: 
-        if allergen_key in ALLERGEN_GROUPS:
-            keywords = ALLERGEN_GROUPS[allergen_key]
-            found = False
-
-            # Check ingredients against allergen keywords
-            if allergen_key == 'parabens_group':
-                if any(any(k in ing for k in keywords) for ing in product_ingredients_set):
-                    found = True
-            elif allergen_key == 'silicones_group':
-                if any(any(k in ing for k in keywords) for ing in product_ingredients_set):
-                    found = True
-            elif allergen_key == 'drying_alcohols':
-                if any(alc_keyword in product_ingredients_set for alc_keyword in keywords):
-                    found = True
-            elif allergen_key == 'chemical_sunscreens_group':
-                if any(any(k in ing for k in keywords) for ing in product_ingredients_set):
-                    found = True
-            elif allergen_key == 'formaldehyde_releasers_group':
-                if any(any(k in ing for k in keywords) for ing in product_ingredients_set):
-                    found = True
-            elif allergen_key == 'mi_mci_group':
-                if any(any(k in ing for k in keywords) for ing in product_ingredients_set):
-                    found = True
-            elif allergen_key == 'propylene_glycol_group':
-                if any(any(k in ing for k in keywords) for ing in product_ingredients_set):
-                    found = True    
-            elif allergen_key == 'cocamidopropyl_betaine_group':
-                if any(any(k in ing for k in keywords) for ing in product_ingredients_set):
-                    found = True
-            elif allergen_key == 'phenoxyethanol_group':
-                if any(any(k in ing for k in keywords) for ing in product_ingredients_set):
-                    found = True
-            elif allergen_key == 'lanolin_group':
-                if any(any(k in ing for k in keywords) for ing in product_ingredients_set):
-                    found = True
-            elif allergen_key == 'artificial_colorants_group':
-                if any(any(k in ing for k in keywords) for ing in product_ingredients_set):
-                    found = True
-            elif allergen_key == 'mineral_oil_petrolatum_group':
-                if any(any(k in ing for k in keywords) for ing in product_ingredients_set):
-                    found = True
-            elif allergen_key == 'talc_group':
-                if any(any(k in ing for k in keywords) for ing in product_ingredients_set):
-                    found = True
-            elif allergen_key == 'bha_bht_group':
-                if any(any(k in ing for k in keywords) for ing in product_ingredients_set):
-                    found = True
-            else:
-                for ing in product_ingredients_set:
-                    if any(keyword in ing for keyword in keywords):
-                        found = True
-                        break
-
-            if found:
-                label = allergen_key.replace('_', ' ').title()
-                for opt in allergen_options:
-                    if opt['value'] == allergen_key:
-                        label = opt['label']
-                        break
-                warnings.append(f"Contains: {label.split(' (')[0]}")
-
-    # Check for ingredient interactions
-    for rule in INTERACTION_RULES:
-        rule_ingredients_found = []
-        for rule_ing in rule['ingredients']:
-            if any(rule_ing.lower() in ing.lower() for ing in product_ingredients_set):
-                rule_ingredients_found.append(rule_ing)
-        
-        if len(rule_ingredients_found) == len(rule['ingredients']):
-            warnings.append(html.Div([
-                html.Div([
-                    html.I(className="fas fa-exclamation-circle", style={'marginRight': '8px', 'color': '#721c24'}),
-                    html.Strong("Interaction Warning", style={'color': '#721c24'})
-                ], style={'display': 'flex', 'alignItems': 'center', 'marginBottom': '4px'}),
-                html.Div(rule['warning'], style={'fontSize': '0.9em', 'color': '#666'})
-            ], style={
-                'backgroundColor': '#f8d7da',
-                'border': '1px solid #f5c6cb',
-                'borderRadius': '4px',
-                'padding': '12px',
-                'marginBottom': '8px'
-            }))
-            
-    return warnings
+    fired = find_interaction_conflicts(product_interaction_masks[row_pos:row_pos + 1])[0]
+    return [rule for rule, hit in zip(INTERACTION_RULES, fired) if hit]
 
-def get_filtered_df(exclude_ings_str, category_vals, brand_vals, skin_types, clean_product_flag):
+def get_rule_label(rule):
     """
-    Filter the product dataframe based on user-selected criteria.
-    
+    Get the short display label for an interaction rule.
+
+    Args:
+        rule (dict): Rule from INTERACTION_RULES
+
+    Returns:
+        str: First sentence of the rule warning without the 'Interaction: ' prefix
+    """
+    return rule['warning'].split('. ')[0].rstrip('.').replace('Interaction: ', '')
+
+def build_routine_conflict_matrix(row_positions):
+    """
+    Compute the pairwise product x product interaction matrix for a routine.
+
+    Off-diagonal cells hold the rules that only fire when the two products are used
+    together; diagonal cells hold the rules that already fire within a single product.
+
+    Args:
+        row_positions (list): Row positions of the routine's products in df_final
+
+    Returns:
+        ndarray: Bool array of shape (k, k, len(INTERACTION_RULES))
+    """
+    masks = product_interaction_masks[np.asarray(row_positions, dtype=np.intp)]
+    own_fired = find_interaction_conflicts(masks)
+    pair_masks = (masks[:, None] | masks[None, :]).ravel()
+    pair_fired = find_interaction_conflicts(pair_masks).reshape(len(masks), len(masks), -1)
+    cross_fired = pair_fired & ~own_fired[:, None, :] & ~own_fired[None, :, :]
+    diagonal = np.arange(len(masks))
+    cross_fired[diagonal, diagonal] = own_fired
+    return cross_fired
+
+def find_routine_conflicts_in_catalog(row_positions):
+    """
+    Find every catalog product that would add a new interaction conflict to a routine.
+
+    Args:
+        row_positions (list): Row positions of the routine's products in df_final
+
+    Returns:
+        ndarray: Bool array of shape (len(df_final), len(INTERACTION_RULES)), True where
+                 a rule fires for routine + product but not for either on its own
+    """
+    routine_mask = np.bitwise_or.reduce(product_interaction_masks[np.asarray(row_positions, dtype=np.intp)], initial=np.uint64(0))
+    routine_fired = find_interaction_conflicts(np.array([routine_mask], dtype=np.uint64))[0]
+    combined_fired = find_interaction_conflicts(product_interaction_masks | routine_mask)
+    own_fired = find_interaction_conflicts(product_interaction_masks)
+    return combined_fired & ~own_fired & ~routine_fired[None, :]
+
+def get_matched_keywords(row_pos, keywords):
+    """
+    List the keywords whose catalog scan matched a given product.
+
+    Args:
+        row_pos (int): Row position of the product in df_final
+        keywords (list): Keywords to check, e.g. one allergen group
+
+    Returns:
+        list: The keywords, in the given order, that occur in the product's ingredients
+    """
+    matched = []
+    for keyword in keywords:
+        kw_rows = keyword_rows.get(keyword)
+        if kw_rows is not None:
+            pos = np.searchsorted(kw_rows, row_pos)
+            if pos < len(kw_rows) and kw_rows[pos] == row_pos:
+                matched.append(keyword)
+    return matched
+
+def get_product_ingredients(row_pos):
+    """
+    Get a product's normalized ingredient list from the ingredient id arrays.
+
+    Args:
+        row_pos (int): Row position of the product in df_final
+
+    Returns:
+        list: Ingredients in label order, as split_ingredients would return them
+    """
+    return ingredient_vocabulary[ingredient_ids[ingredient_offsets[row_pos]:ingredient_offsets[row_pos + 1]]].tolist()
+
+def find_similar_products(row_pos, k, cheaper_only=False):
+    """
+    Find the products with the most similar ingredient lists to a product.
+
+    Uses the precomputed neighbour table when it covers the request, otherwise scores
+    the whole catalog with one sparse matrix-vector product.
+
+    Args:
+        row_pos (int): Row position of the product in df_final
+        k (int): Number of similar products to return
+        cheaper_only (bool): Only return products with a lower Price
+
+    Returns:
+        tuple: (row positions, cosine similarities), most similar first
+    """
+    names = df_final['Name'].to_numpy()
+    if neighbor_ids is not None and not cheaper_only and k <= neighbor_ids.shape[1]:
+        rows, scores = neighbor_ids[row_pos], neighbor_scores[row_pos]
+        keep = (rows >= 0) & (names[np.maximum(rows, 0)] != names[row_pos])
+        if keep.sum() >= k or (rows < 0).any():
+            return rows[keep][:k].astype(np.int64), scores[keep][:k]
+    # Other rows of the same product are not dupes of it
+    candidate_mask = names != names[row_pos]
+    if cheaper_only:
+        prices = df_final['Price'].to_numpy()
+        candidate_mask &= prices < prices[row_pos]
+    return top_k_similar(ingredient_vectors, row_pos, k, candidate_mask)
+
+@lru_cache(maxsize=None)
+def find_price_spread_groups(category, limit=PRICE_GROUPS_LIMIT):
+    """
+    Find groups of near-identical formulas in a category that sell at different prices.
+
+    Args:
+        category (str): Product category
+        limit (int): Maximum number of groups to return
+
+    Returns:
+        DataFrame: One row per product with 'Group' (1 = widest price spread), 'Name',
+                   'Brand', 'Price' and 'Above Cheapest', cheapest product first within a group
+    """
+    prices = df_final['Price'].to_numpy(dtype=np.float64)
+    in_category = label_mask(filter_columns['category_codes'], filter_columns['category_lookup'], [category])
+    rows = np.flatnonzero(in_category & (duplicate_labels >= 0) & ~np.isnan(prices))
+    # Repeated rows of the same product are not a second product with the same formula
+    members = pd.DataFrame({
+        'cluster': duplicate_labels[rows],
+        'Name': df_final['Name'].to_numpy()[rows],
+        'Brand': df_final['Brand'].to_numpy()[rows],
+        'Price': prices[rows]
+    }).drop_duplicates(['cluster', 'Name', 'Brand'])
+    price_stats = members.groupby('cluster')['Price'].agg(['size', 'min', 'max'])
+    price_stats = price_stats[(price_stats['size'] > 1) & (price_stats['max'] > price_stats['min'])]
+    spread = (price_stats['max'] - price_stats['min']).sort_values(ascending=False, kind='stable').head(limit)
+    group_rank = pd.Series(np.arange(1, len(spread) + 1), index=spread.index)
+
+    members = members[members['cluster'].isin(group_rank.index)].copy()
+    members['Group'] = members['cluster'].map(group_rank)
+    members['Above Cheapest'] = members['Price'] - members['cluster'].map(price_stats['min'])
+    members = members.sort_values(['Group', 'Price', 'Name'], kind='stable')
+    return members[['Group', 'Name', 'Brand', 'Price', 'Above Cheapest']].reset_index(drop=True)
+
+def get_allergen_hits(row_pos, allergen_keys=None):
+    """
+    Look up the allergen groups found in a product from the precomputed allergen matrix.
+
+    Args:
+        row_pos (int): Row position of the product in df_final
+        allergen_keys (list): Allergen group keys to check (all groups if None)
+
+    Returns:
+        list: (allergen_key, matched keywords) tuples in ALLERGEN_GROUPS order
+    """
+    keys = allergen_group_keys if allergen_keys is None else [k for k in allergen_group_keys if k in allergen_keys]
+    row = allergen_matrix[row_pos]
+    return [(key, get_matched_keywords(row_pos, ALLERGEN_GROUPS[key])) for key in keys if row[allergen_group_positions[key]]]
+
+def get_allergen_label(allergen_key):
+    """
+    Get the short display label for an allergen group.
+
+    Args:
+        allergen_key (str): Allergen group key
+
+    Returns:
+        str: Label from allergen_options without its parenthesised detail
+    """
+    label = next((opt['label'] for opt in allergen_options if opt['value'] == allergen_key), allergen_key)
+    return label.split(' (')[0]
+
+def get_product_detail_ids(row_pos):
+    """
+    Look up the ingredient-details ids of a product.
+
+    Args:
+        row_pos (int): Row position of the product in df_final
+
+    Returns:
+        ndarray: Ids into ingredient_details_table, in ingredient-list order
+    """
+    return product_detail_ids[product_detail_offsets[row_pos]:product_detail_offsets[row_pos + 1]]
+
+def get_filter_key(exclude_ings_str, category_vals, brand_vals, skin_types, clean_product_flag, exclude_allergen_groups=None, interaction_conflict_mode=None, expand_alternatives=False):
+    """
+    Canonicalize filter selections so equivalent filter states share one cache entry.
+
     Args:
         exclude_ings_str (str): Comma-separated string of ingredients to exclude
         category_vals (list): List of selected categories
         brand_vals (list): List of selected brands
         skin_types (list): List of selected skin types
         clean_product_flag (bool): Whether to show only clean products
-        
+        exclude_allergen_groups (list): Allergen group keys whose products should be excluded
+        interaction_conflict_mode (str): 'only' to keep or 'exclude' to drop products with interaction conflicts
+        expand_alternatives (bool): Whether to also exclude the known substitutes of each excluded ingredient
+
     Returns:
-        DataFrame: Filtered dataframe matching the criteria
+        tuple: Hashable key of sorted, de-duplicated selections (ingredients lowercased)
     """
-    filtered_df = df_final.copy()
-    
-    # Filter by excluded ingredients
-    if exclude_ings_str:
-        exclude_list = [ing.strip().lower() for ing in exclude_ings_str.split(',') if ing.strip()]
-        if exclude_list:
-            def check_excluded(ingredients_text):
-                if pd.isna(ingredients_text): return True
-                product_ings = split_ingredients(ingredients_text)
-                return not any(excluded_ing in product_ings for excluded_ing in exclude_list)
-            filtered_df = filtered_df[filtered_df['Ingredients'].apply(check_excluded)]
-    
-    # Filter by category
-    if category_vals:
-        filtered_df = filtered_df[filtered_df['category'].isin(category_vals)]
-    
-    # Filter by brand
-    if brand_vals:
-        filtered_df = filtered_df[filtered_df['Brand'].isin(brand_vals)]
-    
-    # Filter by skin type
-    if skin_types:
-        filtered_df = filtered_df[filtered_df[skin_types].any(axis=1)]
-    
-    # Filter by clean product status
-    if clean_product_flag:
-        if 'Clean_Product_Boolean' in filtered_df.columns:
-            filtered_df = filtered_df[filtered_df['Clean_Product_Boolean'] == 1]
-            
-    return filtered_df
+    exclude_list = [ing.strip().lower() for ing in exclude_ings_str.split(',') if ing.strip()] if exclude_ings_str else []
+    if expand_alternatives:
+        exclude_list = expand_ingredients(substitution_graph, exclude_list)
+    return (
+        tuple(sorted(set(exclude_list))),
+        tuple(sorted(set(category_vals or []))),
+        tuple(sorted(set(brand_vals or []))),
+        tuple(sorted(set(skin_types or []))),
+        bool(clean_product_flag),
+        tuple(sorted(key for key in set(exclude_allergen_groups or []) if key in allergen_group_positions)),
+        interaction_conflict_mode if interaction_conflict_mode in ('only', 'exclude') else None
+    )
+
+@lru_cache(maxsize=FILTER_CACHE_SIZE)
+def get_filtered_rows(filter_key):
+    """
+    Compute the row positions matching a canonical filter key (memoized, LRU-bounded).
+
+    Args:
+        filter_key (tuple): Key from get_filter_key
+
+    Returns:
+        ndarray: Read-only array of matching row positions in df_final
+    """
+    row_positions = np.flatnonzero(compute_filter_mask(filter_columns, filter_key))
+    row_positions.flags.writeable = False
+    return row_positions
+
+@lru_cache(maxsize=FILTER_CACHE_SIZE)
+def get_top_ingredients(filter_key, limit=TOP_INGREDIENTS_LIMIT):
+    """
+    Find the most common ingredients among the products matching a filter key (memoized).
+
+    Keys that only filter by category are answered from the precomputed per-category
+    frequencies; any other filter counts the matching rows' ingredients.
+
+    Args:
+        filter_key (tuple): Key from get_filter_key
+        limit (int): Maximum number of ingredients to return
+
+    Returns:
+        tuple: (list of ingredient names, ndarray of products listing each, number of products)
+    """
+    exclude_list, category_vals, brand_vals, skin_types, clean_product_flag, exclude_allergen_groups, interaction_conflict_mode = filter_key
+    category_only = not (exclude_list or brand_vals or skin_types or clean_product_flag or exclude_allergen_groups or interaction_conflict_mode)
+    if category_only and all(cat in frequency_group_positions for cat in category_vals):
+        groups = [frequency_group_positions[cat] for cat in category_vals] or [frequency_group_positions[ALL_CATEGORIES]]
+        document_frequency = category_document_frequency[groups].sum(axis=0)
+        num_products = int(frequency_group_sizes[groups].sum())
+    else:
+        row_positions = get_filtered_rows(filter_key)
+        _, document_frequency = count_ingredients(ingredient_offsets, ingredient_ids, len(ingredient_vocabulary), row_positions)
+        num_products = len(row_positions)
+    top_ids = top_ingredient_ids(document_frequency, limit)
+    return ingredient_vocabulary[top_ids].tolist(), document_frequency[top_ids], num_products
+
+def compute_price_box_stats(row_positions, group_by):
+    """
+    Compute per-group price quartiles, whiskers and outliers for the given rows.
+
+    Args:
+        row_positions (ndarray): Row positions in df_final
+        group_by (str): Grouping column ('category' or 'Brand')
+
+    Returns:
+        tuple: (DataFrame of box statistics per group from box_plot_stats,
+                ndarray of the row positions of the price outliers)
+    """
+    stats, outlier_positions = box_plot_stats(df_final[group_by].to_numpy()[row_positions],
+                                              df_final['Price'].to_numpy(dtype=np.float64)[row_positions])
+    return stats, row_positions[outlier_positions]
+
+@lru_cache(maxsize=FILTER_CACHE_SIZE)
+def get_price_box_stats(filter_key, group_by):
+    """
+    Compute the price box statistics of the rows matching a filter key (memoized).
+
+    Args:
+        filter_key (tuple): Key from get_filter_key
+        group_by (str): Grouping column ('category' or 'Brand')
+
+    Returns:
+        tuple: Result of compute_price_box_stats
+    """
+    return compute_price_box_stats(get_filtered_rows(filter_key), group_by)
+
+def select_rows(row_positions, columns=None):
+    """
+    Materialize the given catalog rows, optionally restricted to the columns a caller needs.
+
+    Args:
+        row_positions (ndarray): Row positions in df_final
+        columns (list): Column names to include (all columns if None)
+
+    Returns:
+        DataFrame: The selected rows of df_final
+    """
+    if columns is None:
+        return df_final.iloc[row_positions]
+    return df_final.iloc[row_positions, df_final.columns.get_indexer(columns)]
+
+def get_filter_cache_stats():
+    """
+    Report hit/miss statistics of the filter result cache.
+
+    Returns:
+        dict: hits, misses, hit_rate, size and maxsize of the cache
+    """
+    info = get_filtered_rows.cache_info()
+    lookups = info.hits + info.misses
+    return {
+        'hits': info.hits,
+        'misses': info.misses,
+        'hit_rate': info.hits / lookups if lookups else 0.0,
+        'size': info.currsize,
+        'maxsize': info.maxsize
+    }
+
+
+# --- Precomputed Indexes ---
+# Built once at startup so ingredient filters become set operations instead of re-parsing every row
+if snapshot is not None:
+    ingredient_vocabulary, ingredient_offsets, ingredient_ids = snapshot['ingredient_vocabulary'], snapshot['ingredient_offsets'], snapshot['ingredient_ids']
+    posting_offsets, posting_rows = snapshot['posting_offsets'], snapshot['posting_rows']
+else:
+    ingredient_vocabulary, ingredient_offsets, ingredient_ids = split_ingredient_ids(get_ingredient_lists(df_final))
+    posting_offsets, posting_rows = build_ingredient_postings(ingredient_offsets, ingredient_ids, len(ingredient_vocabulary))
+ingredient_index = postings_to_index(ingredient_vocabulary, posting_offsets, posting_rows)
+allergen_group_keys = list(ALLERGEN_GROUPS)
+allergen_group_positions = {key: pos for pos, key in enumerate(allergen_group_keys)}
+keyword_matcher = build_keyword_matcher(get_keyword_patterns())
+keyword_rows = scan_catalog(ingredient_index, keyword_matcher)
+# Reuse the snapshot's mapped rule arrays unless the rules changed since it was written
+if snapshot is not None and snapshot['rules_fingerprint'] == rules_fingerprint():
+    rule_arrays = snapshot['rule_arrays']
+else:
+    rule_arrays = build_rule_arrays(keyword_rows, len(df_final))
+allergen_matrix = rule_arrays['allergen_matrix']
+product_interaction_masks = rule_arrays['interaction_masks']
+interaction_rule_masks = build_rule_masks()
+product_has_conflict = find_interaction_conflicts(product_interaction_masks).any(axis=1)
+filter_columns = build_filter_columns(df_final, ingredient_index, allergen_matrix, allergen_group_positions, product_has_conflict, skin_type_cols)
+product_row_by_name = {}
+for pos, name in enumerate(df_final['Name']):
+    product_row_by_name.setdefault(name, pos)
+
+# Paula's Choice details are parsed once into a shared per-ingredient table
+if snapshot is not None:
+    ingredient_details_table, product_detail_offsets, product_detail_ids = snapshot['ingredient_details'], snapshot['detail_offsets'], snapshot['detail_ids']
+else:
+    ingredient_details_table, product_detail_offsets, product_detail_ids = build_ingredient_details_store(df_final['paula_ingredient_details'])
+ingredient_detail_records = ingredient_details_table.drop(columns='categories').to_dict('records')
+
+# Rendered details tables and sunbursts per product. The key includes a hash of the data
+# they are built from, so renders never outlive the data they show.
+render_cache = build_render_cache(RENDER_CACHE_MAX_BYTES)
+render_data_version = hashlib.sha256(b''.join([
+    np.ascontiguousarray(product_detail_offsets).tobytes(),
+    np.ascontiguousarray(product_detail_ids).tobytes(),
+    np.ascontiguousarray(ingredient_offsets).tobytes(),
+    np.ascontiguousarray(ingredient_ids).tobytes(),
+    '\n'.join(ingredient_vocabulary).encode('utf-8'),
+    pd.util.hash_pandas_object(df_final['Name'], index=False).to_numpy().tobytes(),
+    json.dumps([ingredient_detail_records, ingredient_details_table['categories'].map(list).tolist()], default=str).encode('utf-8')
+])).hexdigest()[:16]
+
+# Autocomplete and "did you mean" index over the ingredient vocabulary, ranked by product count.
+# Names containing commas are left out since the exclude input is comma-separated.
+suggestable = np.array([',' not in ing for ing in ingredient_vocabulary], dtype=bool)
+ingredient_suggester = build_ingredient_suggester(ingredient_vocabulary[suggestable], np.diff(posting_offsets)[suggestable])
+
+# Position-weighted ingredient vectors for the dupe finder; the prep pipeline may also
+# provide a precomputed top-k neighbour table
+ingredient_vectors = build_ingredient_vectors(ingredient_offsets, ingredient_ids, len(ingredient_vocabulary))
+if snapshot is not None and snapshot['neighbor_ids'] is not None:
+    neighbor_ids, neighbor_scores = snapshot['neighbor_ids'], snapshot['neighbor_scores']
+else:
+    neighbor_ids = neighbor_scores = None
+
+# MinHash signatures and banded LSH clusters of near-identical ingredient lists, for the
+# same formula, different price tab
+if snapshot is not None and snapshot['minhash_params'] == {'num_perm': NUM_PERM, 'seed': MINHASH_SEED}:
+    ingredient_signatures = snapshot['minhash_signatures']
+else:
+    ingredient_signatures = minhash_signatures(ingredient_offsets, ingredient_ids, len(ingredient_vocabulary))
+duplicate_labels = find_duplicate_clusters(ingredient_signatures, valid_mask=np.diff(ingredient_offsets) >= MIN_FORMULA_INGREDIENTS)
+
+# Catalog-wide and per-category ingredient document frequencies, one row per group, so
+# category-only filters never rescan the ingredient lists
+if snapshot is not None and snapshot['ingredient_frequencies'] is not None:
+    ingredient_frequencies = snapshot['ingredient_frequencies']
+else:
+    ingredient_frequencies = ingredient_frequency_table(ingredient_vocabulary, ingredient_offsets, ingredient_ids, df_final['category'])
+frequency_group_names = pd.Index(pd.unique(ingredient_frequencies['category'])).union([ALL_CATEGORIES], sort=False)
+frequency_group_positions = {name: pos for pos, name in enumerate(frequency_group_names)}
+frequency_groups = frequency_group_names.get_indexer(ingredient_frequencies['category'])
+category_document_frequency = np.zeros((len(frequency_group_names), len(ingredient_vocabulary)), dtype=np.int64)
+category_document_frequency[frequency_groups, ingredient_frequencies['ingredient_id'].to_numpy()] = ingredient_frequencies['document_frequency'].to_numpy()
+frequency_group_sizes = np.zeros(len(frequency_group_names), dtype=np.int64)
+frequency_group_sizes[frequency_groups] = ingredient_frequencies['num_products'].to_numpy()
+frequency_group_sizes[frequency_group_positions[ALL_CATEGORIES]] = len(df_final)
+
+# Ingredient substitution pairs (component1 can be replaced by component2), with every
+# ingredient's related substitutes precomputed so exclusion expansion is one lookup
+try:
+    substitution_pairs = pd.read_csv('data/raw/pre_alternatives.csv')
+except FileNotFoundError:
+    print("WARNING: 'data/raw/pre_alternatives.csv' not found. Ingredient swaps are disabled.")
+    substitution_pairs = pd.DataFrame({'component1': pd.Series(dtype='str'), 'component2': pd.Series(dtype='str')})
+substitution_graph = build_substitution_graph(substitution_pairs['component1'], substitution_pairs['component2'])
+
+# Token index over Name and Brand for server-side product search, ranked by n_of_loves
+search_tokens, search_token_offsets, search_token_ids = split_search_tokens(df_final['Name'], df_final['Brand'])
+search_posting_offsets, search_posting_rows = build_ingredient_postings(search_token_offsets, search_token_ids, len(search_tokens))
+search_index = {'tokens': search_tokens, 'posting_offsets': search_posting_offsets, 'posting_rows': search_posting_rows}
+search_scores = df_final['n_of_loves'].to_numpy(dtype=np.float64)
+searchable_mask = df_final['review_score'].notna().to_numpy() & df_final['n_of_loves'].notna().to_numpy()
+ia_product_options = [
+    {'label': f"{df_final['Name'].iat[pos]} ({df_final['Brand'].iat[pos]})", 'value': df_final['Name'].iat[pos]}
+    for pos in np.flatnonzero(np.diff(product_detail_offsets) > 0)
+]
 
 # --- Callback Functions ---
+def build_product_options(row_positions, selected_names=None):
+    """
+    Build dropdown options for the given rows, keeping already-selected products listed.
+
+    Args:
+        row_positions (ndarray): Row positions in df_final, in display order
+        selected_names (list): Currently selected product names
+
+    Returns:
+        list: Dropdown options with 'label' ("Name (Brand)") and 'value' (Name)
+    """
+    options = []
+    seen = set()
+    selected_names = selected_names or []
+    selected_rows = [product_row_by_name[name] for name in selected_names if name in product_row_by_name]
+    for pos in list(selected_rows) + list(row_positions):
+        name = df_final['Name'].iat[pos]
+        if name in seen:
+            continue
+        seen.add(name)
+        options.append({'label': f"{name} ({df_final['Brand'].iat[pos]})", 'value': name})
+    return options
+
 @app.callback(
     [Output('product-search-dropdown-single', 'options'),
      Output('product-search-dropdown-single', 'value')],
-    Input('btn-initial-search', 'n_clicks'),
+    [Input('btn-initial-search', 'n_clicks'),
+     Input('product-search-dropdown-single', 'search_value')],
     [State('base-exclude-ingredients', 'value'),
      State('base-category-dropdown', 'value'),
      State('base-brand-dropdown', 'value'),
      State('skin-type-checklist', 'value'),
-     State('clean-product-checklist', 'value')],
+     State('clean-product-checklist', 'value'),
+     State('base-exclude-allergens', 'value'),
+     State('interaction-conflict-filter', 'value'),
+     State('exclude-alternatives-checklist', 'value'),
+     State('product-search-dropdown-single', 'value')],
     prevent_initial_call=True
 )
-def update_product_dropdown_options(n_clicks, exclude_ings_str, category_vals, brand_vals, skin_types, clean_product_flag_list):
+def update_product_dropdown_options(n_clicks, search_value, exclude_ings_str, category_vals, brand_vals, skin_types, clean_product_flag_list, exclude_allergen_groups, interaction_conflict_mode, exclude_alternatives_list, selected_products):
     """
-    Update the product dropdown options based on filter selections.
+    Update the product dropdown options based on filter selections and the typed search text.
+    
+    Only the top SEARCH_RESULT_LIMIT matches by n_of_loves are sent to the browser, so
+    the payload stays the same size however large the catalog is.
     
     Args:
         n_clicks (int): Number of times the search button has been clicked
+        search_value (str): Text typed into the product dropdown
         exclude_ings_str (str): Ingredients to exclude
         category_vals (list): Selected categories
         brand_vals (list): Selected brands
         skin_types (list): Selected skin types
         clean_product_flag_list (list): Clean product filter selection
+        exclude_allergen_groups (list): Allergen groups to exclude
+        interaction_conflict_mode (str): Interaction conflict filter ('all', 'only' or 'exclude')
+        exclude_alternatives_list (list): Selection of the exclude-alternatives option
+        selected_products (list): Currently selected products
         
     Returns:
         tuple: (dropdown options, selected value)
     """
-    if n_clicks == 0 or df_final.empty:
+    if df_final.empty:
         raise PreventUpdate
+    
+    triggered = dash.ctx.triggered_id
+    if triggered == 'btn-initial-search':
+        if not n_clicks:
+            raise PreventUpdate
+        # A new search clears the selection and shows the most loved matching products
+        search_value, selected_products, new_value = None, [], []
+    else:
+        new_value = dash.no_update
+        if isinstance(selected_products, str):
+            selected_products = [selected_products]
         
     clean_flag_bool = True if clean_product_flag_list and 1 in clean_product_flag_list else False
-    filtered_df = get_filtered_df(exclude_ings_str, category_vals, brand_vals, skin_types, clean_flag_bool)
+    expand_alternatives = bool(exclude_alternatives_list and 1 in exclude_alternatives_list)
+    filter_key = get_filter_key(exclude_ings_str, category_vals, brand_vals, skin_types, clean_flag_bool, exclude_allergen_groups, interaction_conflict_mode, expand_alternatives)
+    row_positions = get_filtered_rows(filter_key)
+    row_positions = row_positions[searchable_mask[row_positions]]
     
-    if 'review_score' in filtered_df.columns and 'n_of_loves' in filtered_df.columns:
-        filtered_df = filtered_df[filtered_df['review_score'].notna() & filtered_df['n_of_loves'].notna()]
-    
-    options = [{'label': f"{row['Name']} ({row['Brand']})", 'value': row['Name']} for _, row in filtered_df.iterrows()]
-    return options, []
+    top_rows = search_rows(search_index, search_value, row_positions, search_scores, SEARCH_RESULT_LIMIT)
+    return build_product_options(top_rows, selected_products), new_value
 
 # --- Callbacks ---
 
@@ -431,36 +794,24 @@ def apply_initial_filters(n_clicks, include_ings_str, exclude_ings_str, category
     if n_clicks == 0 or df_final.empty:
         raise PreventUpdate
 
-    filtered_df = df_final.copy()
-
-    # Apply ingredient filters
-    if exclude_ings_str:
-        exclude_list = [ing.strip().lower() for ing in exclude_ings_str.split(',') if ing.strip()]
-        if exclude_list:
-            def check_excluded(ingredients_text):
-                if pd.isna(ingredients_text): return True
-                product_ings = split_ingredients(ingredients_text)
-                return not any(excluded_ing in product_ings for excluded_ing in exclude_list)
-            filtered_df = filtered_df[filtered_df['Ingredients'].apply(check_excluded)]
+    # Each criterion is a mask over the full catalog; only the final index list is materialized
+    keep_mask = compute_filter_mask(filter_columns, get_filter_key(exclude_ings_str, None, None, None, False))
 
     if include_ings_str:
         include_list = [ing.strip().lower() for ing in include_ings_str.split(',') if ing.strip()]
         if include_list:
-            def check_included(ingredients_text):
-                if pd.isna(ingredients_text): return False
-                product_ings = split_ingredients(ingredients_text)
-                return all(included_ing in product_ings for included_ing in include_list)
-            filtered_df = filtered_df[filtered_df['Ingredients'].apply(check_included)]
+            include_mask = np.zeros(len(df_final), dtype=bool)
+            include_mask[rows_containing_all(include_list)] = True
+            keep_mask &= include_mask
 
-    # Apply category and brand filters
     if category_val:
-        filtered_df = filtered_df[filtered_df['category'] == category_val]
+        keep_mask &= label_mask(filter_columns['category_codes'], filter_columns['category_lookup'], [category_val])
     if brand_val:
-        filtered_df = filtered_df[filtered_df['Brand'] == brand_val]
+        keep_mask &= label_mask(filter_columns['brand_codes'], filter_columns['brand_lookup'], [brand_val])
 
-    num_results = len(filtered_df)
-    info_text = f"Found {num_results} products matching your initial criteria. Proceed to 'Product Analysis & Visuals' tab."
-    return filtered_df.index.tolist(), info_text
+    filtered_index = df_final.index[keep_mask]
+    info_text = f"Found {len(filtered_index)} products matching your initial criteria. Proceed to 'Product Analysis & Visuals' tab."
+    return filtered_index.tolist(), info_text
 
 
 # Apply Advanced Filters
@@ -506,6 +857,72 @@ def apply_advanced_filters(n_clicks, initial_indices, skin_types, clean_product_
     return current_df.index.tolist(), info_text
 
 
+# Autocomplete and spelling suggestions for the excluded ingredients
+@app.callback(
+    Output('exclude-ingredient-suggestions', 'children'),
+    Input('base-exclude-ingredients', 'value')
+)
+def update_exclude_ingredient_suggestions(exclude_ings_str):
+    """
+    Suggest completions for the ingredient being typed and corrections for unknown ones.
+    
+    Args:
+        exclude_ings_str (str): Comma-separated ingredients typed so far
+        
+    Returns:
+        list: Suggestion buttons whose index holds the corrected input value
+    """
+    if not exclude_ings_str:
+        return []
+    terms = [term.strip().lower() for term in exclude_ings_str.split(',')]
+    done_terms, current_term = terms[:-1], terms[-1]
+    button_style = {'margin': '2px 4px 2px 0', 'padding': '1px 6px', 'fontSize': '0.8rem', 'cursor': 'pointer'}
+    
+    def suggestion_button(label, new_terms):
+        new_value = ', '.join(term for term in new_terms if term) + ', '
+        return html.Button(label, id={'type': 'exclude-ingredient-suggestion', 'index': new_value}, n_clicks=0, style=button_style)
+    
+    children = []
+    completions = [name for name in suggest_completions(ingredient_suggester, current_term) if name != current_term]
+    if completions:
+        children.append(html.Span("Suggestions: ", style={'color': '#666'}))
+        children.extend(suggestion_button(name, done_terms + [name]) for name in completions[:6])
+    elif current_term and not is_known_ingredient(ingredient_suggester, current_term):
+        # Nothing starts with the typed text, so it is treated like a finished term
+        done_terms, current_term = terms, ''
+    
+    for pos, term in enumerate(done_terms):
+        if not term or is_known_ingredient(ingredient_suggester, term):
+            continue
+        corrections = suggest_corrections(ingredient_suggester, term)
+        if corrections:
+            children.append(html.Div([
+                html.Span(f"'{term}' matches no ingredient. Did you mean: ", style={'color': '#8a6d3b'}),
+                *[suggestion_button(name, done_terms[:pos] + [name] + done_terms[pos + 1:] + [current_term]) for name in corrections]
+            ]))
+        else:
+            children.append(html.Div(f"'{term}' matches no ingredient.", style={'color': '#8a6d3b'}))
+    return children
+
+@app.callback(
+    Output('base-exclude-ingredients', 'value'),
+    Input({'type': 'exclude-ingredient-suggestion', 'index': ALL}, 'n_clicks'),
+    prevent_initial_call=True
+)
+def apply_exclude_ingredient_suggestion(n_clicks_list):
+    """
+    Replace the excluded ingredients text with the clicked suggestion.
+    
+    Args:
+        n_clicks_list (list): Click counts of the rendered suggestion buttons
+        
+    Returns:
+        str: The corrected comma-separated ingredients
+    """
+    if not any(n_clicks_list):
+        raise PreventUpdate
+    return dash.ctx.triggered_id['index']
+
 # Store selected products for comparison
 @app.callback(
     Output('store-selected-for-comparison-names', 'data'),
@@ -529,9 +946,131 @@ def store_products_for_comparison(selected_products):
 
 ## ---- Reviews and Price Comparison Tab ---- ##
 
+def build_price_box_figure(stats, outlier_rows, group_by):
+    """
+    Build one precomputed box trace per group, plus a single trace of the outliers.
+
+    Args:
+        stats (DataFrame): Box statistics per group from compute_price_box_stats
+        outlier_rows (ndarray): Row positions in df_final of the outliers
+        group_by (str): Grouping column ('category' or 'Brand')
+
+    Returns:
+        Figure: Box plot of price by group, colored like px.box
+    """
+    colors = px.colors.qualitative.Plotly
+    group_label = group_by.title()
+    boxes = [
+        go.Box(
+            x=[group], q1=[q1], median=[median], q3=[q3], lowerfence=[lowerfence], upperfence=[upperfence],
+            name=str(group), marker_color=colors[pos % len(colors)], line_color=colors[pos % len(colors)],
+            boxpoints=False
+        )
+        for pos, (group, q1, median, q3, lowerfence, upperfence)
+        in enumerate(stats[['group', 'q1', 'median', 'q3', 'lowerfence', 'upperfence']].itertuples(index=False))
+    ]
+    group_positions = pd.Index(stats['group']).get_indexer(df_final[group_by].to_numpy()[outlier_rows])
+    outliers = go.Scatter(
+        x=df_final[group_by].to_numpy()[outlier_rows],
+        y=df_final['Price'].to_numpy()[outlier_rows],
+        mode='markers',
+        marker=dict(color=[colors[pos % len(colors)] for pos in group_positions]),
+        hovertext=df_final['Name'].to_numpy()[outlier_rows],
+        hovertemplate=f"{group_label}=%{{x}}<br>%{{hovertext}}<br>Price ($)=%{{y}}<extra></extra>",
+        showlegend=False
+    )
+    return go.Figure(data=boxes + [outliers]).update_layout(
+        title=f'Price Distribution by {group_label}',
+        xaxis=dict(categoryorder='array', categoryarray=list(stats['group'])),
+        boxmode='overlay'
+    )
+
+def build_price_review_density(row_positions, colorscale):
+    """
+    Aggregate products into a price x review score grid drawn as a heatmap.
+
+    The figure holds at most DENSITY_GRID_SIZE^2 cells however many products match.
+
+    Args:
+        row_positions (ndarray): Row positions in df_final with review score, price and loves
+        colorscale (list): Colors from the fewest to the most products per cell
+
+    Returns:
+        Figure: Heatmap of product counts with per-cell averages and the most loved product on hover
+    """
+    review = df_final['review_score'].to_numpy(dtype=np.float64)[row_positions]
+    price = df_final['Price'].to_numpy(dtype=np.float64)[row_positions]
+    loves = df_final['n_of_loves'].to_numpy(dtype=np.float64)[row_positions]
+
+    def bin_values(values):
+        low, high = values.min(), values.max()
+        edges = np.linspace(low, high if high > low else low + 1, DENSITY_GRID_SIZE + 1)
+        return np.clip(np.searchsorted(edges, values, side='right') - 1, 0, DENSITY_GRID_SIZE - 1), edges
+
+    review_bins, review_edges = bin_values(review)
+    price_bins, price_edges = bin_values(price)
+    num_cells = DENSITY_GRID_SIZE * DENSITY_GRID_SIZE
+    cells = price_bins * DENSITY_GRID_SIZE + review_bins
+    counts = np.bincount(cells, minlength=num_cells)
+    occupied = counts > 0
+    mean_price = np.full(num_cells, np.nan)
+    mean_review = np.full(num_cells, np.nan)
+    mean_price[occupied] = np.bincount(cells, weights=price, minlength=num_cells)[occupied] / counts[occupied]
+    mean_review[occupied] = np.bincount(cells, weights=review, minlength=num_cells)[occupied] / counts[occupied]
+
+    # Most loved product of each cell: the first entry per cell after sorting by loves descending
+    order = np.lexsort((-loves, cells))
+    first = order[np.r_[True, cells[order][1:] != cells[order][:-1]]]
+    top_names = np.full(num_cells, '', dtype=object)
+    top_names[cells[first]] = df_final['Name'].to_numpy()[row_positions[first]]
+
+    shape = (DENSITY_GRID_SIZE, DENSITY_GRID_SIZE)
+    customdata = np.dstack([mean_price.reshape(shape), mean_review.reshape(shape), top_names.reshape(shape)])
+    return go.Figure(go.Heatmap(
+        z=np.where(occupied, counts, np.nan).reshape(shape),
+        x=(review_edges[:-1] + review_edges[1:]) / 2,
+        y=(price_edges[:-1] + price_edges[1:]) / 2,
+        customdata=customdata,
+        colorscale=colorscale,
+        colorbar=dict(title='Products'),
+        hoverongaps=False,
+        hovertemplate=(
+            "%{z} products<br>Avg. price: $%{customdata[0]:.2f}<br>"
+            "Avg. review score: %{customdata[1]:.2f}<br>Most loved: %{customdata[2]}<extra></extra>"
+        )
+    )).update_layout(xaxis_title='Review Score', yaxis_title='Price')
+
+def build_figure_patch(fig):
+    """
+    Turn a figure into a partial update of the figure already displayed for the same plot type.
+
+    Only the traces and the layout properties that depend on the plotted rows are sent;
+    the styling and template stay as they are in the browser.
+
+    Args:
+        fig (Figure): Complete figure
+
+    Returns:
+        Patch: Update replacing the traces and the data-dependent layout properties
+    """
+    # Encoded the way Dash sends whole figures, so arrays keep plotly's compact typed-array form
+    figure_json = json.loads(fig.to_json())
+    patch = Patch()
+    patch['data'] = figure_json['data']
+    for path in DATA_LAYOUT_PROPERTIES:
+        value = figure_json['layout']
+        for key in path:
+            value = value.get(key) if isinstance(value, dict) else None
+        target = patch['layout']
+        for key in path[:-1]:
+            target = target[key]
+        target[path[-1]] = value
+    return patch
+
 # Generate Comparison Visualizations 
 @app.callback(
-    Output('price-review-plot', 'figure'),
+    [Output('price-review-plot', 'figure'),
+     Output('price-review-plot-state', 'data')],
     [Input('price-review-plot-type', 'value'),
      Input('price-distribution-group', 'value'),
      Input('product-search-dropdown-single', 'value')],
@@ -539,15 +1078,22 @@ def store_products_for_comparison(selected_products):
      State('base-category-dropdown', 'value'),
      State('base-brand-dropdown', 'value'),
      State('skin-type-checklist', 'value'),
-     State('clean-product-checklist', 'value')],
+     State('clean-product-checklist', 'value'),
+     State('base-exclude-allergens', 'value'),
+     State('interaction-conflict-filter', 'value'),
+     State('exclude-alternatives-checklist', 'value'),
+     State('price-review-plot-state', 'data')],
     prevent_initial_call=True
 )
-def update_price_review_plot(plot_type, group_by, selected_products, exclude_ings_str, category_vals, brand_vals, skin_types, clean_product_flag_list):
+def update_price_review_plot(plot_type, group_by, selected_products, exclude_ings_str, category_vals, brand_vals, skin_types, clean_product_flag_list, exclude_allergen_groups, interaction_conflict_mode, exclude_alternatives_list, displayed_plot):
     """
     Generate price and review comparison plots.
+
+    When the plot type already displayed is redrawn (a new product selection or grouping),
+    only its traces and data-dependent layout are sent as a partial update.
     
     Args:
-        plot_type (str): Type of plot ('scatter' or 'box')
+        plot_type (str): Type of plot ('scatter', 'box' or 'ingredients')
         group_by (str): Grouping variable for box plot
         selected_products (list): Selected products to display
         exclude_ings_str (str): Ingredients to exclude
@@ -555,42 +1101,107 @@ def update_price_review_plot(plot_type, group_by, selected_products, exclude_ing
         brand_vals (list): Selected brands
         skin_types (list): Selected skin types
         clean_product_flag_list (list): Clean product filter selection
+        exclude_allergen_groups (list): Allergen groups to exclude
+        interaction_conflict_mode (str): Interaction conflict filter ('all', 'only' or 'exclude')
+        exclude_alternatives_list (list): Selection of the exclude-alternatives option
+        displayed_plot (str): 'plot type:first trace type' of the figure displayed, or None
         
     Returns:
-        Figure: Plotly figure object
+        tuple: (Plotly figure object or Patch of the displayed figure, its 'plot type:first trace type')
     """
     clean_flag_bool = True if clean_product_flag_list and 1 in clean_product_flag_list else False
-    filtered_df = get_filtered_df(exclude_ings_str, category_vals, brand_vals, skin_types, clean_flag_bool)
+    expand_alternatives = bool(exclude_alternatives_list and 1 in exclude_alternatives_list)
+    filter_key = get_filter_key(exclude_ings_str, category_vals, brand_vals, skin_types, clean_flag_bool, exclude_allergen_groups, interaction_conflict_mode, expand_alternatives)
+    fig = build_price_review_figure(plot_type, group_by, selected_products, filter_key)
+    if not fig.data:
+        return fig, None
+    # The scatter switches to WebGL or a density grid as the rows grow, which changes its layout
+    plot_kind = f'{plot_type}:{fig.data[0].type}'
+    if displayed_plot == plot_kind:
+        return build_figure_patch(fig), plot_kind
+    return fig, plot_kind
+
+def build_price_review_figure(plot_type, group_by, selected_products, filter_key):
+    """
+    Build the complete price and review comparison figure.
+
+    Args:
+        plot_type (str): Type of plot ('scatter', 'box' or 'ingredients')
+        group_by (str): Grouping variable for box plot
+        selected_products (list): Selected products to display
+        filter_key (tuple): Key from get_filter_key
+
+    Returns:
+        Figure: Plotly figure object (without traces when no product matches)
+    """
+    row_positions = get_filtered_rows(filter_key)
     
-    if filtered_df.empty:
+    if len(row_positions) == 0:
         return go.Figure().update_layout(
             title_x=0.5,
             paper_bgcolor="rgba(0,0,0,0)",
             plot_bgcolor="rgba(0,0,0,0)"
         )
     
+    # Narrow the row positions first; only the final rows and plotted columns are materialized
     if selected_products:
-        if isinstance(selected_products, list):
-            plot_df = filtered_df[filtered_df['Name'].isin(selected_products)]
-        else:
-            plot_df = filtered_df[filtered_df['Name'] == selected_products]
-    else:
-        plot_df = filtered_df
+        selected_names = selected_products if isinstance(selected_products, list) else [selected_products]
+        row_positions = row_positions[pd.Series(df_final['Name'].to_numpy()[row_positions]).isin(selected_names).to_numpy()]
         
-    if plot_df.empty:
+    if len(row_positions) == 0:
         return go.Figure().update_layout(
             title_x=0.5,
             paper_bgcolor="rgba(0,0,0,0)",
             plot_bgcolor="rgba(0,0,0,0)"
         )
-    
-    if plot_type == 'scatter':
+    
+    if plot_type == 'ingredients':
+        # Unnarrowed filters reuse the cached counts; a product selection is counted directly
+        if selected_products:
+            _, document_frequency = count_ingredients(ingredient_offsets, ingredient_ids, len(ingredient_vocabulary), row_positions)
+            top_ids = top_ingredient_ids(document_frequency, TOP_INGREDIENTS_LIMIT)
+            names, counts, num_products = ingredient_vocabulary[top_ids].tolist(), document_frequency[top_ids], len(row_positions)
+        else:
+            names, counts, num_products = get_top_ingredients(filter_key)
+
+        fig = go.Figure(go.Bar(
+            x=counts / num_products * 100,
+            y=[name.title() for name in names],
+            orientation='h',
+            customdata=counts,
+            marker_color='#24769a',
+            hovertemplate=f"%{{y}}<br>%{{x:.1f}}% of products (%{{customdata}} of {num_products})<extra></extra>"
+        ))
+        fig.update_layout(
+            title=f'Most Common Ingredients ({num_products} Products)',
+            height=max(400, 25 * len(names) + 100),
+            font_family="Inter, Arial, sans-serif",
+            paper_bgcolor="rgba(0,0,0,0)",
+            plot_bgcolor="rgba(0,0,0,0)",
+            margin=dict(l=10, r=10, t=50, b=10),
+            xaxis=dict(
+                title=dict(
+                    text='Share of Products (%)',
+                    font=dict(size=12),
+                    standoff=10
+                ),
+                tickfont=dict(size=12),
+                showgrid=True,
+                gridwidth=1,
+                gridcolor='rgba(0,0,0,0.1)'
+            ),
+            yaxis=dict(
+                autorange='reversed',
+                tickfont=dict(size=12),
+                automargin=True
+            )
+        )
+    elif plot_type == 'scatter':
         # Filter for required fields and create bins for n_of_loves
-        plot_df = plot_df[plot_df['review_score'].notna() & plot_df['n_of_loves'].notna()].copy()
         required_fields = ['review_score', 'n_of_loves', 'n_of_reviews', 'Price']
-        plot_df = plot_df.dropna(subset=required_fields).copy()
+        row_positions = row_positions[df_final[required_fields].notna().to_numpy()[row_positions].all(axis=1)]
         
-        if plot_df.empty:
+        if len(row_positions) == 0:
             return go.Figure().update_layout(
                 title_x=0.5,
                 paper_bgcolor="rgba(0,0,0,0)"
@@ -613,21 +1224,29 @@ def update_price_review_plot(plot_type, group_by, selected_products, exclude_ing
             'Very Low (0 - 3k)'
         ]
         
-        # Create scatter plot
-        fig = px.scatter(
-            plot_df,
-            x='review_score',
-            y='Price',
-            size='n_of_reviews',
-            color='n_of_loves_bin',
-            hover_name='Name',
-            hover_data=['Brand', 'Price', 'review_score', 'n_of_loves', 'n_of_reviews', 'n_of_loves_bin'],
-            color_discrete_sequence=cerulean_seq_5,
-            labels={'n_of_loves_bin': 'Popularity', 'review_score': 'Review Score', 'n_of_reviews': 'Number of Reviews'},
-            category_orders={'n_of_loves_bin': bin_order}
-        )
-        
-        fig.update_traces(marker=dict(line=dict(width=1, color='black')))
+        if len(row_positions) > DENSITY_SCATTER_THRESHOLD:
+            # Too many points to send individually: ship a fixed-size grid of counts instead
+            fig = build_price_review_density(row_positions, cerulean_seq_5[::-1])
+        else:
+            plot_df = select_rows(row_positions, ['Name', 'Brand', 'n_of_loves_bin'] + required_fields)
+            # Create scatter plot
+            fig = px.scatter(
+                plot_df,
+                x='review_score',
+                y='Price',
+                size='n_of_reviews',
+                color='n_of_loves_bin',
+                hover_name='Name',
+                # Explicit formats keep float32 snapshot values from rendering as long decimals
+                hover_data={'Brand': True, 'Price': ':.2~f', 'review_score': ':.4~f', 'n_of_loves': ':.0f', 'n_of_reviews': ':.0f', 'n_of_loves_bin': True},
+                color_discrete_sequence=cerulean_seq_5,
+                labels={'n_of_loves_bin': 'Popularity', 'review_score': 'Review Score', 'n_of_reviews': 'Number of Reviews'},
+                category_orders={'n_of_loves_bin': bin_order},
+                # SVG markers slow the browser down past about a thousand points
+                render_mode='webgl' if len(plot_df) > WEBGL_SCATTER_THRESHOLD else 'auto'
+            )
+            
+            fig.update_traces(marker=dict(line=dict(width=1, color='black')))
         fig.update_layout(
             title_text="",
             autosize=True,
@@ -667,16 +1286,13 @@ def update_price_review_plot(plot_type, group_by, selected_products, exclude_ing
             )
         )
     else:
-        # Create box plot
-        fig = px.box(
-            plot_df,
-            x=group_by,
-            y='Price',
-            color=group_by,
-            points='outliers',
-            title=f'Price Distribution by {group_by.title()}',
-            labels={group_by: group_by.title(), 'Price': 'Price ($)'}
-        )
+        # Quartiles and whiskers are computed here, so only a few numbers per group and the
+        # outliers are sent instead of every price
+        if selected_products:
+            stats, outlier_rows = compute_price_box_stats(row_positions, group_by)
+        else:
+            stats, outlier_rows = get_price_box_stats(filter_key, group_by)
+        fig = build_price_box_figure(stats, outlier_rows, group_by)
         
         # Update layout
         fig.update_layout(
@@ -701,6 +1317,7 @@ def update_price_review_plot(plot_type, group_by, selected_products, exclude_ing
                     font=dict(size=12),
                     standoff=10
                 ),
+                hoverformat='.2~f',
                 tickfont=dict(size=12),
                 showgrid=True,
                 gridwidth=1,
@@ -720,7 +1337,8 @@ def render_main_tab_content(tab_value):
     Render the content for the main tab based on the selected tab value.
     
     Args:
-        tab_value (str): The selected tab value ('reviews-price-tab' or 'ingredient-analysis-tab')
+        tab_value (str): The selected tab value ('reviews-price-tab', 'ingredient-analysis-tab',
+                         'routine-tab' or 'duplicates-tab')
         
     Returns:
         Div: Dash HTML component containing the tab content
@@ -733,7 +1351,8 @@ def render_main_tab_content(tab_value):
                     html.P([
                         "Compare products based on their price points and review scores. ",
                         "The scatter plot shows the relationship between price and review scores, with bubble size indicating the number of reviews. ",
-                        "Use the box plot to see price distributions across different categories or brands."
+                        "Use the box plot to see price distributions across different categories or brands, ",
+                        "or list the ingredients most common among the filtered products."
                     ], style={'marginBottom': '15px', 'color': '#666'}),
                     html.Div([
                         html.Div(
@@ -741,7 +1360,8 @@ def render_main_tab_content(tab_value):
                                 id='price-review-plot-type',
                                 options=[
                                     {'label': 'Price vs. Review Score', 'value': 'scatter'},
-                                    {'label': 'Price Distribution', 'value': 'box'}
+                                    {'label': 'Price Distribution', 'value': 'box'},
+                                    {'label': 'Most Common Ingredients', 'value': 'ingredients'}
                                 ],
                                 value='scatter',
                                 inline=True,
@@ -768,6 +1388,8 @@ def render_main_tab_content(tab_value):
                     ]),
                     html.Div(style={'clear': 'both'})
                 ], style={'marginBottom': '20px', 'position': 'relative', 'minHeight': '60px'}),
+                # Kind of figure currently drawn in price-review-plot, so redraws can be partial
+                dcc.Store(id='price-review-plot-state'),
                 html.Div([
                     dcc.Loading(children=[
                         dcc.Graph(
@@ -793,7 +1415,7 @@ def render_main_tab_content(tab_value):
             html.Div([
                 html.H4("Ingredient Analysis", className="figure-header", style={'marginBottom': '10px'}),
                 html.P([
-                    "Analyze the ingredients in your selected products. Choose from three types of analysis:"
+                    "Analyze the ingredients in your selected products. Choose from five types of analysis:"
                 ], style={'marginBottom': '15px', 'color': '#666'}),
                 html.Ul([
                     html.Li([
@@ -807,6 +1429,14 @@ def render_main_tab_content(tab_value):
                     html.Li([
                         html.Strong("Formulation Profile: "),
                         "See how ingredients are categorized and their relationships in the product formulation."
+                    ]),
+                    html.Li([
+                        html.Strong("Similar Products (Dupes): "),
+                        "Find products with the most similar ingredient lists, optionally only cheaper ones."
+                    ]),
+                    html.Li([
+                        html.Strong("Ingredient Swaps: "),
+                        "See which of the product's ingredients have known alternatives, starting with the ones you chose to exclude."
                     ])
                 ], style={'marginBottom': '20px', 'paddingLeft': '20px', 'color': '#666'})
             ], style={'marginBottom': '20px'}),
@@ -823,7 +1453,9 @@ def render_main_tab_content(tab_value):
                 options=[
                     {'label': 'Allergens & Interactions', 'value': 'allergens_interactions'},
                     {'label': 'Ingredient Details & Functions', 'value': 'details_functions'},
-                    {'label': 'Formulation Profile', 'value': 'composition'}
+                    {'label': 'Formulation Profile', 'value': 'composition'},
+                    {'label': 'Similar Products (Dupes)', 'value': 'similar_products'},
+                    {'label': 'Ingredient Swaps', 'value': 'ingredient_swaps'}
                 ],
                 value='details_functions',
                 inline=True, 
@@ -840,8 +1472,49 @@ def render_main_tab_content(tab_value):
                     style={'width': '100%', 'marginBottom': '16px'}
                 )
             ], id='allergen-dropdown-container', style={'display': 'none'}),
+            html.Div([
+                dcc.Checklist(
+                    id='ia-similar-cheaper-checklist',
+                    options=[{'label': ' Only show cheaper products', 'value': 1}],
+                    value=[],
+                    style={'marginBottom': '16px'}
+                )
+            ], id='similar-options-container', style={'display': 'none'}),
             dcc.Loading(html.Div(id='ia-analysis-output-area')) 
         ], style={'overflowY': 'auto','padding': '8px 8px 8px 8px'})
+    elif tab_value == 'routine-tab':
+        return html.Div([
+            html.Div([
+                html.H4("Routine Conflict Checker", className="figure-header", style={'marginBottom': '10px'}),
+                html.P([
+                    "Check a whole AM/PM routine for ingredient interactions between products. ",
+                    "Select the products in your routine with the product selector on the left. ",
+                    "The heatmap counts the interactions each pair of products triggers when used together; ",
+                    "the diagonal counts interactions already present within a single product."
+                ], style={'marginBottom': '15px', 'color': '#666'})
+            ], style={'marginBottom': '20px'}),
+            dcc.Loading(html.Div(id='routine-analysis-output-area'))
+        ], style={'overflowY': 'auto', 'padding': '8px 8px 8px 8px'})
+    elif tab_value == 'duplicates-tab':
+        return html.Div([
+            html.Div([
+                html.H4("Same Formula, Different Price", className="figure-header", style={'marginBottom': '10px'}),
+                html.P([
+                    "Many products are reformulations or re-brandings with nearly identical ingredient lists. ",
+                    "Each group below collects products in the chosen category whose ingredient lists overlap by about 80% or more, ",
+                    "ranked by the gap between the cheapest and the most expensive product in the group."
+                ], style={'marginBottom': '15px', 'color': '#666'})
+            ], style={'marginBottom': '20px'}),
+            html.Label("Select Category:", style={'fontSize': '1rem', 'fontWeight': 500, 'marginBottom': '8px'}),
+            dcc.Dropdown(
+                id='duplicates-category-dropdown',
+                options=[{'label': cat, 'value': cat} for cat in categories],
+                value=categories[0] if categories else None,
+                clearable=False,
+                style={'width': '100%', 'marginBottom': '20px'}
+            ),
+            dcc.Loading(html.Div(id='duplicates-output-area'))
+        ], style={'overflowY': 'auto', 'padding': '8px 8px 8px 8px'})
     return html.P("Select a tab.")
 
 # --- Ingredient Analysis Sub-tab Content Callback ---
@@ -863,27 +1536,223 @@ def populate_ia_product_selector(tab_value, current_value):
     Returns:
         tuple: (dropdown options, selected value)
     """
-    options = []
     if tab_value != 'ingredient-analysis-tab':
-        return options, None
-    for _, row in df_final.iterrows():
-        paula_details_list = parse_paula_details(row.get('paula_ingredient_details'))
-        if paula_details_list and isinstance(paula_details_list, list) and len(paula_details_list) > 0:
-            options.append({'label': f"{row['Name']} ({row['Brand']})", 'value': row['Name']})
+        return [], None
+    options = ia_product_options
     values = [opt['value'] for opt in options]
     if current_value in values:
         return options, current_value
     return options, (values[0] if values else None)
 
+def render_product_details(product_row_pos):
+    """
+    Render the ingredient details and functions table of a product.
+
+    Args:
+        product_row_pos (int): Row position of the product in df_final
+
+    Returns:
+        Div: Dash HTML component containing the table
+    """
+    product_name = df_final['Name'].iat[product_row_pos]
+    descriptive_table_div = html.Div([
+        html.H5(f"Ingredients Details for {product_name}", className="figure-header"),
+        html.P([
+            "This table provides detailed information about each ingredient in the product, including its rating, functions, and benefits. ",
+            "Hover over column headers for more information about each category."
+        ], style={'marginBottom': '15px', 'color': '#666'})
+    ])
+    detail_ids = get_product_detail_ids(product_row_pos)
+    raw_ingredients = get_product_ingredients(product_row_pos)
+
+    if len(detail_ids) > 0:
+        # Serve table rows from the pre-parsed ingredient details store
+        table_data = [ingredient_detail_records[detail_id] for detail_id in detail_ids]
+
+        # Create and style the data table
+        descriptive_table_div.children.append(dash_table.DataTable(
+            columns=[{"name": k, "id": k} for k in table_data[0].keys()],
+            data=table_data,
+            style_cell={
+                'textAlign': 'left',
+                'fontFamily': 'Nunito Sans, sans-serif',
+                'fontSize': '12px',
+                'whiteSpace': 'normal',
+                'height': 'auto',
+                'overflow': 'flex',
+                'padding': '4px 6px'
+            },
+            style_header={
+                'fontWeight': 'bold',
+                'fontFamily': 'Poppins, sans-serif',
+                'fontSize': '13px',
+                'backgroundColor': 'rgba(0,0,0,0.03)',
+                'position': 'sticky',
+                'top': 0
+            },
+            style_cell_conditional=[
+                {'if': {'column_id': 'Rating'}, 'minWidth': '60px', 'maxWidth': '120px'}
+            ],
+            tooltip_header={
+                'Ingredient': 'The ingredient name as listed in the product.',
+                'Rating': "Paula's Choice rating (1-5).",
+                'Functions': 'Functional roles or categories for the ingredient.',
+                'Benefits': 'Key benefits or effects of the ingredient.',
+                'Description': 'A brief description of the ingredient.'
+            },
+            style_data_conditional=[
+                {'if': {'row_index': 'odd'}, 'backgroundColor': 'rgba(0,0,0,0.02)'}
+            ],
+            style_table={
+                'padding': '8px',
+                'overflowY': 'auto',
+                'overflowX': 'auto',
+                'boxSizing': 'border-box'
+            },
+            fixed_rows={'headers': True},
+            page_size=25
+        ))
+    else:
+        # Fallback to raw ingredient list if no Paula's Choice details available
+        if raw_ingredients:
+            descriptive_table_div.children.append(
+                html.Div(
+                    ', '.join(raw_ingredients),
+                    style={
+                        'backgroundColor': '#f8d7da',
+                        'color': '#222',
+                        'padding': '16px',
+                        'borderRadius': '8px',
+                        'margin': '8px',
+                        'fontSize': '16px',
+                        'border': '1.5px solid #e09ca0'
+                    }
+                )
+            )
+        else:
+            descriptive_table_div.children.append(html.P("No ingredient details extracted."))
+    return html.Div([
+        html.Div(descriptive_table_div, className="content-card", style={'marginBottom':'12px'})
+    ])
+
+def render_product_composition(product_row_pos):
+    """
+    Render the formulation profile sunburst of a product.
+
+    Args:
+        product_row_pos (int): Row position of the product in df_final
+
+    Returns:
+        Div: Dash HTML component containing the sunburst figure
+    """
+    product_name = df_final['Name'].iat[product_row_pos]
+    detail_ids = get_product_detail_ids(product_row_pos)
+    sunburst_div = html.Div([html.H5(f"Formulation Profile for {product_name}", className="figure-header")])
+    if len(detail_ids) > 0:
+        # Prepare data for sunburst plot from the pre-parsed ingredient details store
+        sunburst_data = []
+        for detail_id in detail_ids:
+            ing_label = ingredient_detail_records[detail_id]['Ingredient']
+            for cat in ingredient_details_table['categories'].iat[detail_id]:
+                sunburst_data.append({'category': cat, 'ingredient': ing_label, 'value': 1})
+        sunburst_df = pd.DataFrame(sunburst_data)
+        if not sunburst_df.empty:
+            total_value = sunburst_df['value'].sum()
+            cat_totals = sunburst_df.groupby('category')['value'].sum().to_dict()
+            sunburst_df['cat_proportion'] = sunburst_df['category'].map(lambda c: cat_totals[c] / total_value)
+            fig = px.sunburst(
+                sunburst_df,
+                path=['category', 'ingredient'],
+                values='value',
+                title='Ingredient Category Sunburst',
+                custom_data=['cat_proportion']
+            )
+            fig.update_traces(
+                hovertemplate="<b>%{label}</b><br>Category Proportion: %{customdata[0]:.1%}<extra></extra>"
+            )
+            fig.update_layout(
+                paper_bgcolor="rgba(0,0,0,0)",
+                plot_bgcolor="rgba(0,0,0,0)",
+                font_family="Nunito Sans, sans-serif",
+                font_size=14,
+                height=700,
+                width=700,
+                hoverlabel=dict(
+                    bgcolor="#f0f6f6",
+                    font_size=14,
+                    font_family="Nunito Sans, sans-serif",
+                    font_color="#29353C"
+                )
+            )
+            sunburst_div.children.append(
+                html.Div(
+                    dcc.Graph(
+                        figure=fig,
+                        style={'width': '100%', 'height': '100%'},
+                        config={'responsive': True, 'displayModeBar': True, 'displaylogo': False}
+                    ),
+                    style={'width': '100%', 'height': '700px', 'display': 'flex', 'justifyContent': 'center', 'alignItems': 'center'}
+                )
+            )
+        else:
+            sunburst_div.children.append(html.P("No ingredient categories found for sunburst visualization."))
+    else:
+        sunburst_div.children.append(html.P("No ingredient details available for sunburst visualization."))
+    return html.Div([
+        html.Div(sunburst_div, className="content-card", style={'marginBottom':'20px', 'height': 'fit-content'})
+    ])
+
+# Analyses that depend only on the product, so their renders can be cached per product
+PRODUCT_RENDERERS = {
+    'details_functions': render_product_details,
+    'composition': render_product_composition
+}
+
+def get_product_render(product_row_pos, analysis_type):
+    """
+    Return a product's rendered analysis from the render cache, rendering it on a miss.
+
+    Args:
+        product_row_pos (int): Row position of the product in df_final
+        analysis_type (str): Key of PRODUCT_RENDERERS
+
+    Returns:
+        dict: Dash component with the analysis results, decoded from the render cache's JSON
+    """
+    render_key = (int(product_row_pos), analysis_type, render_data_version)
+    rendered = get_cached_render(render_cache, render_key)
+    if rendered is None:
+        rendered = put_cached_render(render_cache, render_key, PRODUCT_RENDERERS[analysis_type](product_row_pos))
+    return rendered
+
+def prewarm_render_cache(num_products=RENDER_PREWARM_PRODUCTS):
+    """
+    Render the cached analyses of the most loved products ahead of their first request.
+
+    Args:
+        num_products (int): Number of products to render, most loved first
+
+    Returns:
+        int: Number of products rendered
+    """
+    loves = df_final['n_of_loves'].to_numpy(dtype=np.float64)
+    has_details = np.flatnonzero(np.diff(product_detail_offsets) > 0)
+    ranked = has_details[np.argsort(-np.nan_to_num(loves[has_details], nan=-1), kind='stable')][:num_products]
+    for pos in ranked:
+        for analysis_type in PRODUCT_RENDERERS:
+            get_product_render(pos, analysis_type)
+    return len(ranked)
+
 @app.callback(
     Output('ia-analysis-output-area', 'children'),
     [Input('ia-product-selector', 'value'),
      Input('ia-analysis-type-selector', 'value'),
-     Input('ia-allergen-group-dropdown', 'value')],
+     Input('ia-allergen-group-dropdown', 'value'),
+     Input('ia-similar-cheaper-checklist', 'value')],
     [State('base-exclude-ingredients', 'value')],
     prevent_initial_call=True
 )
-def update_ingredient_analysis_display(selected_product_name, analysis_type, selected_allergen_groups, exclude_ings_str):
+def update_ingredient_analysis_display(selected_product_name, analysis_type, selected_allergen_groups, similar_cheaper_list, exclude_ings_str):
     """
     Update the ingredient analysis display based on selected product and analysis type.
     
@@ -891,6 +1760,7 @@ def update_ingredient_analysis_display(selected_product_name, analysis_type, sel
         selected_product_name (str): Name of the selected product
         analysis_type (str): Type of analysis to perform
         selected_allergen_groups (list): Selected allergen groups to check
+        similar_cheaper_list (list): Cheaper-only selection for the similar products list
         exclude_ings_str (str): Ingredients to exclude
         
     Returns:
@@ -905,18 +1775,19 @@ def update_ingredient_analysis_display(selected_product_name, analysis_type, sel
             html.P("Please select an analysis type.", style={'color': '#666', 'fontStyle': 'italic'})
         ])
 
-    product_data_row_df = df_final[df_final['Name'] == selected_product_name]
-    if product_data_row_df.empty: 
+    # First product with this name, as in the product selectors
+    product_row_pos = product_row_by_name.get(selected_product_name)
+    if product_row_pos is None: 
         return html.Div([
             html.P(f"Details for product '{selected_product_name}' not found.", style={'color': '#dc3545'})
         ])
 
-    product_data_row = product_data_row_df.iloc[0]
+    if analysis_type in PRODUCT_RENDERERS:
+        return get_product_render(product_row_pos, analysis_type)
+    product_data_row = df_final.iloc[product_row_pos]
 
     if analysis_type == 'allergens_interactions':
         # Generate allergen and interaction warnings
-        paula_details_list = parse_paula_details(product_data_row.get('paula_ingredient_details'))
-        product_ingredients = set(split_ingredients(product_data_row.get('Ingredients', '')))
         warnings = []
         
         # Add context about allergen analysis
@@ -932,73 +1803,42 @@ def update_ingredient_analysis_display(selected_product_name, analysis_type, sel
             ], style={'marginBottom': '20px', 'color': '#666', 'fontStyle': 'italic'})
         ])
 
-        # Generate warnings based on selected allergen groups
-        if selected_allergen_groups:
-            for allergen_key in selected_allergen_groups:
-                if allergen_key in ALLERGEN_GROUPS:
-                    keywords = ALLERGEN_GROUPS[allergen_key]
-                    if any(any(k in ing for k in keywords) for ing in product_ingredients):
-                        label = next((opt['label'] for opt in allergen_options if opt['value'] == allergen_key), allergen_key)
-                        warnings.append(html.Div([
-                            html.Div([
-                                html.I(className="fas fa-exclamation-triangle", style={'marginRight': '8px', 'color': '#856404'}),
-                                html.Strong(f"Contains: {label.split(' (')[0]}", style={'color': '#856404'})
-                            ], style={'display': 'flex', 'alignItems': 'center', 'marginBottom': '4px'}),
-                            html.Div([
-                                html.Span("Allergen keywords: ", style={'fontWeight': 500}),
-                                html.Span(', '.join(keywords), style={'fontStyle': 'italic'})
-                            ], style={'fontSize': '0.9em', 'color': '#666'})
-                        ], style={
-                            'backgroundColor': '#fff3cd',
-                            'border': '1px solid #ffeeba',
-                            'borderRadius': '4px',
-                            'padding': '12px',
-                            'marginBottom': '8px'
-                        }))
-        else:
-            # Show warnings for all allergen groups present in the product
-            for allergen_key, keywords in ALLERGEN_GROUPS.items():
-                if any(any(k in ing for k in keywords) for ing in product_ingredients):
-                    label = next((opt['label'] for opt in allergen_options if opt['value'] == allergen_key), allergen_key)
-                    warnings.append(html.Div([
-                        html.Div([
-                            html.I(className="fas fa-exclamation-triangle", style={'marginRight': '8px', 'color': '#856404'}),
-                            html.Strong(f"Contains: {label.split(' (')[0]}", style={'color': '#856404'})
-                        ], style={'display': 'flex', 'alignItems': 'center', 'marginBottom': '4px'}),
-                        html.Div([
-                            html.Span("Allergen keywords: ", style={'fontWeight': 500}),
-                            html.Span(', '.join(keywords), style={'fontStyle': 'italic'})
-                        ], style={'fontSize': '0.9em', 'color': '#666'})
-                    ], style={
-                        'backgroundColor': '#fff3cd',
-                        'border': '1px solid #ffeeba',
-                        'borderRadius': '4px',
-                        'padding': '12px',
-                        'marginBottom': '8px'
-                    }))
+        # Generate warnings from the precomputed allergen matrix row
+        # (all allergen groups present in the product when none are selected)
+        for allergen_key, matched_keywords in get_allergen_hits(product_row_pos, selected_allergen_groups or None):
+            warnings.append(html.Div([
+                html.Div([
+                    html.I(className="fas fa-exclamation-triangle", style={'marginRight': '8px', 'color': '#856404'}),
+                    html.Strong(f"Contains: {get_allergen_label(allergen_key)}", style={'color': '#856404'})
+                ], style={'display': 'flex', 'alignItems': 'center', 'marginBottom': '4px'}),
+                html.Div([
+                    html.Span("Matched keywords: ", style={'fontWeight': 500}),
+                    html.Span(', '.join(matched_keywords), style={'fontStyle': 'italic'})
+                ], style={'fontSize': '0.9em', 'color': '#666'})
+            ], style={
+                'backgroundColor': '#fff3cd',
+                'border': '1px solid #ffeeba',
+                'borderRadius': '4px',
+                'padding': '12px',
+                'marginBottom': '8px'
+            }))
 
         # Generate interaction warnings
         interaction_warnings = []
-        for rule in INTERACTION_RULES:
-            rule_ingredients_found = []
-            for rule_ing in rule['ingredients']:
-                if any(rule_ing.lower() in ing.lower() for ing in product_ingredients):
-                    rule_ingredients_found.append(rule_ing)
-            
-            if len(rule_ingredients_found) == len(rule['ingredients']):
-                interaction_warnings.append(html.Div([
-                    html.Div([
-                        html.I(className="fas fa-exclamation-circle", style={'marginRight': '8px', 'color': '#721c24'}),
-                        html.Strong("Interaction Warning", style={'color': '#721c24'})
-                    ], style={'display': 'flex', 'alignItems': 'center', 'marginBottom': '4px'}),
-                    html.Div(rule['warning'], style={'fontSize': '0.9em', 'color': '#666'})
-                ], style={
-                    'backgroundColor': '#f8d7da',
-                    'border': '1px solid #f5c6cb',
-                    'borderRadius': '4px',
-                    'padding': '12px',
-                    'marginBottom': '8px'
-                }))
+        for rule in get_interaction_hits(product_row_pos):
+            interaction_warnings.append(html.Div([
+                html.Div([
+                    html.I(className="fas fa-exclamation-circle", style={'marginRight': '8px', 'color': '#721c24'}),
+                    html.Strong("Interaction Warning", style={'color': '#721c24'})
+                ], style={'display': 'flex', 'alignItems': 'center', 'marginBottom': '4px'}),
+                html.Div(rule['warning'], style={'fontSize': '0.9em', 'color': '#666'})
+            ], style={
+                'backgroundColor': '#f8d7da',
+                'border': '1px solid #f5c6cb',
+                'borderRadius': '4px',
+                'padding': '12px',
+                'marginBottom': '8px'
+            }))
 
         if not warnings and not interaction_warnings:
             return html.Div([
@@ -1030,44 +1870,35 @@ def update_ingredient_analysis_display(selected_product_name, analysis_type, sel
             })
         ])
 
-    elif analysis_type == 'details_functions':
-        # Generate ingredient details and functions table
-        product_brand = product_data_row.get('Brand', 'N/A')
-        descriptive_table_div = html.Div([
-            html.H5(f"Ingredients Details for {selected_product_name}", className="figure-header"),
+    elif analysis_type == 'similar_products':
+        cheaper_only = bool(similar_cheaper_list and 1 in similar_cheaper_list)
+        similar_rows, similar_scores = find_similar_products(product_row_pos, SIMILAR_PRODUCTS_LIMIT, cheaper_only)
+        similar_div = html.Div([
+            html.H5(f"Products Similar to {selected_product_name}", className="figure-header"),
             html.P([
-                "This table provides detailed information about each ingredient in the product, including its rating, functions, and benefits. ",
-                "Hover over column headers for more information about each category."
+                "Products ranked by how closely their ingredient lists match this one. ",
+                "Ingredients near the top of a list (higher concentration) count for more, and very common ingredients such as water count for less."
             ], style={'marginBottom': '15px', 'color': '#666'})
         ])
-        paula_details_list = parse_paula_details(product_data_row.get('paula_ingredient_details'))
-        raw_ingredients = split_ingredients(product_data_row['Ingredients'])
-        
-        if paula_details_list and isinstance(paula_details_list, list) and len(paula_details_list) > 0:
-            # Create table data from Paula's Choice details
+        if len(similar_rows) == 0:
+            similar_div.children.append(html.P(
+                "No cheaper products share ingredients with this product." if cheaper_only else "No products share ingredients with this product.",
+                style={'color': '#666', 'fontStyle': 'italic'}
+            ))
+        else:
+            product_price = product_data_row.get('Price')
             table_data = []
-            for detail in paula_details_list:
-                if not isinstance(detail, dict):
-                    continue
-                ing_name = detail.get('ingredient_name', detail.get('name', 'N/A'))
-                rating = detail.get('rating', 'N/A')
-                functions = detail.get('functions', '')
-                benefits = detail.get('benefits', [])
-                if isinstance(benefits, str):
-                    benefits = [b.strip() for b in benefits.split(';;') if b.strip()]
-                elif isinstance(benefits, list):
-                    benefits = [b for b in benefits if b]
-                desc = detail.get('description', '')
+            for pos, score in zip(similar_rows, similar_scores):
+                price = df_final['Price'].iat[pos]
                 table_data.append({
-                    'Ingredient': ing_name.capitalize(),
-                    'Rating': rating,
-                    'Functions': functions,
-                    'Benefits': ', '.join(benefits) if benefits else 'N/A',
-                    'Description': (desc[:150] + '...' if len(desc)>150 else desc) if desc else 'N/A'
+                    'Similarity': f"{score:.0%}",
+                    'Name': df_final['Name'].iat[pos],
+                    'Brand': df_final['Brand'].iat[pos],
+                    'Category': df_final['category'].iat[pos],
+                    'Price': f"${price:.2f}" if pd.notna(price) else 'N/A',
+                    'Price Difference': f"{price - product_price:+.2f}" if pd.notna(price) and pd.notna(product_price) else 'N/A'
                 })
-            
-            # Create and style the data table
-            descriptive_table_div.children.append(dash_table.DataTable(
+            similar_div.children.append(dash_table.DataTable(
                 columns=[{"name": k, "id": k} for k in table_data[0].keys()],
                 data=table_data,
                 style_cell={
@@ -1076,127 +1907,260 @@ def update_ingredient_analysis_display(selected_product_name, analysis_type, sel
                     'fontSize': '12px',
                     'whiteSpace': 'normal',
                     'height': 'auto',
-                    'overflow': 'flex',
                     'padding': '4px 6px'
                 },
                 style_header={
                     'fontWeight': 'bold',
                     'fontFamily': 'Poppins, sans-serif',
                     'fontSize': '13px',
-                    'backgroundColor': 'rgba(0,0,0,0.03)',
-                    'position': 'sticky',
-                    'top': 0
+                    'backgroundColor': 'rgba(0,0,0,0.03)'
                 },
-                style_cell_conditional=[
-                    {'if': {'column_id': 'Rating'}, 'minWidth': '60px', 'maxWidth': '120px'}
-                ],
                 tooltip_header={
-                    'Ingredient': 'The ingredient name as listed in the product.',
-                    'Rating': "Paula's Choice rating (1-5).",
-                    'Functions': 'Functional roles or categories for the ingredient.',
-                    'Benefits': 'Key benefits or effects of the ingredient.',
-                    'Description': 'A brief description of the ingredient.'
+                    'Similarity': 'Cosine similarity of the position-weighted ingredient lists.',
+                    'Price Difference': 'Price relative to the selected product.'
                 },
                 style_data_conditional=[
                     {'if': {'row_index': 'odd'}, 'backgroundColor': 'rgba(0,0,0,0.02)'}
                 ],
-                style_table={
-                    'padding': '8px',
-                    'overflowY': 'auto',
-                    'overflowX': 'auto',
-                    'boxSizing': 'border-box'
-                },
-                fixed_rows={'headers': True},
-                page_size=25
+                style_table={'padding': '8px', 'overflowX': 'auto', 'boxSizing': 'border-box'}
             ))
-        else:
-            # Fallback to raw ingredient list if no Paula's Choice details available
-            if raw_ingredients:
-                descriptive_table_div.children.append(
-                    html.Div(
-                        ', '.join(raw_ingredients),
-                        style={
-                            'backgroundColor': '#f8d7da',
-                            'color': '#222',
-                            'padding': '16px',
-                            'borderRadius': '8px',
-                            'margin': '8px',
-                            'fontSize': '16px',
-                            'border': '1.5px solid #e09ca0'
-                        }
-                    )
-                )
-            else:
-                descriptive_table_div.children.append(html.P("No ingredient details extracted."))
         return html.Div([
-            html.Div(descriptive_table_div, className="content-card", style={'marginBottom':'12px'})
+            html.Div(similar_div, className="content-card", style={'marginBottom':'12px'})
         ])
-
-    elif analysis_type == 'composition':
-        # Generate formulation profile sunburst plot
-        paula_details_list = parse_paula_details(product_data_row.get('paula_ingredient_details'))
-        sunburst_div = html.Div([html.H5(f"Formulation Profile for {selected_product_name}", className="figure-header")])
-        if paula_details_list:
-            # Prepare data for sunburst plot (original logic)
-            sunburst_data = []
-            for detail in paula_details_list:
-                if not isinstance(detail, dict):
-                    continue
-                ing_name = detail.get('ingredient_name', detail.get('name', 'N/A'))
-                parent_cats = detail.get('category', detail.get('categories', []))
-                if isinstance(parent_cats, str):
-                    parent_cats = [c.strip() for c in parent_cats.split(',') if c.strip()]
-                if isinstance(parent_cats, list) and parent_cats:
-                    for cat in parent_cats:
-                        sunburst_data.append({'category': cat, 'ingredient': ing_name.capitalize(), 'value': 1})
-            sunburst_df = pd.DataFrame(sunburst_data)
-            if not sunburst_df.empty:
-                total_value = sunburst_df['value'].sum()
-                cat_totals = sunburst_df.groupby('category')['value'].sum().to_dict()
-                sunburst_df['cat_proportion'] = sunburst_df['category'].map(lambda c: cat_totals[c] / total_value)
-                fig = px.sunburst(
-                    sunburst_df,
-                    path=['category', 'ingredient'],
-                    values='value',
-                    title='Ingredient Category Sunburst',
-                    custom_data=['cat_proportion']
-                )
-                fig.update_traces(
-                    hovertemplate="<b>%{label}</b><br>Category Proportion: %{customdata[0]:.1%}<extra></extra>"
-                )
-                fig.update_layout(
-                    paper_bgcolor="rgba(0,0,0,0)",
-                    plot_bgcolor="rgba(0,0,0,0)",
-                    font_family="Nunito Sans, sans-serif",
-                    font_size=14,
-                    height=700,
-                    width=700,
-                    hoverlabel=dict(
-                        bgcolor="#f0f6f6",
-                        font_size=14,
-                        font_family="Nunito Sans, sans-serif",
-                        font_color="#29353C"
-                    )
-                )
-                sunburst_div.children.append(
-                    html.Div(
-                        dcc.Graph(
-                            figure=fig,
-                            style={'width': '100%', 'height': '100%'},
-                            config={'responsive': True, 'displayModeBar': True, 'displaylogo': False}
-                        ),
-                        style={'width': '100%', 'height': '700px', 'display': 'flex', 'justifyContent': 'center', 'alignItems': 'center'}
-                    )
-                )
-            else:
-                sunburst_div.children.append(html.P("No ingredient categories found for sunburst visualization."))
+    elif analysis_type == 'ingredient_swaps':
+        excluded = {ing.strip().lower() for ing in exclude_ings_str.split(',') if ing.strip()} if exclude_ings_str else set()
+        table_data = []
+        for position, ing in enumerate(get_product_ingredients(product_row_pos), start=1):
+            alternatives = [alt for alt in get_alternatives(substitution_graph, ing) if alt not in excluded]
+            if alternatives:
+                table_data.append({
+                    'Position': position,
+                    'Ingredient': ing,
+                    'Excluded': 'Yes' if ing in excluded else '',
+                    'Alternatives': ', '.join(alternatives)
+                })
+        # Ingredients the user wants to avoid come first, the rest in label order
+        table_data.sort(key=lambda row: row['Excluded'] != 'Yes')
+        swaps_div = html.Div([
+            html.H5(f"Ingredient Swaps for {selected_product_name}", className="figure-header"),
+            html.P([
+                "Ingredients in this product with known substitutes. ",
+                "Ingredients listed under 'Ingredients to Exclude' are shown first and highlighted, and are never suggested as alternatives."
+            ], style={'marginBottom': '15px', 'color': '#666'})
+        ])
+        if not table_data:
+            swaps_div.children.append(html.P("No known alternatives for this product's ingredients.", style={'color': '#666', 'fontStyle': 'italic'}))
         else:
-            sunburst_div.children.append(html.P("No ingredient details available for sunburst visualization."))
+            swaps_div.children.append(dash_table.DataTable(
+                columns=[{"name": k, "id": k} for k in table_data[0].keys()],
+                data=table_data,
+                style_cell={
+                    'textAlign': 'left',
+                    'fontFamily': 'Nunito Sans, sans-serif',
+                    'fontSize': '12px',
+                    'whiteSpace': 'normal',
+                    'height': 'auto',
+                    'padding': '4px 6px'
+                },
+                style_header={
+                    'fontWeight': 'bold',
+                    'fontFamily': 'Poppins, sans-serif',
+                    'fontSize': '13px',
+                    'backgroundColor': 'rgba(0,0,0,0.03)'
+                },
+                tooltip_header={
+                    'Position': 'Position in the ingredient list (earlier means higher concentration).'
+                },
+                style_data_conditional=[
+                    {'if': {'filter_query': '{Excluded} = "Yes"'}, 'backgroundColor': '#fff3cd'}
+                ],
+                page_size=20,
+                style_table={'padding': '8px', 'overflowX': 'auto', 'boxSizing': 'border-box'}
+            ))
         return html.Div([
-            html.Div(sunburst_div, className="content-card", style={'marginBottom':'20px', 'height': 'fit-content'})
+            html.Div(swaps_div, className="content-card", style={'marginBottom':'12px'})
         ])
     return html.P(f"Analysis type '{analysis_type}' selected. Content to be built.")
 
+@app.callback(
+    Output('routine-analysis-output-area', 'children'),
+    Input('product-search-dropdown-single', 'value')
+)
+def update_routine_analysis_display(selected_products):
+    """
+    Render the pairwise interaction heatmap and catalog conflicts for the selected routine.
+    
+    Args:
+        selected_products (str/list): Selected product name(s) forming the routine
+        
+    Returns:
+        Div: Dash HTML component containing the routine analysis
+    """
+    if isinstance(selected_products, str):
+        selected_products = [selected_products]
+    routine_names = [name for name in dict.fromkeys(selected_products or []) if name in product_row_by_name]
+    if len(routine_names) < 2:
+        return html.Div([
+            html.P("Select at least two products to check your routine.", style={'color': '#666', 'fontStyle': 'italic'})
+        ])
+
+    row_positions = [product_row_by_name[name] for name in routine_names]
+    conflict_matrix = build_routine_conflict_matrix(row_positions)
+    conflict_counts = conflict_matrix.sum(axis=2)
+    labels = [textwrap.shorten(f"{name} ({df_final['Brand'].iat[pos]})", width=40, placeholder='...') for name, pos in zip(routine_names, row_positions)]
+    hover_rules = [['<br>'.join(get_rule_label(rule) for rule, hit in zip(INTERACTION_RULES, cell) if hit) or 'No interactions'
+                    for cell in row] for row in conflict_matrix]
+
+    fig = go.Figure(go.Heatmap(
+        z=conflict_counts,
+        x=labels,
+        y=labels,
+        customdata=hover_rules,
+        colorscale=[[0, '#e6fff7'], [0.5, '#32c0cf'], [1, '#721c24']],
+        zmin=0,
+        hovertemplate="<b>%{y}</b><br>+ <b>%{x}</b><br>%{customdata}<extra></extra>",
+        colorbar=dict(title='Interactions')
+    ))
+    fig.update_layout(
+        paper_bgcolor="rgba(0,0,0,0)",
+        plot_bgcolor="rgba(0,0,0,0)",
+        font_family="Nunito Sans, sans-serif",
+        font_size=12,
+        height=max(400, 40 * len(labels) + 200),
+        margin=dict(l=10, r=10, t=10, b=10),
+        xaxis=dict(tickangle=-45),
+        yaxis=dict(autorange='reversed')
+    )
+
+    # List each conflicting pair once (upper triangle, including the diagonal)
+    pair_warnings = []
+    for i, j in zip(*np.nonzero(np.triu(conflict_counts))):
+        pair_title = routine_names[i] if i == j else f"{routine_names[i]} + {routine_names[j]}"
+        for rule, hit in zip(INTERACTION_RULES, conflict_matrix[i, j]):
+            if hit:
+                pair_warnings.append(html.Div([
+                    html.Div([
+                        html.I(className="fas fa-exclamation-circle", style={'marginRight': '8px', 'color': '#721c24'}),
+                        html.Strong(pair_title, style={'color': '#721c24'})
+                    ], style={'display': 'flex', 'alignItems': 'center', 'marginBottom': '4px'}),
+                    html.Div(rule['warning'], style={'fontSize': '0.9em', 'color': '#666'})
+                ], style={
+                    'backgroundColor': '#f8d7da',
+                    'border': '1px solid #f5c6cb',
+                    'borderRadius': '4px',
+                    'padding': '12px',
+                    'marginBottom': '8px'
+                }))
+
+    # Catalog products that would add a new conflict to this routine, most loved first
+    catalog_conflicts = find_routine_conflicts_in_catalog(row_positions).any(axis=1)
+    catalog_conflicts[row_positions] = False
+    conflicting_df = df_final.loc[catalog_conflicts, ['Name', 'Brand', 'category', 'n_of_loves']]
+    conflicting_df = conflicting_df.sort_values('n_of_loves', ascending=False, na_position='last').head(25)
+
+    return html.Div([
+        html.Div(
+            dcc.Graph(figure=fig, config={'responsive': True, 'displayModeBar': True, 'displaylogo': False}),
+            className="content-card", style={'marginBottom': '12px'}
+        ),
+        html.Div(pair_warnings or [
+            html.Div("No interaction warnings found between the products in this routine.",
+                style={
+                    'backgroundColor': '#d4edda',
+                    'border': '1px solid #c3e6cb',
+                    'borderRadius': '4px',
+                    'padding': '12px',
+                    'color': '#155724',
+                    'margin': '12px 0'
+                }
+            )
+        ], style={'marginBottom': '12px'}),
+        html.Div([
+            html.H5("Catalog Products That Conflict With This Routine", className="figure-header"),
+            html.P(f"{int(catalog_conflicts.sum())} products in the catalog would add a new interaction to this routine. The most loved are listed below.",
+                   style={'marginBottom': '10px', 'color': '#666'}),
+            dash_table.DataTable(
+                columns=[{"name": c, "id": c} for c in ['Name', 'Brand', 'category']],
+                data=conflicting_df[['Name', 'Brand', 'category']].to_dict('records'),
+                style_cell={
+                    'textAlign': 'left',
+                    'fontFamily': 'Nunito Sans, sans-serif',
+                    'fontSize': '12px',
+                    'whiteSpace': 'normal',
+                    'height': 'auto',
+                    'padding': '4px 6px'
+                },
+                style_header={
+                    'fontWeight': 'bold',
+                    'fontFamily': 'Poppins, sans-serif',
+                    'fontSize': '13px',
+                    'backgroundColor': 'rgba(0,0,0,0.03)'
+                },
+                page_size=10
+            )
+        ], className="content-card")
+    ])
+
+@app.callback(
+    Output('duplicates-output-area', 'children'),
+    Input('duplicates-category-dropdown', 'value')
+)
+def update_duplicates_display(category):
+    """
+    Render the same formula, different price groups of a category.
+
+    Args:
+        category (str): Selected category
+
+    Returns:
+        Div: Dash HTML component containing the groups table
+    """
+    if not category:
+        return html.P("Select a category.", style={'color': '#666', 'fontStyle': 'italic'})
+    groups_df = find_price_spread_groups(category)
+    if groups_df.empty:
+        return html.P(f"No near-identical formulas with different prices were found in {category}.",
+                      style={'color': '#666', 'fontStyle': 'italic'})
+    table_data = [{
+        'Group': int(row['Group']),
+        'Brand': row['Brand'],
+        'Name': row['Name'],
+        'Price': f"${row['Price']:.2f}",
+        'Above Cheapest': f"+${row['Above Cheapest']:.2f}" if row['Above Cheapest'] > 0 else '-'
+    } for row in groups_df.to_dict('records')]
+    return html.Div([
+        html.H5(f"Near-Identical Formulas in {category}", className="figure-header"),
+        html.P(f"{groups_df['Group'].nunique()} groups, cheapest product first within each group.",
+               style={'marginBottom': '10px', 'color': '#666'}),
+        dash_table.DataTable(
+            columns=[{"name": k, "id": k} for k in table_data[0].keys()],
+            data=table_data,
+            style_cell={
+                'textAlign': 'left',
+                'fontFamily': 'Nunito Sans, sans-serif',
+                'fontSize': '12px',
+                'whiteSpace': 'normal',
+                'height': 'auto',
+                'padding': '4px 6px'
+            },
+            style_header={
+                'fontWeight': 'bold',
+                'fontFamily': 'Poppins, sans-serif',
+                'fontSize': '13px',
+                'backgroundColor': 'rgba(0,0,0,0.03)'
+            },
+            tooltip_header={
+                'Group': 'Products with near-identical ingredient lists (estimated Jaccard similarity of at least 0.8).',
+                'Above Cheapest': 'Price relative to the cheapest product in the group.'
+            },
+            style_data_conditional=[
+                {'if': {'filter_query': '{Group} is even'}, 'backgroundColor': 'rgba(0,0,0,0.02)'}
+            ],
+            page_size=20,
+            style_table={'padding': '8px', 'overflowX': 'auto', 'boxSizing': 'border-box'}
+        )
+    ], className="content-card")
+
 @app.callback(
     Output('allergen-dropdown-container', 'style'),
     Input('ia-analysis-type-selector', 'value')
@@ -1215,24 +2179,139 @@ def toggle_allergen_dropdown(analysis_type):
         return {'display': 'block'}
     return {'display': 'none'}
 
-# Add callback to show/hide the distribution group selector
 @app.callback(
-    Output('price-distribution-group-container', 'style'),
-    Input('price-review-plot-type', 'value')
+    Output('similar-options-container', 'style'),
+    Input('ia-analysis-type-selector', 'value')
 )
-def toggle_distribution_group(plot_type):
+def toggle_similar_options(analysis_type):
     """
-    Toggle the visibility of the distribution group selector based on plot type.
+    Toggle the visibility of the cheaper-only option based on analysis type.
     
     Args:
-        plot_type (str): The selected plot type
+        analysis_type (str): The selected analysis type
         
     Returns:
-        dict: Style dictionary for the distribution group container
+        dict: Style dictionary for the similar products options container
     """
-    if plot_type == 'box':
-        return {'display': 'block', 'marginBottom': '20px'}
+    if analysis_type == 'similar_products':
+        return {'display': 'block'}
     return {'display': 'none'}
 
+# Show/hide the distribution group selector in the browser, without a server round-trip
+app.clientside_callback(
+    """
+    function(plotType) {
+        if (plotType === 'box') {
+            return {'display': 'block', 'marginBottom': '20px'};
+        }
+        return {'display': 'none'};
+    }
+    """,
+    Output('price-distribution-group-container', 'style'),
+    Input('price-review-plot-type', 'value')
+)
+
+@app.server.route('/_filter-cache-stats')
+def filter_cache_stats():
+    """
+    Serve the filter result cache's hit/miss statistics as JSON.
+
+    Returns:
+        Response: JSON body from get_filter_cache_stats
+    """
+    return get_filter_cache_stats()
+
+@app.server.route('/_render-cache-stats')
+def render_cache_stats():
+    """
+    Serve the product render cache's hit/miss statistics and memory use as JSON.
+
+    Returns:
+        Response: JSON body from get_render_cache_stats
+    """
+    return get_render_cache_stats(render_cache)
+
+# --- Warm-up and Readiness ---
+# Set once warm_up has run, so a load balancer only routes traffic to warmed workers
+app_ready = threading.Event()
+
+def warm_up(prewarm_products=RENDER_PREWARM_PRODUCTS):
+    """
+    Exercise every view once so the first real request does not pay for first-use costs.
+
+    The catalog and indexes are already loaded when the module is imported. This serves
+    the Dash index, layout and dependencies, renders each tab and one of each figure for
+    the unfiltered catalog, and pre-warms the product render cache. Then it marks the app
+    ready.
+
+    Args:
+        prewarm_products (int): Number of most loved products passed to prewarm_render_cache
+
+    Returns:
+        dict: Seconds spent on each warm-up step
+    """
+    timings = {}
+
+    def run_step(name, func):
+        start = time.perf_counter()
+        result = func()
+        # Serializing also loads plotly's JSON encoder and validators
+        json.dumps(result, cls=plotly.utils.PlotlyJSONEncoder)
+        timings[name] = time.perf_counter() - start
+
+    def serve(path):
+        # Dispatch without Flask's full request cycle, which would mark the app as having
+        # handled a request and stop app.run(debug=True) from registering its dev tools
+        with app.server.test_request_context(path):
+            response = app.server.preprocess_request()
+            if response is None:
+                response = app.server.dispatch_request()
+            return app.server.finalize_request(response).status_code
+
+    for path in ['/', '/_dash-layout', '/_dash-dependencies']:
+        run_step(path, lambda: serve(path))
+    for tab_value in ['reviews-price-tab', 'ingredient-analysis-tab', 'routine-tab', 'duplicates-tab']:
+        run_step(tab_value, lambda: render_main_tab_content(tab_value))
+
+    if not df_final.empty:
+        for plot_type, group_by in [('scatter', 'category'), ('box', 'category'), ('box', 'Brand'), ('ingredients', 'category')]:
+            run_step(f'{plot_type} plot' + (f' by {group_by}' if plot_type == 'box' else ''),
+                     lambda: update_price_review_plot(plot_type, group_by, None, '', None, None, [], [], None, 'all', [], None)[0])
+        detail_rows = np.flatnonzero(np.diff(product_detail_offsets) > 0)
+        if len(detail_rows):
+            product_name = df_final['Name'].iat[detail_rows[0]]
+            for analysis_type in ['allergens_interactions', 'details_functions', 'composition', 'similar_products', 'ingredient_swaps']:
+                run_step(analysis_type, lambda: update_ingredient_analysis_display(product_name, analysis_type, [], [], None))
+            run_step('routine', lambda: update_routine_analysis_display(df_final['Name'].iloc[detail_rows[:2]].tolist()))
+        if categories:
+            run_step('duplicates', lambda: update_duplicates_display(categories[0]))
+    run_step('render cache pre-warm', lambda: prewarm_render_cache(prewarm_products))
+
+    app_ready.set()
+    return timings
+
+@app.server.route('/_ready')
+def readiness():
+    """
+    Report whether the process serving this request has finished its warm-up.
+
+    Under gunicorn, wsgi.py warms up before any worker serves a request (once in the
+    master with preload_app, where the forked workers inherit the ready state), so this
+    answers 200 whenever it is reachable there. It only answers 503 when the module is
+    served without wsgi.py and warm_up has not run or is still running.
+
+    Returns:
+        Response: JSON {'ready': bool, 'pid': int} naming the answering worker process,
+                  with status 200 when ready and 503 before
+    """
+    if app_ready.is_set():
+        return {'ready': True, 'pid': os.getpid()}, 200
+    return {'ready': False, 'pid': os.getpid()}, 503
+
 if __name__ == '__main__':
-    app.run(debug=True)
\ No newline at end of file
+    debug = True
+    # The debug reloader imports this module in a watcher process that never serves
+    # requests; only the reloaded child (WERKZEUG_RUN_MAIN) needs the warm-up
+    if not debug or os.environ.get('WERKZEUG_RUN_MAIN') == 'true':
+        warm_up()
+    app.run(debug=debug)
\ No newline at end of file
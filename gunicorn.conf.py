@@ -0,0 +1,13 @@
+# gunicorn settings for wsgi.py (gunicorn -c gunicorn.conf.py wsgi:server)
+import multiprocessing
+
+bind = '0.0.0.0:8050'
+# Callbacks are CPU-bound numpy/pandas work, so scale with cores rather than threads
+workers = multiprocessing.cpu_count()
+threads = 2
+# Load and warm up the app once in the master; forked workers share the catalog pages
+# and the warmed caches copy-on-write instead of each building their own
+preload_app = True
+# Time for a worker to finish its in-flight requests on reload/shutdown
+graceful_timeout = 30
+timeout = 120
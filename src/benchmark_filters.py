@@ -0,0 +1,161 @@
+import argparse
+import time
+import tracemalloc
+
+import numpy as np
+import pandas as pd
+
+from catalog_store import SKIN_TYPE_COLS, build_ingredient_postings, postings_to_index
+from filter_engine import build_filter_columns, compute_filter_mask
+from ingredient_rules import (
+    ALLERGEN_GROUPS, build_keyword_matcher, get_keyword_patterns, scan_catalog, build_rule_arrays, build_rule_masks
+)
+
+CATEGORIES = ['cleanser', 'eye care', 'face mask', 'moisturizer', 'sun protect', 'treatment']
+PLOT_COLUMNS = ['Name', 'Brand', 'n_of_loves_bin', 'review_score', 'n_of_loves', 'n_of_reviews', 'Price']
+REQUIRED_FIELDS = ['review_score', 'n_of_loves', 'n_of_reviews', 'Price']
+
+def make_synthetic_catalog(num_products, rng, vocabulary_size=5000, brands=300):
+    """
+    Generate a synthetic product catalog shaped like final_products_ingredients.csv.
+
+    Ingredient popularity follows a Zipf-like curve, and the vocabulary includes every
+    allergen and interaction keyword so those filters select realistic fractions of rows.
+
+    Args:
+        num_products (int): Number of products to generate
+        rng (Generator): NumPy random generator
+        vocabulary_size (int): Number of distinct ingredients
+        brands (int): Number of distinct brands
+
+    Returns:
+        tuple: (product DataFrame, ingredient vocabulary, per-product offsets, ingredient ids)
+    """
+    keywords = get_keyword_patterns()
+    vocabulary = np.array(keywords + [f'ingredient {i}' for i in range(vocabulary_size - len(keywords))], dtype=object)
+    # Shuffle so keywords do not all land on the most popular ranks
+    vocabulary = vocabulary[rng.permutation(len(vocabulary))]
+    popularity = 1.0 / np.arange(1, len(vocabulary) + 1)
+    counts = rng.integers(5, 40, size=num_products)
+    offsets = np.zeros(num_products + 1, dtype=np.int64)
+    np.cumsum(counts, out=offsets[1:])
+    ingredient_ids = rng.choice(len(vocabulary), size=offsets[-1], p=popularity / popularity.sum()).astype(np.int32)
+
+    n_of_loves = rng.lognormal(8, 1.5, size=num_products).round()
+    n_of_loves[rng.random(num_products) < 0.05] = np.nan
+    df = pd.DataFrame({
+        'category': pd.Categorical(rng.choice(CATEGORIES, size=num_products)),
+        'Brand': pd.Categorical.from_codes(rng.integers(0, brands, size=num_products), [f'BRAND {i}' for i in range(brands)]),
+        'Name': [f'Product {i}' for i in range(num_products)],
+        'Price': rng.gamma(2.0, 25.0, size=num_products).astype(np.float32),
+        'review_score': rng.uniform(2.5, 5.0, size=num_products).astype(np.float32),
+        'n_of_loves': n_of_loves.astype(np.float32),
+        'n_of_reviews': rng.lognormal(5, 1.5, size=num_products).round().astype(np.float32),
+        'n_of_loves_bin': pd.Categorical(rng.choice(['Very Low', 'Low', 'Medium', 'High', 'Very High'], size=num_products))
+    })
+    for col in SKIN_TYPE_COLS:
+        df[col] = (rng.random(num_products) < 0.6).astype(np.int8)
+    return df, vocabulary, offsets, ingredient_ids
+
+def legacy_filter(df, filter_columns, filter_key):
+    """
+    Filter the way the dashboard did before mask composition: one DataFrame per criterion.
+
+    Args:
+        df (DataFrame): Product catalog
+        filter_columns (dict): Arrays from build_filter_columns (only the index-backed ones are used)
+        filter_key (tuple): Canonical filter key
+
+    Returns:
+        DataFrame: Rows ready for the scatter plot
+    """
+    exclude_list, category_vals, brand_vals, skin_types, clean_product_flag, exclude_allergen_groups, interaction_conflict_mode = filter_key
+    keep_mask = np.ones(len(df), dtype=bool)
+    for ing in exclude_list:
+        if ing in filter_columns['ingredient_index']:
+            keep_mask[filter_columns['ingredient_index'][ing]] = False
+    if exclude_allergen_groups:
+        group_cols = [filter_columns['allergen_group_positions'][key] for key in exclude_allergen_groups]
+        keep_mask &= ~filter_columns['allergen_matrix'][:, group_cols].any(axis=1)
+    filtered_df = df[keep_mask]
+    if category_vals:
+        filtered_df = filtered_df[filtered_df['category'].isin(category_vals)]
+    if brand_vals:
+        filtered_df = filtered_df[filtered_df['Brand'].isin(brand_vals)]
+    if skin_types:
+        filtered_df = filtered_df[filtered_df[list(skin_types)].any(axis=1)]
+    plot_df = filtered_df[filtered_df['review_score'].notna() & filtered_df['n_of_loves'].notna()].copy()
+    return plot_df.dropna(subset=REQUIRED_FIELDS).copy()
+
+def masked_filter(df, filter_columns, filter_key):
+    """
+    Filter by ANDing catalog-wide masks and materializing only the final rows and columns.
+
+    Args:
+        df (DataFrame): Product catalog
+        filter_columns (dict): Arrays from build_filter_columns
+        filter_key (tuple): Canonical filter key
+
+    Returns:
+        DataFrame: Rows ready for the scatter plot
+    """
+    keep_mask = compute_filter_mask(filter_columns, filter_key)
+    keep_mask &= df[REQUIRED_FIELDS].notna().to_numpy().all(axis=1)
+    return df.iloc[np.flatnonzero(keep_mask), df.columns.get_indexer(PLOT_COLUMNS)]
+
+def measure(func, repeats):
+    """
+    Measure median latency and traced peak memory of a zero-argument callable.
+
+    Args:
+        func (callable): Function to measure
+        repeats (int): Number of timed runs
+
+    Returns:
+        tuple: (median seconds, peak bytes allocated during one traced run, last result)
+    """
+    timings = []
+    for _ in range(repeats):
+        start = time.perf_counter()
+        result = func()
+        timings.append(time.perf_counter() - start)
+    tracemalloc.start()
+    func()
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return float(np.median(timings)), peak, result
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark the dashboard filter path on synthetic catalogs.')
+    parser.add_argument('--sizes', type=int, nargs='+', default=[1000, 100000, 1000000],
+                      help='Catalog sizes to benchmark (default: 1000 100000 1000000)')
+    parser.add_argument('--repeats', type=int, default=5,
+                      help='Timed runs per measurement (default: 5)')
+    parser.add_argument('--seed', type=int, default=0,
+                      help='Random seed for the synthetic catalogs (default: 0)')
+    args = parser.parse_args()
+
+    rng = np.random.default_rng(args.seed)
+    matcher = build_keyword_matcher(get_keyword_patterns())
+    rule_masks = build_rule_masks()
+    allergen_group_positions = {key: pos for pos, key in enumerate(ALLERGEN_GROUPS)}
+    filter_key = (('fragrance', 'water'), ('cleanser', 'moisturizer', 'treatment'), (), ('Dry', 'Oily'), False, ('parabens_group',), None)
+
+    print(f"{'products':>10} {'method':>8} {'latency ms':>11} {'peak MB':>9} {'rows':>8}")
+    for num_products in args.sizes:
+        df, vocabulary, offsets, ingredient_ids = make_synthetic_catalog(num_products, rng)
+        posting_offsets, posting_rows = build_ingredient_postings(offsets, ingredient_ids, len(vocabulary))
+        ingredient_index = postings_to_index(vocabulary, posting_offsets, posting_rows)
+        rule_arrays = build_rule_arrays(scan_catalog(ingredient_index, matcher), num_products)
+        has_conflict = ((rule_arrays['interaction_masks'][:, None] & rule_masks) == rule_masks).any(axis=1)
+        filter_columns = build_filter_columns(df, ingredient_index, rule_arrays['allergen_matrix'], allergen_group_positions, has_conflict, SKIN_TYPE_COLS)
+
+        results = {}
+        for method, func in [('legacy', legacy_filter), ('masked', masked_filter)]:
+            latency, peak, results[method] = measure(lambda: func(df, filter_columns, filter_key), args.repeats)
+            print(f"{num_products:>10} {method:>8} {latency * 1000:>11.2f} {peak / 2**20:>9.2f} {len(results[method]):>8}")
+        if not results['legacy'].index.equals(results['masked'].index):
+            raise AssertionError(f"Filter results differ at {num_products} products")
+
+if __name__ == "__main__":
+    main()
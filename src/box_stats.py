@@ -0,0 +1,81 @@
+import numpy as np
+import pandas as pd
+
+# Whiskers reach the most extreme values within this many interquartile ranges of the box
+WHISKER_IQR = 1.5
+
+def sorted_quantile(sorted_values, starts, counts, p):
+    """
+    Interpolate a quantile of every group in a group-sorted array.
+
+    Uses the same rule as plotly.js's default 'linear' quartile method (position
+    n * p - 0.5, clamped to the group), so the boxes match ones plotly computes itself.
+
+    Args:
+        sorted_values (ndarray): float64 values sorted by group, then value
+        starts (ndarray): Start of each group in sorted_values
+        counts (ndarray): Size of each (non-empty) group
+        p (float): Quantile in [0, 1]
+
+    Returns:
+        ndarray: float64 quantile per group
+    """
+    pos = np.clip(counts * p - 0.5, 0, counts - 1)
+    low = np.floor(pos).astype(np.int64)
+    high = np.ceil(pos).astype(np.int64)
+    frac = pos - low
+    return sorted_values[starts + low] * (1 - frac) + sorted_values[starts + high] * frac
+
+def box_plot_stats(labels, values):
+    """
+    Compute box plot statistics of values grouped by label, for precomputed box traces.
+
+    All groups are handled in one sort instead of a per-group loop. Missing labels and
+    values are skipped; groups are returned in order of first appearance.
+
+    Args:
+        labels (array-like): Group label of every value
+        values (array-like): Numeric values
+
+    Returns:
+        tuple: (DataFrame with columns group, count, q1, median, q3, lowerfence and
+                upperfence, one row per non-empty group;
+                int64 ndarray of the positions in values of the outliers, i.e. the
+                points beyond the whiskers, sorted by group then value)
+    """
+    codes, group_names = pd.factorize(pd.Series(labels).reset_index(drop=True))
+    values = np.asarray(values, dtype=np.float64)
+    valid = np.flatnonzero((codes >= 0) & ~np.isnan(values))
+    order = valid[np.lexsort((values[valid], codes[valid]))]
+    counts = np.bincount(codes[order], minlength=len(group_names))
+    present = counts > 0
+    # Renumber the non-empty groups consecutively
+    sorted_codes = (np.cumsum(present) - 1)[codes[order]]
+    sorted_values = values[order]
+    counts = counts[present]
+    starts = np.cumsum(counts) - counts
+
+    q1 = sorted_quantile(sorted_values, starts, counts, 0.25)
+    median = sorted_quantile(sorted_values, starts, counts, 0.5)
+    q3 = sorted_quantile(sorted_values, starts, counts, 0.75)
+    reach = WHISKER_IQR * (q3 - q1)
+    stats = pd.DataFrame({
+        'group': np.asarray(group_names, dtype=object)[present],
+        'count': counts,
+        'q1': q1,
+        'median': median,
+        'q3': q3,
+        'lowerfence': q1,
+        'upperfence': q3
+    })
+    if len(order) == 0:
+        return stats, order.astype(np.int64)
+
+    # Whiskers end at the most extreme values still within reach of the box
+    within_low = sorted_values >= (q1 - reach)[sorted_codes]
+    within_high = sorted_values <= (q3 + reach)[sorted_codes]
+    lowerfence = np.minimum(q1, np.minimum.reduceat(np.where(within_low, sorted_values, np.inf), starts))
+    upperfence = np.maximum(q3, np.maximum.reduceat(np.where(within_high, sorted_values, -np.inf), starts))
+    stats['lowerfence'], stats['upperfence'] = lowerfence, upperfence
+    outliers = (sorted_values < lowerfence[sorted_codes]) | (sorted_values > upperfence[sorted_codes])
+    return stats, order[outliers].astype(np.int64)
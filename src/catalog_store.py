@@ -0,0 +1,454 @@
+import ast
+import json
+import os
+import re
+
+import numpy as np
+import pandas as pd
+
+SNAPSHOT_DIR = 'data/processed/snapshot'
+SNAPSHOT_VERSION = 4
+
+ESSENTIAL_COLS = ['category', 'Brand', 'Name', 'Price', 'Ingredients', 'review_score', 'n_of_loves', 'n_of_reviews', 'paula_ingredient_details']
+NUMERIC_COLS = ['review_score', 'n_of_loves', 'n_of_reviews', 'Price']
+CATEGORICAL_COLS = ['Brand', 'category', 'n_of_loves_bin']
+# Non-numeric columns the dashboard reads; the snapshot drops the other text columns
+# (ingredient strings, standardized names, match keys), which every worker would otherwise
+# load as its own object arrays
+SNAPSHOT_LABEL_COLS = ['Name'] + CATEGORICAL_COLS
+# Semicolon-separated ingredient lists, in order of preference: product_data_prep writes the
+# split list to processed_ingredients and leaves the raw comma-separated label in Ingredients
+INGREDIENT_LIST_COLS = ['processed_ingredients', 'Ingredients']
+SKIN_TYPE_COLS = ['Combination', 'Dry', 'Normal', 'Oily', 'Sensitive']
+NAN_RATING = re.compile(r"(?<='rating': )nan(?=[,}])")
+
+
+def split_ingredients(ingredients_str):
+    """
+    Split a semicolon-separated ingredients string into a list of individual ingredients.
+
+    Args:
+        ingredients_str (str): String containing ingredients separated by semicolons
+
+    Returns:
+        list: List of individual ingredients, stripped and converted to lowercase
+    """
+    if pd.isna(ingredients_str) or not str(ingredients_str).strip(): return []
+    return [ing.strip().lower() for ing in str(ingredients_str).split(';') if ing.strip()]
+
+
+def get_ingredient_lists(df):
+    """
+    Select the column holding each product's semicolon-separated ingredient list.
+
+    Args:
+        df (DataFrame): Product data, e.g. final_products_ingredients.csv
+
+    Returns:
+        Series: The first column of INGREDIENT_LIST_COLS present in df
+    """
+    return df[next(col for col in INGREDIENT_LIST_COLS if col in df.columns)]
+
+
+def split_ingredient_ids(ingredients_series):
+    """
+    Split every product's ingredients and encode them as integer ids in CSR layout.
+
+    Args:
+        ingredients_series (Series): Semicolon-separated ingredient strings, one per product row
+
+    Returns:
+        tuple: (object ndarray vocabulary of normalized ingredient names,
+                int64 ndarray of per-product offsets of length len(ingredients_series) + 1,
+                int32 ndarray of ingredient ids into the vocabulary)
+    """
+    split_lists = ingredients_series.reset_index(drop=True).map(split_ingredients)
+    offsets = np.zeros(len(split_lists) + 1, dtype=np.int64)
+    np.cumsum(split_lists.map(len).to_numpy(), out=offsets[1:])
+    exploded = split_lists.explode().dropna()
+    if exploded.empty:
+        return np.array([], dtype=object), offsets, np.empty(0, dtype=np.int32)
+    ids, vocabulary = pd.factorize(exploded)
+    return np.asarray(vocabulary, dtype=object), offsets, ids.astype(np.int32)
+
+
+def build_ingredient_postings(offsets, ingredient_ids, num_ingredients):
+    """
+    Invert per-product ingredient ids into per-ingredient row postings (CSR layout).
+
+    Args:
+        offsets (ndarray): Per-product offsets into ingredient_ids
+        ingredient_ids (ndarray): Ingredient ids of every product, concatenated
+        num_ingredients (int): Size of the ingredient vocabulary
+
+    Returns:
+        tuple: (int64 ndarray of per-ingredient offsets of length num_ingredients + 1,
+                int32 ndarray of sorted, de-duplicated row positions)
+    """
+    rows = np.repeat(np.arange(len(offsets) - 1, dtype=np.int32), np.diff(offsets))
+    order = np.lexsort((rows, ingredient_ids))
+    codes, rows = ingredient_ids[order], rows[order]
+    # Drop repeats of an ingredient within the same product
+    keep = np.ones(len(rows), dtype=bool)
+    keep[1:] = (codes[1:] != codes[:-1]) | (rows[1:] != rows[:-1])
+    codes, rows = codes[keep], rows[keep]
+    posting_offsets = np.zeros(num_ingredients + 1, dtype=np.int64)
+    np.cumsum(np.bincount(codes, minlength=num_ingredients), out=posting_offsets[1:])
+    return posting_offsets, rows.astype(np.int32)
+
+
+def postings_to_index(vocabulary, posting_offsets, posting_rows):
+    """
+    Expose CSR postings as a dict from ingredient name to its row positions.
+
+    The arrays in the dict are views, so a memory-mapped posting_rows stays shared.
+
+    Args:
+        vocabulary (ndarray): Ingredient names, indexed by ingredient id
+        posting_offsets (ndarray): Per-ingredient offsets into posting_rows
+        posting_rows (ndarray): Row positions of every ingredient, concatenated
+
+    Returns:
+        dict: Mapping of ingredient name to a sorted int32 array of row positions
+    """
+    return {ing: posting_rows[posting_offsets[i]:posting_offsets[i + 1]]
+            for i, ing in enumerate(vocabulary) if posting_offsets[i + 1] > posting_offsets[i]}
+
+
+def parse_paula_details(details_val):
+    """
+    Parse Paula's Choice ingredient details from string or list format into a list of dictionaries.
+
+    Args:
+        details_val (str/list): String representation of list or actual list of ingredient details
+
+    Returns:
+        list: List of dictionaries containing ingredient information
+    """
+    if isinstance(details_val, list):
+        if all(isinstance(item, dict) for item in details_val):
+            return details_val
+        else:
+            return []
+    if isinstance(details_val, str):
+        try:
+            # Missing ratings are written by str() as a bare nan, which literal_eval rejects
+            parsed = ast.literal_eval(NAN_RATING.sub('None', details_val))
+            if isinstance(parsed, list) and all(isinstance(item, dict) for item in parsed):
+                return parsed
+        except Exception:
+            pass
+    return []
+
+
+def format_ratings(ratings):
+    """
+    Normalize ingredient ratings for display: numbers where rated, 'N/A' where missing.
+
+    Args:
+        ratings (Series): Raw ratings (numbers, None/NaN or 'N/A')
+
+    Returns:
+        Series: object Series of floats and 'N/A'
+    """
+    ratings = pd.to_numeric(ratings, errors='coerce')
+    return ratings.astype(object).where(ratings.notna(), 'N/A')
+
+
+def build_ingredient_details_store(details_series):
+    """
+    Parse the Paula's Choice details column once into a normalized, per-ingredient table.
+
+    Each distinct ingredient is stored once with its display-ready fields; products
+    reference their ingredients by integer ids in CSR layout (offsets + flat ids).
+
+    Args:
+        details_series (Series): paula_ingredient_details values, one per product row
+
+    Returns:
+        tuple: (DataFrame with one row per ingredient and columns Ingredient, Rating,
+                Functions, Benefits, Description, categories;
+                int64 ndarray of per-product offsets of length len(details_series) + 1;
+                int32 ndarray of ingredient ids)
+    """
+    detail_id_by_name = {}
+    records = []
+    offsets = np.zeros(len(details_series) + 1, dtype=np.int64)
+    flat_ids = []
+    for row_pos, details_val in enumerate(details_series):
+        for detail in parse_paula_details(details_val):
+            ing_name = detail.get('ingredient_name', detail.get('name', 'N/A'))
+            detail_id = detail_id_by_name.get(ing_name)
+            if detail_id is None:
+                benefits = detail.get('benefits', [])
+                if isinstance(benefits, str):
+                    benefits = [b.strip() for b in benefits.split(';;') if b.strip()]
+                elif isinstance(benefits, list):
+                    benefits = [b for b in benefits if b]
+                desc = detail.get('description', '')
+                parent_cats = detail.get('category', detail.get('categories', []))
+                if isinstance(parent_cats, str):
+                    parent_cats = [c.strip() for c in parent_cats.split(',') if c.strip()]
+                detail_id = detail_id_by_name[ing_name] = len(records)
+                records.append({
+                    'Ingredient': ing_name.capitalize(),
+                    'Rating': detail.get('rating', 'N/A'),
+                    'Functions': detail.get('functions', ''),
+                    'Benefits': ', '.join(benefits) if benefits else 'N/A',
+                    'Description': (desc[:150] + '...' if len(desc)>150 else desc) if desc else 'N/A',
+                    'categories': parent_cats if isinstance(parent_cats, list) else []
+                })
+            flat_ids.append(detail_id)
+        offsets[row_pos + 1] = len(flat_ids)
+    details_table = pd.DataFrame(records, columns=['Ingredient', 'Rating', 'Functions', 'Benefits', 'Description', 'categories'])
+    details_table['Rating'] = format_ratings(details_table['Rating'])
+    return details_table, offsets, np.asarray(flat_ids, dtype=np.int32)
+
+
+def clean_product_frame(df):
+    """
+    Apply the dashboard's column and numeric normalization to a raw product DataFrame.
+
+    Missing essential columns are added, numeric columns are coerced, and zeros in
+    review/popularity/price columns are treated as missing.
+
+    Args:
+        df (DataFrame): Product data as read from final_products_ingredients.csv
+
+    Returns:
+        DataFrame: The same DataFrame, normalized in place
+    """
+    for col in ESSENTIAL_COLS:
+        if col not in df.columns:
+            df[col] = None if col not in NUMERIC_COLS else 0
+
+    for col in NUMERIC_COLS:
+        df[col] = pd.to_numeric(df[col], errors='coerce').fillna(0)
+        df.loc[df[col] == 0, col] = np.nan
+    return df
+
+
+def write_snapshot(df, snapshot_dir=SNAPSHOT_DIR):
+    """
+    Write a typed, memory-mappable snapshot of the product catalog for dashboard workers.
+
+    Every numeric column is stored as its own .npy file under columns/ so workers can map
+    it read-only and share the pages; of the text columns, only SNAPSHOT_LABEL_COLS (Name and
+    the categorical labels) go to Parquet. Ingredient ids, their inverted postings and the pre-parsed Paula's Choice
+    details store are written as CSR .npy arrays, plus a manifest. The Ingredients strings
+    themselves are not stored, since they are recoverable from the vocabulary and ids.
+
+    Args:
+        df (DataFrame): Product data with ingredient lists (see get_ingredient_lists) and
+            paula_ingredient_details columns
+        snapshot_dir (str): Directory to write the snapshot into
+
+    Returns:
+        dict: The manifest that was written
+    """
+    os.makedirs(os.path.join(snapshot_dir, 'columns'), exist_ok=True)
+    products = clean_product_frame(df.copy()).reset_index(drop=True)
+
+    vocabulary, ingredient_offsets, ingredient_ids = split_ingredient_ids(get_ingredient_lists(products))
+    posting_offsets, posting_rows = build_ingredient_postings(ingredient_offsets, ingredient_ids, len(vocabulary))
+    details_table, detail_offsets, detail_ids = build_ingredient_details_store(products['paula_ingredient_details'])
+    products = products.drop(columns=[col for col in products.columns
+                                      if col not in SNAPSHOT_LABEL_COLS and not pd.api.types.is_numeric_dtype(products[col])])
+
+    # Typed columns: categoricals for low-cardinality labels, float32 / int8 for numerics
+    for col in CATEGORICAL_COLS:
+        if col in products.columns:
+            products[col] = products[col].astype('category')
+    for col in products.select_dtypes(include='float64').columns:
+        products[col] = products[col].astype(np.float32)
+    for col in SKIN_TYPE_COLS:
+        if col in products.columns and pd.api.types.is_integer_dtype(products[col]):
+            products[col] = products[col].astype(np.int8)
+    details_table['Rating'] = pd.to_numeric(details_table['Rating'], errors='coerce')
+
+    numeric_cols = [col for col in products.columns if pd.api.types.is_numeric_dtype(products[col]) and not pd.api.types.is_bool_dtype(products[col])]
+    for col in numeric_cols:
+        np.save(os.path.join(snapshot_dir, 'columns', f'{col}.npy'), products[col].to_numpy())
+    products.drop(columns=numeric_cols).to_parquet(os.path.join(snapshot_dir, 'products.parquet'), index=False)
+    details_table.to_parquet(os.path.join(snapshot_dir, 'ingredient_details.parquet'), index=False)
+    pd.DataFrame({'ingredient': vocabulary}).to_parquet(os.path.join(snapshot_dir, 'ingredient_vocabulary.parquet'), index=False)
+    for name, arr in [('ingredient_offsets', ingredient_offsets), ('ingredient_ids', ingredient_ids),
+                      ('posting_offsets', posting_offsets), ('posting_rows', posting_rows),
+                      ('detail_offsets', detail_offsets), ('detail_ids', detail_ids)]:
+        np.save(os.path.join(snapshot_dir, f'{name}.npy'), arr)
+
+    manifest = {
+        'version': SNAPSHOT_VERSION,
+        'num_products': len(products),
+        'num_ingredients': len(vocabulary),
+        'num_ingredient_details': len(details_table),
+        'columns': list(products.columns),
+        'numeric_columns': numeric_cols,
+        'rule_arrays': [],
+        'rules_fingerprint': None
+    }
+    with open(os.path.join(snapshot_dir, 'manifest.json'), 'w') as f:
+        json.dump(manifest, f, indent=2)
+    return manifest
+
+
+def write_rule_arrays(rule_arrays, rules_fingerprint, snapshot_dir=SNAPSHOT_DIR):
+    """
+    Add precomputed per-product rule arrays (allergen matrix, interaction masks) to a snapshot.
+
+    Args:
+        rule_arrays (dict): Mapping of array name to an ndarray with one row per product
+        rules_fingerprint (str): Fingerprint of the rules the arrays were built from
+        snapshot_dir (str): Directory containing a snapshot written by write_snapshot
+
+    Returns:
+        dict: The updated manifest
+    """
+    manifest_path = os.path.join(snapshot_dir, 'manifest.json')
+    with open(manifest_path) as f:
+        manifest = json.load(f)
+    for name, arr in rule_arrays.items():
+        if len(arr) != manifest['num_products']:
+            raise ValueError(f"Rule array '{name}' has {len(arr)} rows, expected {manifest['num_products']}.")
+        np.save(os.path.join(snapshot_dir, f'{name}.npy'), arr)
+    manifest['rule_arrays'] = list(rule_arrays)
+    manifest['rules_fingerprint'] = rules_fingerprint
+    with open(manifest_path, 'w') as f:
+        json.dump(manifest, f, indent=2)
+    return manifest
+
+
+def write_neighbor_table(neighbor_ids, neighbor_scores, snapshot_dir=SNAPSHOT_DIR):
+    """
+    Add a precomputed ingredient-similarity neighbour table to a snapshot.
+
+    Args:
+        neighbor_ids (ndarray): int32 array of shape (num_products, k), -1 for missing neighbours
+        neighbor_scores (ndarray): float32 array of shape (num_products, k) with similarities
+        snapshot_dir (str): Directory containing a snapshot written by write_snapshot
+
+    Returns:
+        dict: The updated manifest
+    """
+    manifest_path = os.path.join(snapshot_dir, 'manifest.json')
+    with open(manifest_path) as f:
+        manifest = json.load(f)
+    if len(neighbor_ids) != manifest['num_products']:
+        raise ValueError(f"Neighbour table has {len(neighbor_ids)} rows, expected {manifest['num_products']}.")
+    np.save(os.path.join(snapshot_dir, 'neighbor_ids.npy'), neighbor_ids)
+    np.save(os.path.join(snapshot_dir, 'neighbor_scores.npy'), neighbor_scores)
+    manifest['neighbor_table_size'] = int(neighbor_ids.shape[1])
+    with open(manifest_path, 'w') as f:
+        json.dump(manifest, f, indent=2)
+    return manifest
+
+
+def write_minhash_signatures(signatures, minhash_params, snapshot_dir=SNAPSHOT_DIR):
+    """
+    Add the MinHash signature column used for near-duplicate detection to a snapshot.
+
+    Args:
+        signatures (ndarray): uint32 array of shape (num_products, num_perm)
+        minhash_params (dict): Parameters the signatures were computed with (num_perm, seed),
+                               so readers can tell whether they match their own settings
+        snapshot_dir (str): Directory containing a snapshot written by write_snapshot
+
+    Returns:
+        dict: The updated manifest
+    """
+    manifest_path = os.path.join(snapshot_dir, 'manifest.json')
+    with open(manifest_path) as f:
+        manifest = json.load(f)
+    if len(signatures) != manifest['num_products']:
+        raise ValueError(f"MinHash signatures have {len(signatures)} rows, expected {manifest['num_products']}.")
+    np.save(os.path.join(snapshot_dir, 'minhash_signatures.npy'), signatures)
+    manifest['minhash_params'] = dict(minhash_params)
+    with open(manifest_path, 'w') as f:
+        json.dump(manifest, f, indent=2)
+    return manifest
+
+
+def write_ingredient_frequencies(frequency_table, snapshot_dir=SNAPSHOT_DIR):
+    """
+    Add the catalog-wide and per-category ingredient frequency table to a snapshot.
+
+    Args:
+        frequency_table (DataFrame): Table from ingredient_stats.ingredient_frequency_table
+        snapshot_dir (str): Directory containing a snapshot written by write_snapshot
+
+    Returns:
+        dict: The updated manifest
+    """
+    manifest_path = os.path.join(snapshot_dir, 'manifest.json')
+    with open(manifest_path) as f:
+        manifest = json.load(f)
+    if len(frequency_table) and frequency_table['ingredient_id'].max() >= manifest['num_ingredients']:
+        raise ValueError(f"Ingredient frequency table references ids beyond the vocabulary of {manifest['num_ingredients']}.")
+    frequency_table.to_parquet(os.path.join(snapshot_dir, 'ingredient_frequencies.parquet'), index=False)
+    manifest['ingredient_frequencies'] = len(frequency_table)
+    with open(manifest_path, 'w') as f:
+        json.dump(manifest, f, indent=2)
+    return manifest
+
+
+def read_snapshot(snapshot_dir=SNAPSHOT_DIR, mmap_mode='r'):
+    """
+    Load a snapshot written by write_snapshot, memory-mapping its arrays.
+
+    With the default read-only mmap_mode, the numeric product columns, CSR arrays and rule
+    arrays are backed by the snapshot files, so several worker processes share one copy
+    in the page cache instead of each holding their own.
+
+    Args:
+        snapshot_dir (str): Directory containing the snapshot
+        mmap_mode (str): Mode passed to np.load, or None to read the arrays into memory
+
+    Returns:
+        dict: 'products' DataFrame, 'ingredient_vocabulary', 'ingredient_offsets',
+              'ingredient_ids', 'posting_offsets', 'posting_rows', 'ingredient_details'
+              DataFrame, 'detail_offsets', 'detail_ids', 'rule_arrays' dict,
+              'rules_fingerprint', 'neighbor_ids'/'neighbor_scores', 'minhash_signatures' and
+              'ingredient_frequencies' DataFrame (None if absent), and 'minhash_params'
+
+    Raises:
+        FileNotFoundError: If the snapshot is missing or was written by another version
+        ImportError: If no Parquet engine (pyarrow) is installed
+    """
+    manifest_path = os.path.join(snapshot_dir, 'manifest.json')
+    if not os.path.exists(manifest_path):
+        raise FileNotFoundError(f"No snapshot found in '{snapshot_dir}'.")
+    with open(manifest_path) as f:
+        manifest = json.load(f)
+    if manifest.get('version') != SNAPSHOT_VERSION:
+        raise FileNotFoundError(f"Snapshot in '{snapshot_dir}' has version {manifest.get('version')}, expected {SNAPSHOT_VERSION}.")
+
+    def load(path):
+        return np.load(os.path.join(snapshot_dir, path), mmap_mode=mmap_mode)
+
+    labels = pd.read_parquet(os.path.join(snapshot_dir, 'products.parquet'))
+    columns = {col: load(os.path.join('columns', f'{col}.npy')) if col in manifest['numeric_columns'] else labels[col]
+               for col in manifest['columns']}
+    # copy=False keeps the numeric columns backed by the mapped files
+    products = pd.DataFrame(columns, copy=False)
+
+    details_table = pd.read_parquet(os.path.join(snapshot_dir, 'ingredient_details.parquet'))
+    details_table['Rating'] = format_ratings(details_table['Rating'])
+    return {
+        'products': products,
+        'ingredient_vocabulary': pd.read_parquet(os.path.join(snapshot_dir, 'ingredient_vocabulary.parquet'))['ingredient'].to_numpy(dtype=object),
+        'ingredient_offsets': load('ingredient_offsets.npy'),
+        'ingredient_ids': load('ingredient_ids.npy'),
+        'posting_offsets': load('posting_offsets.npy'),
+        'posting_rows': load('posting_rows.npy'),
+        'ingredient_details': details_table,
+        'detail_offsets': load('detail_offsets.npy'),
+        'detail_ids': load('detail_ids.npy'),
+        'rule_arrays': {name: load(f'{name}.npy') for name in manifest.get('rule_arrays', [])},
+        'rules_fingerprint': manifest.get('rules_fingerprint'),
+        'neighbor_ids': load('neighbor_ids.npy') if 'neighbor_table_size' in manifest else None,
+        'neighbor_scores': load('neighbor_scores.npy') if 'neighbor_table_size' in manifest else None,
+        'minhash_signatures': load('minhash_signatures.npy') if 'minhash_params' in manifest else None,
+        'minhash_params': manifest.get('minhash_params'),
+        'ingredient_frequencies': pd.read_parquet(os.path.join(snapshot_dir, 'ingredient_frequencies.parquet'))
+                                  if 'ingredient_frequencies' in manifest else None
+    }
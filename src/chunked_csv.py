@@ -0,0 +1,73 @@
+import numpy as np
+import pandas as pd
+
+def merge_dtypes(left, right):
+    """
+    Combine the dtypes two chunks inferred for a column into the dtype of the whole column.
+
+    Args:
+        left (dtype): dtype from one chunk
+        right (dtype): dtype from another chunk
+
+    Returns:
+        dtype: The same dtype, float64 for mixed int/float, otherwise object
+    """
+    if left == right:
+        return left
+    numeric = [pd.api.types.is_numeric_dtype(dtype) and not pd.api.types.is_bool_dtype(dtype) for dtype in (left, right)]
+    return np.dtype(np.float64) if all(numeric) else np.dtype(object)
+
+def scan_csv(path, chunksize, collect=()):
+    """
+    Read a CSV once in chunks to infer its column dtypes and collect a few columns.
+
+    pandas infers dtypes per chunk, so a column that is integer in one chunk and has
+    missing values in another would be written differently from an in-memory run. The
+    merged dtypes are passed back to read_csv so every chunk parses like the whole file.
+
+    Args:
+        path (str): CSV path
+        chunksize (int): Rows per chunk
+        collect (iterable): Columns whose full values are needed (e.g. for quantiles)
+
+    Returns:
+        tuple: (dict column -> dtype, dict column -> Series of the collected values)
+    """
+    dtypes, collected = {}, {col: [] for col in collect}
+    for chunk in pd.read_csv(path, chunksize=chunksize):
+        for col, dtype in chunk.dtypes.items():
+            dtypes[col] = merge_dtypes(dtypes[col], dtype) if col in dtypes else dtype
+        for col in collected:
+            collected[col].append(chunk[col])
+    return dtypes, {col: pd.concat(parts, ignore_index=True) if parts else pd.Series(dtype=np.float64) for col, parts in collected.items()}
+
+def iter_csv_chunks(path, chunksize, dtypes):
+    """
+    Yield a CSV in chunks parsed with fixed dtypes (row labels continue across chunks).
+
+    Args:
+        path (str): CSV path
+        chunksize (int): Rows per chunk
+        dtypes (dict): Column dtypes from scan_csv
+
+    Yields:
+        DataFrame: The next chunk of rows
+    """
+    yield from pd.read_csv(path, chunksize=chunksize, dtype=dtypes)
+
+def write_csv_chunks(chunks, path):
+    """
+    Write DataFrame chunks to one CSV as they arrive, with the header taken from the first.
+
+    Args:
+        chunks (iterable): DataFrames with the same columns
+        path (str): Output CSV path
+
+    Returns:
+        int: Number of rows written
+    """
+    num_rows, first = 0, True
+    for chunk in chunks:
+        chunk.to_csv(path, mode='w' if first else 'a', header=first, index=False)
+        num_rows, first = num_rows + len(chunk), False
+    return num_rows
@@ -0,0 +1,112 @@
+import numpy as np
+import pandas as pd
+
+def encode_labels(series):
+    """
+    Encode a label column as integer codes for mask lookups.
+
+    Args:
+        series (Series): Label values (e.g. category or Brand), one per product row
+
+    Returns:
+        tuple: (int32 ndarray of codes with -1 for missing values, dict mapping label to code)
+    """
+    codes, labels = pd.factorize(series)
+    return codes.astype(np.int32), {label: code for code, label in enumerate(labels)}
+
+def label_mask(codes, code_by_label, selected_labels):
+    """
+    Build a catalog-wide mask of the rows whose label is one of the selected labels.
+
+    Args:
+        codes (ndarray): Label codes from encode_labels
+        code_by_label (dict): Label-to-code mapping from encode_labels
+        selected_labels (iterable): Labels to keep
+
+    Returns:
+        ndarray: Bool mask of length len(codes)
+    """
+    # The extra trailing slot absorbs the -1 code of missing labels
+    lookup = np.zeros(len(code_by_label) + 1, dtype=bool)
+    lookup[[code_by_label[label] for label in selected_labels if label in code_by_label]] = True
+    return lookup[codes]
+
+def build_filter_columns(df, ingredient_index, allergen_matrix, allergen_group_positions, has_conflict, skin_type_cols):
+    """
+    Precompute the per-row arrays every filter criterion is evaluated against.
+
+    Args:
+        df (DataFrame): Product catalog
+        ingredient_index (dict): Mapping of ingredient name to sorted row positions
+        allergen_matrix (ndarray): Bool matrix of shape (len(df), number of allergen groups)
+        allergen_group_positions (dict): Mapping of allergen group key to its matrix column
+        has_conflict (ndarray): Bool array, True for products with an interaction conflict
+        skin_type_cols (list): Skin type indicator columns
+
+    Returns:
+        dict: Arrays and lookups consumed by compute_filter_mask
+    """
+    category_codes, category_lookup = encode_labels(df['category'])
+    brand_codes, brand_lookup = encode_labels(df['Brand'])
+    present_skin_types = [col for col in skin_type_cols if col in df.columns]
+    return {
+        'num_rows': len(df),
+        'ingredient_index': ingredient_index,
+        'allergen_matrix': allergen_matrix,
+        'allergen_group_positions': allergen_group_positions,
+        'has_conflict': has_conflict,
+        'category_codes': category_codes,
+        'category_lookup': category_lookup,
+        'brand_codes': brand_codes,
+        'brand_lookup': brand_lookup,
+        'skin_type_matrix': df[present_skin_types].fillna(0).to_numpy() != 0,
+        'skin_type_positions': {col: pos for pos, col in enumerate(present_skin_types)},
+        'clean': (df['Clean_Product_Boolean'] == 1).to_numpy() if 'Clean_Product_Boolean' in df.columns else None
+    }
+
+def compute_filter_mask(filter_columns, filter_key):
+    """
+    Evaluate every filter criterion as a catalog-wide mask and AND them together.
+
+    No intermediate DataFrames are created; callers materialize only the final rows.
+
+    Args:
+        filter_columns (dict): Arrays from build_filter_columns
+        filter_key (tuple): (exclude ingredients, categories, brands, skin types, clean flag,
+                            allergen groups, interaction conflict mode)
+
+    Returns:
+        ndarray: Bool mask over the catalog rows
+    """
+    exclude_list, category_vals, brand_vals, skin_types, clean_product_flag, exclude_allergen_groups, interaction_conflict_mode = filter_key
+    keep_mask = np.ones(filter_columns['num_rows'], dtype=bool)
+
+    # Excluded ingredients: clear the rows in each ingredient's postings
+    for ing in exclude_list:
+        ing_rows = filter_columns['ingredient_index'].get(ing)
+        if ing_rows is not None:
+            keep_mask[ing_rows] = False
+
+    if exclude_allergen_groups:
+        positions = filter_columns['allergen_group_positions']
+        group_cols = [positions[key] for key in exclude_allergen_groups if key in positions]
+        if group_cols:
+            keep_mask &= ~filter_columns['allergen_matrix'][:, group_cols].any(axis=1)
+
+    if interaction_conflict_mode == 'only':
+        keep_mask &= filter_columns['has_conflict']
+    elif interaction_conflict_mode == 'exclude':
+        keep_mask &= ~filter_columns['has_conflict']
+
+    if category_vals:
+        keep_mask &= label_mask(filter_columns['category_codes'], filter_columns['category_lookup'], category_vals)
+    if brand_vals:
+        keep_mask &= label_mask(filter_columns['brand_codes'], filter_columns['brand_lookup'], brand_vals)
+
+    if skin_types:
+        skin_cols = [filter_columns['skin_type_positions'][col] for col in skin_types]
+        keep_mask &= filter_columns['skin_type_matrix'][:, skin_cols].any(axis=1)
+
+    if clean_product_flag and filter_columns['clean'] is not None:
+        keep_mask &= filter_columns['clean']
+    return keep_mask
@@ -1,28 +1,17 @@
 import pandas as pd
 import numpy as np
 import re
+import argparse
+from catalog_store import SNAPSHOT_DIR, write_snapshot, write_rule_arrays, write_neighbor_table, write_minhash_signatures, write_ingredient_frequencies, read_snapshot, postings_to_index
+from ingredient_rules import build_keyword_matcher, get_keyword_patterns, scan_catalog, build_rule_arrays, rules_fingerprint
+from similarity import build_ingredient_vectors, build_neighbor_table
+from near_duplicates import minhash_signatures, NUM_PERM, MINHASH_SEED
+from ingredient_stats import ingredient_frequency_table
+from chunked_csv import scan_csv, iter_csv_chunks, write_csv_chunks
 
-# Load the data
-print("Loading data...")
-df_paula = pd.read_csv('.../data/raw/Paula_embedding_SUMLIST_before_422.csv', low_memory=False)
-df_final = pd.read_csv('.../data/processed/final_products.csv', low_memory=False)
-df_skincare = pd.read_csv('.../data/processed/skincare_df_cleaned.csv', low_memory=False)
-
-print("\n--- Original DataFrames Info ---")
-print("\nFinal Products DataFrame:")
-print(df_final.info())
-print("\nSkincare DataFrame:")
-print(df_skincare.info())
-
-# Create match keys for merging
-df_skincare['match_key'] = df_skincare['brand_name_std'] + "_" + df_skincare['product_name_std']
-
-# Process Paula's Choice data
-print("\nProcessing Paula's Choice data...")
-
-print(df_paula.head())
-print(df_paula.info())
-print(df_paula.describe(include='all'))
+PAULA_PATH = 'data/raw/Paula_embedding_SUMLIST_before_422.csv'
+PRODUCTS_PATH = 'data/processed/final_products.csv'
+PRODUCTS_INGREDIENTS_PATH = 'data/processed/final_products_ingredients.csv'
 
 # Convert rating to numerical values
 def convert_rating(rating):
@@ -49,28 +38,36 @@ def process_benefits(benefits_str):
     benefits = [benefit.strip() for benefit in str(benefits_str).split(';;')]
     return [benefit for benefit in benefits if benefit]
 
-# Create a dictionary for quick ingredient lookup
-print("Creating ingredient lookup dictionary...")
-ingredient_dict = {}
-for _, row in df_paula.iterrows():
-    ingredient_name = str(row['ingredient_name']).lower().strip()
-    ingredient_dict[ingredient_name] = {
-        'description': row['description'] if pd.notna(row['description']) else '',
-        'functions': row['functions'] if pd.notna(row['functions']) else '',
-        'benefits': process_benefits(row['benefits']),
-        'category': row['categories'] if pd.notna(row['categories']) else '',
-        'rating': convert_rating(row['rating'])
-    }
+def build_ingredient_dict(df_paula):
+    """
+    Create a dictionary for quick ingredient lookup from the Paula's Choice data.
 
-# Process ingredients for each product
-print("\nProcessing product ingredients...")
-def get_ingredient_details(ingredients_str):
+    Args:
+        df_paula (DataFrame): Paula's Choice ingredient data
+
+    Returns:
+        dict: Lowercased ingredient name -> description, functions, benefits, category and rating
+    """
+    print("Creating ingredient lookup dictionary...")
+    ingredient_dict = {}
+    for _, row in df_paula.iterrows():
+        ingredient_name = str(row['ingredient_name']).lower().strip()
+        ingredient_dict[ingredient_name] = {
+            'description': row['description'] if pd.notna(row['description']) else '',
+            'functions': row['functions'] if pd.notna(row['functions']) else '',
+            'benefits': process_benefits(row['benefits']),
+            'category': row['categories'] if pd.notna(row['categories']) else '',
+            'rating': convert_rating(row['rating'])
+        }
+    return ingredient_dict
+
+def get_ingredient_details(ingredients_str, ingredient_dict):
     if pd.isna(ingredients_str):
         return []
-    
+
     # Split ingredients by semicolon
     ingredients = [ing.strip().lower() for ing in ingredients_str.split(';')]
-    
+
     # Look up each ingredient in the dictionary
     ingredient_details = []
     for ing in ingredients:
@@ -79,32 +76,161 @@ def get_ingredient_details(ingredients_str):
                 'name': ing,
                 **ingredient_dict[ing]
             })
-    
+
     return ingredient_details
 
-# Add ingredient details to df_final
-print("Adding ingredient details to products...")
-df_final['paula_ingredient_details'] = df_final['processed_ingredients'].apply(get_ingredient_details)
+def add_ingredient_details(df_final, ingredient_dict, verbose=True):
+    """
+    Attach the Paula's Choice details of every product's ingredients, one row at a time.
+
+    Args:
+        df_final (DataFrame): Rows of the prepared products file
+        ingredient_dict (dict): Lookup from build_ingredient_dict
+        verbose (bool): Print match statistics
+
+    Returns:
+        DataFrame: Rows with 'paula_ingredient_details' and without the 'category_' columns
+    """
+    df_final = df_final.copy()
+    df_final['paula_ingredient_details'] = df_final['processed_ingredients'].apply(get_ingredient_details, ingredient_dict=ingredient_dict)
+    if verbose:
+        print_match_statistics(df_final)
+
+    # Remove all columns that start with 'category_'
+    return df_final.loc[:, ~df_final.columns.str.startswith('category_')]
+
+def print_match_statistics(df_final):
+    """
+    Print how many products and unique ingredients matched the Paula's Choice data.
+
+    Args:
+        df_final (DataFrame): Products with 'paula_ingredient_details' lists
+    """
+    print("\n--- Statistics ---")
+    total_products = len(df_final)
+    products_with_ingredients = df_final['paula_ingredient_details'].apply(len).gt(0).sum()
+    print(f"Total products: {total_products}")
+    print(f"Products with matched ingredients: {products_with_ingredients}")
+    if total_products:
+        print(f"Percentage of products with matched ingredients: {(products_with_ingredients/total_products)*100:.2f}%")
+
+    # Count total unique ingredients matched
+    all_matched_ingredients = set()
+    for details in df_final['paula_ingredient_details']:
+        all_matched_ingredients.update(d['name'] for d in details)
+    print(f"\nTotal unique ingredients matched with Paula's Choice data: {len(all_matched_ingredients)}")
+
+def stream_ingredient_details(chunks, ingredient_dict):
+    """
+    Attach ingredient details chunk by chunk, so only one chunk's lists of dicts exist at a time.
+
+    Args:
+        chunks (iterable): DataFrame chunks of the prepared products file
+        ingredient_dict (dict): Lookup from build_ingredient_dict
+
+    Yields:
+        DataFrame: Each chunk with 'paula_ingredient_details', as add_ingredient_details returns it
+    """
+    for chunk in chunks:
+        yield add_ingredient_details(chunk, ingredient_dict, verbose=False)
+
+def export_snapshot(df_final, snapshot_dir=SNAPSHOT_DIR):
+    """
+    Export the typed columnar snapshot and its precomputed arrays for the dashboard.
+
+    Args:
+        df_final (DataFrame): Final products with ingredient details
+        snapshot_dir (str): Snapshot directory
+    """
+    # Export a typed columnar snapshot so the dashboard can skip CSV parsing at startup
+    print("\nExporting dashboard snapshot...")
+    manifest = write_snapshot(df_final, snapshot_dir)
+    print(f"Snapshot written: {manifest['num_products']} products, {manifest['num_ingredients']} unique ingredients")
+
+    # Precompute the allergen/interaction arrays once so dashboard workers can map them read-only
+    snapshot = read_snapshot(snapshot_dir)
+    ingredient_index = postings_to_index(snapshot['ingredient_vocabulary'], snapshot['posting_offsets'], snapshot['posting_rows'])
+    keyword_rows = scan_catalog(ingredient_index, build_keyword_matcher(get_keyword_patterns()))
+    write_rule_arrays(build_rule_arrays(keyword_rows, manifest['num_products']), rules_fingerprint(), snapshot_dir)
+    print("Allergen and interaction arrays written")
+
+    # Precompute each product's most similar formulas for the dupe finder
+    ingredient_vectors = build_ingredient_vectors(snapshot['ingredient_offsets'], snapshot['ingredient_ids'], len(snapshot['ingredient_vocabulary']))
+    write_neighbor_table(*build_neighbor_table(ingredient_vectors, k=20), snapshot_dir)
+    print("Similar-product neighbour table written")
+
+    # MinHash signatures of every ingredient set for near-duplicate formula detection
+    signatures = minhash_signatures(snapshot['ingredient_offsets'], snapshot['ingredient_ids'], len(snapshot['ingredient_vocabulary']))
+    write_minhash_signatures(signatures, {'num_perm': NUM_PERM, 'seed': MINHASH_SEED}, snapshot_dir)
+    print("MinHash signatures written")
+
+    # Global and per-category ingredient frequencies for the dashboard's top-ingredients chart
+    frequency_table = ingredient_frequency_table(snapshot['ingredient_vocabulary'], snapshot['ingredient_offsets'],
+                                                 snapshot['ingredient_ids'], snapshot['products']['category'])
+    write_ingredient_frequencies(frequency_table, snapshot_dir)
+    print(f"Ingredient frequencies written: {len(frequency_table)} (category, ingredient) rows")
+
+def main():
+    parser = argparse.ArgumentParser(description="Add Paula's Choice ingredient details and export the dashboard snapshot.")
+    parser.add_argument('--paula', default=PAULA_PATH,
+                      help=f"Paula's Choice ingredient CSV (default: {PAULA_PATH})")
+    parser.add_argument('--input', default=PRODUCTS_PATH,
+                      help=f'Prepared products CSV (default: {PRODUCTS_PATH})')
+    parser.add_argument('--output', default=PRODUCTS_INGREDIENTS_PATH,
+                      help=f'Products with ingredient details CSV (default: {PRODUCTS_INGREDIENTS_PATH})')
+    parser.add_argument('--snapshot-dir', default=SNAPSHOT_DIR,
+                      help=f'Dashboard snapshot directory (default: {SNAPSHOT_DIR})')
+    parser.add_argument('--chunksize', type=int, default=None,
+                      help='Stream the products in chunks of this many rows to bound memory; implies --skip-snapshot (default: load them all)')
+    parser.add_argument('--skip-snapshot', action='store_true',
+                      help='Only write the CSV, without exporting the dashboard snapshot')
+    args = parser.parse_args()
+
+    # Load the data
+    print("Loading data...")
+    df_paula = pd.read_csv(args.paula, low_memory=False)
+
+    if args.chunksize:
+        # Streaming mode: only one chunk's ingredient details are held in memory at a time
+        ingredient_dict = build_ingredient_dict(df_paula)
+        print(f"\nStreaming products in chunks of {args.chunksize} rows...")
+        dtypes, _ = scan_csv(args.input, args.chunksize)
+        num_rows = write_csv_chunks(stream_ingredient_details(iter_csv_chunks(args.input, args.chunksize, dtypes), ingredient_dict), args.output)
+        print(f"Saved {num_rows} products to '{args.output}'")
+        # The snapshot covers the whole catalog at once, so building it here would undo
+        # the bounded memory of streaming; chunked mode always implies --skip-snapshot
+        print("Snapshot export skipped in streaming mode; run without --chunksize to export it")
+        print("\nData preparation complete!")
+        return
+
+    df_final = pd.read_csv(args.input, low_memory=False)
+
+    print("\n--- Original DataFrames Info ---")
+    print("\nFinal Products DataFrame:")
+    print(df_final.info())
+
+    # Process Paula's Choice data
+    print("\nProcessing Paula's Choice data...")
+
+    print(df_paula.head())
+    print(df_paula.info())
+    print(df_paula.describe(include='all'))
+
+    ingredient_dict = build_ingredient_dict(df_paula)
 
-# Print some statistics
-print("\n--- Statistics ---")
-total_products = len(df_final)
-products_with_ingredients = df_final['paula_ingredient_details'].apply(len).gt(0).sum()
-print(f"Total products: {total_products}")
-print(f"Products with matched ingredients: {products_with_ingredients}")
-print(f"Percentage of products with matched ingredients: {(products_with_ingredients/total_products)*100:.2f}%")
+    # Process ingredients for each product
+    print("\nProcessing product ingredients...")
+    print("Adding ingredient details to products...")
+    df_final = add_ingredient_details(df_final, ingredient_dict)
 
-# Count total unique ingredients matched
-all_matched_ingredients = set()
-for details in df_final['paula_ingredient_details']:
-    all_matched_ingredients.update(d['name'] for d in details)
-print(f"\nTotal unique ingredients matched with Paula's Choice data: {len(all_matched_ingredients)}")
+    # Save the processed data
+    print("\nSaving processed data...")
+    df_final.to_csv(args.output, index=False)
 
-# Remove all columns that start with 'category_'
-df_final = df_final.loc[:, ~df_final.columns.str.startswith('category_')]
+    if not args.skip_snapshot:
+        export_snapshot(df_final, args.snapshot_dir)
 
-# Save the processed data
-print("\nSaving processed data...")
-df_final.to_csv('/Users/alexvalone/Desktop/Data_Science/DS_Q3/Visualization/skincare_project/data/final_products_ingredients.csv', index=False)
+    print("\nData preparation complete!")
 
-print("\nData preparation complete!")
+if __name__ == "__main__":
+    main()
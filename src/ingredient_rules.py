@@ -0,0 +1,283 @@
+import hashlib
+import json
+from collections import deque
+
+import numpy as np
+
+ALLERGEN_GROUPS = {
+    'fragrance_parfum': ['fragrance', 'parfum'],
+    'fragrance_components': ['linalool', 'limonene', 'citronellol', 'geraniol', 'citral', 'eugenol', 'coumarin', 'farnesol', 'hexyl cinnamal', 'hydroxycitronellal', 'isoeugenol', 'benzyl alcohol', 'benzyl benzoate', 'benzyl salicylate', 'anisyl alcohol', 'amyl cinnamal', 'cinnamyl alcohol', 'cinnamal', 'alpha-isomethyl ionone', 'methyl 2-octynoate', 'evernia prunastri', 'evernia furfuracea'],
+    'parabens_group': ['paraben', 'methylparaben', 'ethylparaben', 'propylparaben', 'butylparaben', 'isobutylparaben', 'isopropylparaben'],
+    'sulfates_group': ['sodium lauryl sulfate', 'sodium laureth sulfate', 'sls', 'sles', 'ammonium lauryl sulfate', 'ammonium laureth sulfate', 'als', 'ales', 'sodium C14-16 olefin sulfonate'],
+    'drying_alcohols': ['alcohol denat.', 'sd alcohol', 'ethanol', 'isopropyl alcohol', 'alcohol'],
+    'silicones_group': ['dimethicone', 'cyclomethicone', 'cyclopentasiloxane', 'cyclohexasiloxane','dimethiconol', 'phenyl trimethicone', 'amodimethicone', 'cyclotetrasiloxane','cetyl dimethicone', 'dimethicone copolyol', 'stearyl dimethicone', '-siloxane', '-cone'],
+    'chemical_sunscreens_group': ['oxybenzone', 'avobenzone', 'octinoxate', 'ethylhexyl methoxycinnamate', 'octisalate', 'ethylhexyl salicylate', 'homosalate', 'octocrylene', 'benzophenone-3', 'benzophenone-4', 'ensulizole', 'phenylbenzimidazole sulfonic acid', 'ecamsule', 'terephthalylidene dicamphor sulfonic acid', 'drometrizole trisiloxane'],
+    'formaldehyde_releasers_group': ['dmdm hydantoin', 'imidazolidinyl urea', 'diazolidinyl urea', 'quaternium-15', 'bronopol', '2-bromo-2-nitropropane-1,3-diol', '5-bromo-5-nitro-1,3-dioxane','sodium hydroxymethylglycinate', 'methenamine', 'benzylhemiformal'],
+    'mi_mci_group': ['methylisothiazolinone', 'mi', 'mit', 'methylchloroisothiazolinone', 'mci', 'mcit', 'cmIT'],
+    'propylene_glycol_group': ['propylene glycol', 'pg', '1,2-propanediol'],
+    'cocamidopropyl_betaine_group': ['cocamidopropyl betaine', 'capb'],
+    'phenoxyethanol_group': ['phenoxyethanol'],
+    'lanolin_group': ['lanolin', 'lanolin alcohol', 'adeps lanae', 'lanolin cera', 'lanolin oil', 'hydrogenated lanolin', 'wool fat', 'wool wax'],
+    'artificial_colorants_group': ['ci 19140', 'ci 42090', 'ci 16035', 'ci 17200', 'ci 60730', 'ci 15850', 'ci 45410','fd&c yellow no. 5', 'fd&c blue no. 1', 'fd&c red no. 40','d&c red no. 33', 'ext. d&c violet no. 2', 'd&c red no. 6', 'd&c red no. 27','yellow 5', 'blue 1', 'red 40', 'red 33', 'violet 2', 'red 6', 'red 27'],
+    'mineral_oil_petrolatum_group': ['mineral oil', 'paraffinum liquidum', 'liquid paraffin', 'huile minerale','petrolatum', 'white petrolatum', 'petroleum jelly', 'vaseline'],
+    'talc_group': ['talc', 'talcum powder', 'cosmetic talc'],
+    'bha_bht_group': ['bha', 'butylated hydroxyanisole', 'bht', 'butylated hydroxytoluene']
+}
+INTERACTION_RULES = [
+    {'ingredients': ['retinol', 'glycolic acid'], 'warning': 'Interaction: Retinol + Glycolic Acid (AHA).'},
+    {'ingredients': ['retinol', 'salicylic acid'], 'warning': 'Interaction: Retinol + Salicylic Acid (BHA).'},
+    {'ingredients': ['ascorbic acid', 'niacinamide'], 'warning': 'Interaction: Vit C (Ascorbic) + Niacinamide.'},
+    {'ingredients': ['benzoyl peroxide', 'retinol'], 'warning': 'Interaction: Benzoyl Peroxide + Retinol (and other retinoids like tretinoin, adapalene). Can deactivate each other (especially tretinoin) and increase irritation. Some forms of adapalene are stable with BPO. Generally best to alternate (e.g., BPO in AM, Retinol in PM) or use specialized combination products.'},
+    {'ingredients': ['benzoyl peroxide', 'tretinoin'], 'warning': 'Interaction: Benzoyl Peroxide + Tretinoin. High risk of deactivation of tretinoin and increased irritation. Avoid simultaneous use unless specifically formulated together.'},
+    {'ingredients': ['benzoyl peroxide', 'adapalene'], 'warning': 'Interaction: Benzoyl Peroxide + Adapalene. Generally more stable together than BPO + other retinoids, but still potential for irritation. Often formulated together in products like Epiduo.'},
+    {'ingredients': ['ascorbic acid', 'glycolic acid'], 'warning': 'Interaction: Vit C (L-Ascorbic Acid forms) + Glycolic Acid (AHA). Potential for increased irritation, photosensitivity, and compromised skin barrier, especially at high concentrations or low pH. Use with caution, ensure stable formulations, or alternate.'},
+    {'ingredients': ['ascorbic acid', 'lactic acid'], 'warning': 'Interaction: Vit C (L-Ascorbic Acid forms) + Lactic Acid (AHA). Potential for increased irritation, photosensitivity, and compromised skin barrier. Use with caution or alternate.'},
+    {'ingredients': ['ascorbic acid', 'salicylic acid'], 'warning': 'Interaction: Vit C (L-Ascorbic Acid forms) + Salicylic Acid (BHA). Potential for increased irritation and dryness. Use with caution or alternate.'},
+    {'ingredients': ['copper peptides', 'ascorbic acid'], 'warning': 'Interaction: Copper Peptides + Vit C (Direct forms like L-Ascorbic Acid). May oxidize and reduce efficacy of both ingredients. Best to use at different times of day or use Vitamin C derivatives.'},
+    {'ingredients': ['benzoyl peroxide', 'ascorbic acid'], 'warning': 'Interaction: Benzoyl Peroxide + Vit C (L-Ascorbic Acid). Benzoyl peroxide can oxidize L-Ascorbic Acid, reducing its effectiveness. Apply at different times of day.'},
+    {'ingredients': ['retinol', 'ascorbic acid'], 'warning': 'Interaction: Retinol + Vit C (L-Ascorbic Acid). Can increase irritation due to different pH requirements for optimal stability/penetration and combined exfoliant effects. Often recommended to use at different times of day (e.g., Vit C in AM, Retinol in PM).'},
+    {'ingredients': ['alpha hydroxy acid', 'beta hydroxy acid'], 'warning': 'Interaction: AHA (e.g., Glycolic, Lactic) + BHA (Salicylic Acid). Using multiple strong exfoliants together can lead to over-exfoliation, irritation, and damaged skin barrier. Introduce slowly and monitor skin response; often better to alternate.'}
+]
+# Groups whose keywords must equal the whole ingredient; as substrings 'alcohol' and
+# 'ethanol' would also flag fatty alcohols ('cetyl alcohol') and 'phenoxyethanol'
+EXACT_MATCH_GROUPS = ['drying_alcohols']
+# Keywords up to this length are abbreviations ('mi', 'pg', 'bha') and only match whole words
+WORD_MATCH_MAX_LENGTH = 4
+
+def get_keyword_match_mode(keyword):
+    """
+    Decide how a keyword has to sit inside an ingredient name to count as a match.
+
+    Args:
+        keyword (str): Allergen keyword or interaction rule ingredient
+
+    Returns:
+        str: 'exact' (whole ingredient), 'suffix' (a '-cone' style keyword, matching the
+             end of a word), 'word' (whole word) or 'substring'
+    """
+    if any(keyword in ALLERGEN_GROUPS[group] for group in EXACT_MATCH_GROUPS):
+        return 'exact'
+    if keyword.startswith('-'):
+        return 'suffix'
+    if len(keyword) <= WORD_MATCH_MAX_LENGTH:
+        return 'word'
+    return 'substring'
+
+def is_word_boundary(text, pos):
+    """
+    Check whether a position lies outside the text or on a non-alphanumeric character.
+
+    Args:
+        text (str): Scanned string
+        pos (int): Position just before or just after a match
+
+    Returns:
+        bool: True if a word cannot continue across this position
+    """
+    return pos < 0 or pos >= len(text) or not text[pos].isalnum()
+
+def build_keyword_matcher(patterns):
+    """
+    Compile keywords into a single Aho-Corasick automaton for multi-pattern search.
+
+    Each pattern keeps the match mode from get_keyword_match_mode, which scan_keywords
+    checks against the characters around every hit. Suffix patterns are compiled
+    without their leading '-'.
+
+    Args:
+        patterns (list): Keywords to search for (matched case-sensitively, as given)
+
+    Returns:
+        dict: Automaton with 'patterns', 'modes', 'lengths' (compiled pattern lengths),
+              'goto' (per-state transition dicts), 'fail' (failure links) and
+              'outputs' (pattern ids ending at each state)
+    """
+    modes = [get_keyword_match_mode(pattern) for pattern in patterns]
+    compiled = [pattern[1:] if mode == 'suffix' else pattern for pattern, mode in zip(patterns, modes)]
+    goto, fail, outputs = [{}], [0], [[]]
+    for pattern_id, pattern in enumerate(compiled):
+        state = 0
+        for ch in pattern:
+            next_state = goto[state].get(ch)
+            if next_state is None:
+                next_state = len(goto)
+                goto.append({})
+                fail.append(0)
+                outputs.append([])
+                goto[state][ch] = next_state
+            state = next_state
+        outputs[state].append(pattern_id)
+
+    # Breadth-first pass to set failure links; each state inherits the outputs of its fallback
+    queue = deque(goto[0].values())
+    while queue:
+        state = queue.popleft()
+        for ch, next_state in goto[state].items():
+            queue.append(next_state)
+            fallback = fail[state]
+            while fallback and ch not in goto[fallback]:
+                fallback = fail[fallback]
+            fail[next_state] = goto[fallback].get(ch, 0)
+            outputs[next_state] = outputs[next_state] + outputs[fail[next_state]]
+    return {'patterns': list(patterns), 'modes': modes, 'lengths': [len(pattern) for pattern in compiled],
+            'goto': goto, 'fail': fail, 'outputs': outputs}
+
+def scan_keywords(matcher, text):
+    """
+    Find every compiled keyword that occurs in the text under its match mode, in one pass.
+
+    Args:
+        matcher (dict): Automaton from build_keyword_matcher
+        text (str): String to scan (e.g. a single normalized ingredient)
+
+    Returns:
+        set: Ids of the patterns found in the text
+    """
+    goto, fail, outputs = matcher['goto'], matcher['fail'], matcher['outputs']
+    modes, lengths = matcher['modes'], matcher['lengths']
+    state = 0
+    found = set()
+    for end, ch in enumerate(text):
+        while state and ch not in goto[state]:
+            state = fail[state]
+        state = goto[state].get(ch, 0)
+        for pattern_id in outputs[state]:
+            mode = modes[pattern_id]
+            start = end - lengths[pattern_id] + 1
+            if mode == 'substring':
+                found.add(pattern_id)
+            elif mode == 'exact':
+                if start == 0 and end == len(text) - 1:
+                    found.add(pattern_id)
+            elif is_word_boundary(text, end + 1) and (
+                    is_word_boundary(text, start - 1) if mode == 'word' else not is_word_boundary(text, start - 1)):
+                found.add(pattern_id)
+    return found
+
+def get_keyword_patterns():
+    """
+    Collect every allergen keyword and interaction rule ingredient as matcher patterns.
+
+    Allergen keywords are kept as written, interaction rule ingredients are lowercased,
+    mirroring how each is compared against the lowercased product ingredients.
+
+    Returns:
+        list: Unique patterns in first-seen order
+    """
+    patterns = [kw for keywords in ALLERGEN_GROUPS.values() for kw in keywords]
+    patterns += [rule_ing.lower() for rule in INTERACTION_RULES for rule_ing in rule['ingredients']]
+    return list(dict.fromkeys(patterns))
+
+def scan_catalog(index, matcher):
+    """
+    Run the keyword matcher over the whole catalog in one batch.
+
+    Each unique ingredient in the index is scanned once and its hits are spread to the
+    products that contain it, so cost follows vocabulary size rather than catalog size.
+
+    Args:
+        index (dict): Inverted ingredient index, mapping ingredient name to row positions
+        matcher (dict): Automaton from build_keyword_matcher
+
+    Returns:
+        dict: Mapping of each matched pattern to a sorted array of row positions
+    """
+    pattern_postings = {}
+    for ing, ing_rows in index.items():
+        for pattern_id in scan_keywords(matcher, ing):
+            pattern_postings.setdefault(pattern_id, []).append(ing_rows)
+    return {matcher['patterns'][pattern_id]: np.unique(np.concatenate(postings))
+            for pattern_id, postings in pattern_postings.items()}
+
+def build_allergen_matrix(keyword_rows, num_rows):
+    """
+    Precompute which allergen groups each product contains.
+
+    Args:
+        keyword_rows (dict): Mapping of keyword to row positions, from scan_catalog
+        num_rows (int): Number of product rows in the catalog
+
+    Returns:
+        ndarray: Bool matrix of shape (num_rows, len(ALLERGEN_GROUPS))
+    """
+    matrix = np.zeros((num_rows, len(ALLERGEN_GROUPS)), dtype=bool)
+    for group_pos, keywords in enumerate(ALLERGEN_GROUPS.values()):
+        for keyword in keywords:
+            if keyword in keyword_rows:
+                matrix[keyword_rows[keyword], group_pos] = True
+    return matrix
+
+def get_rule_ingredient_bits():
+    """
+    Assign one bit to each distinct ingredient used by INTERACTION_RULES.
+
+    Returns:
+        dict: Mapping of lowercase rule ingredient to its uint64 bit
+
+    Raises:
+        ValueError: If the rules use more distinct ingredients than fit in a uint64 mask
+    """
+    rule_ingredients = list(dict.fromkeys(rule_ing.lower() for rule in INTERACTION_RULES for rule_ing in rule['ingredients']))
+    if len(rule_ingredients) > 64:
+        raise ValueError(f"INTERACTION_RULES use {len(rule_ingredients)} distinct ingredients; at most 64 fit in a mask.")
+    return {rule_ing: np.uint64(1) << np.uint64(bit) for bit, rule_ing in enumerate(rule_ingredients)}
+
+def build_rule_masks():
+    """
+    Encode each rule in INTERACTION_RULES as the mask of the ingredients it needs.
+
+    Returns:
+        ndarray: uint64 array with one mask per rule in INTERACTION_RULES
+    """
+    bits = get_rule_ingredient_bits()
+    rule_masks = np.zeros(len(INTERACTION_RULES), dtype=np.uint64)
+    for rule_pos, rule in enumerate(INTERACTION_RULES):
+        for rule_ing in rule['ingredients']:
+            rule_masks[rule_pos] |= bits[rule_ing.lower()]
+    return rule_masks
+
+def build_interaction_masks(keyword_rows, num_rows):
+    """
+    Precompute each product's INTERACTION_RULES ingredients as a bitmask.
+
+    Args:
+        keyword_rows (dict): Mapping of keyword to row positions, from scan_catalog
+        num_rows (int): Number of product rows in the catalog
+
+    Returns:
+        ndarray: uint64 array of per-product ingredient masks, comparable with build_rule_masks
+    """
+    product_masks = np.zeros(num_rows, dtype=np.uint64)
+    for rule_ing, bit in get_rule_ingredient_bits().items():
+        if rule_ing in keyword_rows:
+            product_masks[keyword_rows[rule_ing]] |= bit
+    return product_masks
+
+def build_rule_arrays(keyword_rows, num_rows):
+    """
+    Build the per-product arrays derived from ALLERGEN_GROUPS and INTERACTION_RULES.
+
+    Args:
+        keyword_rows (dict): Mapping of keyword to row positions, from scan_catalog
+        num_rows (int): Number of product rows in the catalog
+
+    Returns:
+        dict: 'allergen_matrix' bool ndarray and 'interaction_masks' uint64 ndarray
+    """
+    return {
+        'allergen_matrix': build_allergen_matrix(keyword_rows, num_rows),
+        'interaction_masks': build_interaction_masks(keyword_rows, num_rows)
+    }
+
+def rules_fingerprint():
+    """
+    Hash ALLERGEN_GROUPS, INTERACTION_RULES ingredients and the keyword match modes, to
+    detect stale precomputed matrices.
+
+    Returns:
+        str: Hex digest that changes whenever a keyword, group, rule ingredient or match mode changes
+    """
+    patterns = get_keyword_patterns()
+    payload = json.dumps([ALLERGEN_GROUPS, [rule['ingredients'] for rule in INTERACTION_RULES],
+                          dict(zip(patterns, map(get_keyword_match_mode, patterns)))])
+    return hashlib.sha256(payload.encode('utf-8')).hexdigest()
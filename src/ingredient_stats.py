@@ -0,0 +1,139 @@
+import numpy as np
+import pandas as pd
+
+# Category label of the catalog-wide rows in the frequency table
+ALL_CATEGORIES = '(all)'
+
+def gather_rows(offsets, row_positions):
+    """
+    Collect the CSR entries of a subset of products.
+
+    Args:
+        offsets (ndarray): Per-product offsets into the flat ingredient ids
+        row_positions (ndarray): Row positions of the products to collect
+
+    Returns:
+        tuple: (int64 ndarray of positions into the flat ingredient ids,
+                int64 ndarray with the index into row_positions of each entry)
+    """
+    row_positions = np.asarray(row_positions, dtype=np.int64)
+    starts, lengths = offsets[row_positions], offsets[row_positions + 1] - offsets[row_positions]
+    entry_rows = np.repeat(np.arange(len(row_positions)), lengths)
+    # Position of every entry = its row's start + its rank within the row
+    entry_starts = np.cumsum(lengths) - lengths
+    return starts[entry_rows] + np.arange(len(entry_rows)) - entry_starts[entry_rows], entry_rows
+
+def unique_pairs(rows, ids, num_ingredients):
+    """
+    Drop repeated (product, ingredient) entries, e.g. an ingredient listed twice.
+
+    Args:
+        rows (ndarray): int64 row of every entry
+        ids (ndarray): int64 ingredient id of every entry
+        num_ingredients (int): Size of the ingredient vocabulary
+
+    Returns:
+        tuple: (rows, ingredient ids) of the distinct pairs, sorted by row then id
+    """
+    num_ingredients = max(num_ingredients, 1)
+    pair_keys = np.sort(rows * num_ingredients + ids)
+    first = np.ones(len(pair_keys), dtype=bool)
+    first[1:] = pair_keys[1:] != pair_keys[:-1]
+    return pair_keys[first] // num_ingredients, pair_keys[first] % num_ingredients
+
+def count_ingredients(offsets, ingredient_ids, num_ingredients, row_positions=None):
+    """
+    Count how often each ingredient is listed and how many products list it.
+
+    Args:
+        offsets (ndarray): Per-product offsets into ingredient_ids (CSR layout)
+        ingredient_ids (ndarray): Ingredient ids of every product, concatenated
+        num_ingredients (int): Size of the ingredient vocabulary
+        row_positions (ndarray): Optional products to count (all products if None)
+
+    Returns:
+        tuple: (int64 ndarray of occurrences, int64 ndarray of document frequencies),
+               both of length num_ingredients
+    """
+    if row_positions is None:
+        ids = np.asarray(ingredient_ids, dtype=np.int64)
+        rows = np.repeat(np.arange(len(offsets) - 1), np.diff(offsets))
+    else:
+        entries, rows = gather_rows(offsets, row_positions)
+        ids = np.asarray(ingredient_ids[entries], dtype=np.int64)
+    # A product listing an ingredient twice counts once towards its document frequency
+    _, unique_ids = unique_pairs(rows, ids, num_ingredients)
+    return np.bincount(ids, minlength=num_ingredients), np.bincount(unique_ids, minlength=num_ingredients)
+
+def ingredient_frequency_table(vocabulary, offsets, ingredient_ids, categories):
+    """
+    Compute catalog-wide and per-category ingredient frequencies.
+
+    Every product's entries are counted once in a (category, ingredient) bincount, so the
+    work is linear in the total number of listed ingredients.
+
+    Args:
+        vocabulary (ndarray): Ingredient names by id
+        offsets (ndarray): Per-product offsets into ingredient_ids (CSR layout)
+        ingredient_ids (ndarray): Ingredient ids of every product, concatenated
+        categories (Series): Category of every product (missing categories only count
+            towards the catalog-wide rows)
+
+    Returns:
+        DataFrame: One row per category and listed ingredient with columns category
+                   (ALL_CATEGORIES for the whole catalog), ingredient_id, ingredient,
+                   occurrences, document_frequency and num_products (products in the
+                   category), most common first within each category
+    """
+    num_ingredients = len(vocabulary)
+    codes, category_names = pd.factorize(pd.Series(categories).reset_index(drop=True))
+    # Slot 0 holds the whole catalog, slot c + 1 category c
+    group_names = [ALL_CATEGORIES] + [str(name) for name in category_names]
+    num_groups = len(group_names)
+
+    ids = np.asarray(ingredient_ids, dtype=np.int64)
+    rows = np.repeat(np.arange(len(offsets) - 1), np.diff(offsets))
+    unique_rows, unique_ids = unique_pairs(rows, ids, num_ingredients)
+
+    occurrences = np.zeros((num_groups, num_ingredients), dtype=np.int64)
+    document_frequency = np.zeros((num_groups, num_ingredients), dtype=np.int64)
+    occurrences[0] = np.bincount(ids, minlength=num_ingredients)
+    document_frequency[0] = np.bincount(unique_ids, minlength=num_ingredients)
+    categorized = codes[rows] >= 0
+    occurrences[1:] = np.bincount(codes[rows[categorized]] * num_ingredients + ids[categorized],
+                                  minlength=(num_groups - 1) * num_ingredients).reshape(num_groups - 1, num_ingredients)
+    categorized = codes[unique_rows] >= 0
+    document_frequency[1:] = np.bincount(codes[unique_rows[categorized]] * num_ingredients + unique_ids[categorized],
+                                         minlength=(num_groups - 1) * num_ingredients).reshape(num_groups - 1, num_ingredients)
+    num_products = np.concatenate(([len(codes)], np.bincount(codes[codes >= 0], minlength=num_groups - 1)))
+
+    group_pos, ingredient_pos = np.nonzero(document_frequency)
+    table = pd.DataFrame({
+        'category': np.asarray(group_names, dtype=object)[group_pos],
+        'ingredient_id': ingredient_pos.astype(np.int32),
+        'ingredient': np.asarray(vocabulary, dtype=object)[ingredient_pos],
+        'occurrences': occurrences[group_pos, ingredient_pos],
+        'document_frequency': document_frequency[group_pos, ingredient_pos],
+        'num_products': num_products[group_pos]
+    })
+    order = np.lexsort((table['ingredient_id'].to_numpy(), -table['document_frequency'].to_numpy(), group_pos))
+    return table.iloc[order].reset_index(drop=True)
+
+def top_ingredient_ids(document_frequency, limit):
+    """
+    Select the most common ingredients, ties broken by ingredient id.
+
+    Args:
+        document_frequency (ndarray): Number of products listing each ingredient
+        limit (int): Maximum number of ingredients to return
+
+    Returns:
+        ndarray: Ingredient ids of the listed ingredients, most common first
+    """
+    candidates = np.flatnonzero(document_frequency)
+    if len(candidates) > limit:
+        # Keep every ingredient tied with the limit-th count so the tie-break stays stable
+        cutoff = np.partition(document_frequency[candidates], len(candidates) - limit)[len(candidates) - limit]
+        candidates = candidates[document_frequency[candidates] >= cutoff]
+    order = np.lexsort((candidates, -document_frequency[candidates]))
+    return candidates[order[:limit]]
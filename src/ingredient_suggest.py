@@ -0,0 +1,162 @@
+import numpy as np
+import pandas as pd
+from Levenshtein import ratio
+
+WORD_PATTERN = r'\w+'
+NGRAM_SIZE = 3
+
+def get_ngrams(text):
+    """
+    Split a padded ingredient name into overlapping character n-grams.
+
+    Args:
+        text (str): Normalized ingredient name
+
+    Returns:
+        list: Distinct n-grams of length NGRAM_SIZE, including word-boundary padding
+    """
+    padded = f" {text} "
+    return list(dict.fromkeys(padded[i:i + NGRAM_SIZE] for i in range(max(len(padded) - NGRAM_SIZE + 1, 1))))
+
+def build_ingredient_suggester(vocabulary, frequencies):
+    """
+    Build the autocomplete and spelling-correction index over the ingredient vocabulary.
+
+    Names and their words are kept in sorted arrays, which act as a flattened trie: all
+    completions of a prefix form one contiguous range found by binary search. Character
+    n-gram postings (CSR layout) narrow "did you mean" candidates before edit-distance scoring.
+
+    Args:
+        vocabulary (ndarray): Normalized ingredient names, as produced by split_ingredients
+        frequencies (ndarray): Number of products containing each ingredient
+
+    Returns:
+        dict: Sorted names, word keys, n-gram postings and per-name frequencies
+    """
+    order = np.argsort(np.asarray(vocabulary, dtype=str), kind='stable')
+    names = np.asarray(vocabulary, dtype=str)[order]
+    name_series = pd.Series(names, dtype=object)
+
+    # Word-start keys, so "hyaluron" also completes "sodium hyaluronate"
+    words = name_series.str.findall(WORD_PATTERN).explode().dropna()
+    word_order = np.argsort(words.to_numpy(dtype=str), kind='stable')
+    word_keys = words.to_numpy(dtype=str)[word_order]
+    word_name_pos = words.index.to_numpy()[word_order]
+
+    ngrams = name_series.map(get_ngrams).explode().dropna()
+    ngram_codes, ngram_keys = pd.factorize(ngrams)
+    ngram_order = np.argsort(ngram_codes, kind='stable')
+    ngram_offsets = np.zeros(len(ngram_keys) + 1, dtype=np.int64)
+    np.cumsum(np.bincount(ngram_codes, minlength=len(ngram_keys)), out=ngram_offsets[1:])
+    return {
+        'names': names,
+        'frequencies': np.asarray(frequencies)[order],
+        'word_keys': word_keys,
+        'word_name_pos': word_name_pos,
+        'ngram_ids': {ngram: code for code, ngram in enumerate(ngram_keys)},
+        'ngram_offsets': ngram_offsets,
+        'ngram_name_pos': ngrams.index.to_numpy()[ngram_order]
+    }
+
+def prefix_range(sorted_keys, prefix):
+    """
+    Find the contiguous range of sorted keys that start with a prefix.
+
+    Args:
+        sorted_keys (ndarray): Sorted str array
+        prefix (str): Prefix to look up
+
+    Returns:
+        tuple: (start, stop) positions into sorted_keys
+    """
+    return (np.searchsorted(sorted_keys, prefix, side='left'),
+            np.searchsorted(sorted_keys, prefix + '\U0010ffff', side='left'))
+
+def top_by_frequency(suggester, name_positions, limit):
+    """
+    Rank candidate names by product frequency, most common first, ties alphabetically.
+
+    Args:
+        suggester (dict): Index from build_ingredient_suggester
+        name_positions (ndarray): Positions into suggester['names']
+        limit (int): Maximum number of names to return
+
+    Returns:
+        list: Up to limit ingredient names
+    """
+    name_positions = np.unique(name_positions)
+    frequencies = suggester['frequencies'][name_positions]
+    if len(name_positions) > limit:
+        keep = np.argpartition(-frequencies, limit - 1)[:limit]
+        name_positions, frequencies = name_positions[keep], frequencies[keep]
+    # names are sorted, so position order is alphabetical order
+    ranked = name_positions[np.lexsort((name_positions, -frequencies))]
+    return suggester['names'][ranked].tolist()
+
+def suggest_completions(suggester, prefix, limit=8):
+    """
+    Suggest ingredient names that start with, or have a word starting with, a prefix.
+
+    Args:
+        suggester (dict): Index from build_ingredient_suggester
+        prefix (str): Partially typed ingredient name
+        limit (int): Maximum number of suggestions
+
+    Returns:
+        list: Up to limit ingredient names, most common first
+    """
+    prefix = prefix.strip().lower()
+    if not prefix:
+        return []
+    start, stop = prefix_range(suggester['names'], prefix)
+    word_start, word_stop = prefix_range(suggester['word_keys'], prefix)
+    candidates = np.concatenate((np.arange(start, stop), suggester['word_name_pos'][word_start:word_stop]))
+    return top_by_frequency(suggester, candidates, limit)
+
+def suggest_corrections(suggester, term, limit=3, min_ratio=0.75, max_candidates=50):
+    """
+    Suggest known ingredient names close to a term that is not in the vocabulary.
+
+    Candidates sharing the most character n-grams with the term are scored with the
+    normalized Levenshtein similarity; only names above min_ratio are returned.
+
+    Args:
+        suggester (dict): Index from build_ingredient_suggester
+        term (str): Ingredient name as typed by the user
+        limit (int): Maximum number of suggestions
+        min_ratio (float): Minimum Levenshtein similarity ratio
+        max_candidates (int): Number of n-gram candidates scored by edit distance
+
+    Returns:
+        list: Up to limit ingredient names, most similar first
+    """
+    term = term.strip().lower()
+    if not term:
+        return []
+    offsets = suggester['ngram_offsets']
+    postings = [suggester['ngram_name_pos'][offsets[code]:offsets[code + 1]]
+                for code in (suggester['ngram_ids'].get(ngram) for ngram in get_ngrams(term)) if code is not None]
+    if not postings:
+        return []
+    shared = np.bincount(np.concatenate(postings), minlength=len(suggester['names']))
+    candidates = np.flatnonzero(shared)
+    if len(candidates) > max_candidates:
+        candidates = candidates[np.argpartition(-shared[candidates], max_candidates - 1)[:max_candidates]]
+    scored = [(ratio(term, name), suggester['frequencies'][pos], name) for pos, name in zip(candidates, suggester['names'][candidates].tolist())]
+    scored = [item for item in scored if item[0] >= min_ratio and item[2] != term]
+    scored.sort(key=lambda item: (-item[0], -item[1], item[2]))
+    return [name for _, _, name in scored[:limit]]
+
+def is_known_ingredient(suggester, term):
+    """
+    Check whether a term is exactly one of the indexed ingredient names.
+
+    Args:
+        suggester (dict): Index from build_ingredient_suggester
+        term (str): Normalized ingredient name
+
+    Returns:
+        bool: True if the term is in the vocabulary
+    """
+    pos = np.searchsorted(suggester['names'], term)
+    return bool(pos < len(suggester['names']) and suggester['names'][pos] == term)
@@ -0,0 +1,124 @@
+import numpy as np
+import scipy.sparse as sp
+from scipy.sparse.csgraph import connected_components
+
+MERSENNE_PRIME = (1 << 31) - 1
+NUM_PERM = 64
+NUM_BANDS = 16
+MINHASH_SEED = 0
+
+def minhash_signatures(offsets, ingredient_ids, num_ingredients, num_perm=NUM_PERM, seed=MINHASH_SEED, max_block_cells=2**24):
+    """
+    Compute a MinHash signature of every product's ingredient set.
+
+    Each of the num_perm hash functions is h(x) = (a * x + b) mod (2^31 - 1) over
+    ingredient ids. The hashes are computed once per vocabulary entry and gathered per
+    product; a product's signature holds the minimum of each function over its
+    ingredients. Products are processed in blocks of at most max_block_cells gathered values.
+
+    Args:
+        offsets (ndarray): Per-product offsets into ingredient_ids (CSR layout)
+        ingredient_ids (ndarray): Ingredient ids of every product, concatenated
+        num_ingredients (int): Size of the ingredient vocabulary
+        num_perm (int): Number of hash functions (signature length)
+        seed (int): Seed for the hash function coefficients
+        max_block_cells (int): Upper bound on ingredients x num_perm gathered at once
+
+    Returns:
+        ndarray: uint32 array of shape (number of products, num_perm); products without
+                 ingredients get the all-ones signature
+    """
+    rng = np.random.default_rng(seed)
+    coef_a = rng.integers(1, MERSENNE_PRIME, size=num_perm, dtype=np.int64)
+    coef_b = rng.integers(0, MERSENNE_PRIME, size=num_perm, dtype=np.int64)
+    vocabulary_ids = np.arange(num_ingredients, dtype=np.int64)[:, None]
+    hash_table = ((vocabulary_ids * coef_a[None, :] + coef_b[None, :]) % MERSENNE_PRIME).astype(np.uint32)
+    # Extra all-ones row used to pad short ingredient lists
+    hash_table = np.vstack((hash_table, np.full((1, num_perm), np.iinfo(np.uint32).max, dtype=np.uint32)))
+
+    num_rows = len(offsets) - 1
+    signatures = np.full((num_rows, num_perm), np.iinfo(np.uint32).max, dtype=np.uint32)
+    if len(ingredient_ids) == 0:
+        return signatures
+    counts = np.diff(offsets)
+    # Lists are padded to the longest one in each block, so the minimum is one dense reduction
+    block_rows = max(1, max_block_cells // (num_perm * int(counts.max())))
+    for start in range(0, num_rows, block_rows):
+        stop = min(start + block_rows, num_rows)
+        block_counts = counts[start:stop]
+        positions = np.arange(max(1, int(block_counts.max())))[None, :]
+        valid = positions < block_counts[:, None]
+        padded_ids = np.where(valid, ingredient_ids[np.where(valid, offsets[start:stop, None] + positions, 0)], num_ingredients)
+        signatures[start:stop] = hash_table[padded_ids].min(axis=1)
+    return signatures
+
+def band_keys(band_values):
+    """
+    Combine each row of a signature band into one 64-bit bucket key.
+
+    Args:
+        band_values (ndarray): uint32 array of shape (number of products, rows per band)
+
+    Returns:
+        ndarray: uint64 bucket key per product; rare key collisions are filtered out later
+                 by the similarity check
+    """
+    keys = np.zeros(len(band_values), dtype=np.uint64)
+    for col in range(band_values.shape[1]):
+        keys = (keys ^ band_values[:, col].astype(np.uint64)) * np.uint64(0x100000001B3)
+    return keys
+
+def find_duplicate_clusters(signatures, min_similarity=0.8, num_bands=NUM_BANDS, valid_mask=None):
+    """
+    Group products with near-identical ingredient sets using banded LSH.
+
+    Signatures are split into num_bands bands; products whose band values are equal
+    land in the same bucket. Each bucket member is linked to the bucket's first member
+    when their estimated Jaccard similarity (share of equal signature entries) reaches
+    min_similarity, and clusters are the connected components of those links. Work is
+    linear in the number of products times the number of bands.
+
+    Args:
+        signatures (ndarray): Signatures from minhash_signatures
+        min_similarity (float): Minimum estimated Jaccard similarity for a link
+        num_bands (int): Number of LSH bands; must divide the signature length
+        valid_mask (ndarray): Optional bool mask of products to cluster (e.g. with ingredients)
+
+    Returns:
+        ndarray: int64 cluster label per product, -1 for products without a near duplicate
+    """
+    num_rows, num_perm = signatures.shape
+    if num_perm % num_bands:
+        raise ValueError(f"num_bands ({num_bands}) must divide the signature length ({num_perm}).")
+    rows_per_band = num_perm // num_bands
+    candidates = np.arange(num_rows) if valid_mask is None else np.flatnonzero(valid_mask)
+    labels = np.full(num_rows, -1, dtype=np.int64)
+    if len(candidates) < 2:
+        return labels
+
+    link_src, link_dst = [], []
+    for band in range(num_bands):
+        bucket = band_keys(signatures[candidates, band * rows_per_band:(band + 1) * rows_per_band])
+        order = np.argsort(bucket, kind='stable')
+        sorted_bucket = bucket[order]
+        # First member of each bucket, broadcast to the rest of its members
+        is_first = np.ones(len(order), dtype=bool)
+        is_first[1:] = sorted_bucket[1:] != sorted_bucket[:-1]
+        first = order[np.flatnonzero(is_first)[np.cumsum(is_first) - 1]]
+        pairs = ~is_first
+        link_src.append(candidates[first[pairs]])
+        link_dst.append(candidates[order[pairs]])
+
+    src, dst = np.concatenate(link_src), np.concatenate(link_dst)
+    if len(src):
+        pair_keys = np.unique(src.astype(np.int64) * num_rows + dst)
+        src, dst = pair_keys // num_rows, pair_keys % num_rows
+        estimated_jaccard = (signatures[src] == signatures[dst]).mean(axis=1)
+        keep = estimated_jaccard >= min_similarity
+        src, dst = src[keep], dst[keep]
+    graph = sp.coo_matrix((np.ones(len(src), dtype=np.int8), (src, dst)), shape=(num_rows, num_rows))
+    _, components = connected_components(graph, directed=False)
+    sizes = np.bincount(components)
+    linked = sizes[components] > 1
+    labels[linked] = components[linked]
+    return labels
@@ -0,0 +1,272 @@
+import argparse
+import hashlib
+import json
+import os
+
+import numpy as np
+import pandas as pd
+
+from catalog_store import SNAPSHOT_DIR
+from product_data_inspect import (run_matching, BASE_PRODUCTS_PATH, SEPHORA_PRODUCTS_PATH, CATEGORY_DIR, CATEGORY_FILES,
+                                  MERGED_PRODUCTS_PATH, POTENTIAL_MATCHES_PATH)
+from product_data_prep import prepare_products, add_loves_bins, PRODUCTS_PATH
+from ingredient_data_prep import build_ingredient_dict, add_ingredient_details, export_snapshot, PAULA_PATH, PRODUCTS_INGREDIENTS_PATH
+
+STATE_DIR = 'data/processed/pipeline_state'
+# The matching stage writes a separate file so re-running it never reads its own output
+MATCHED_PRODUCTS_PATH = 'data/processed/final_merged_products_updated.csv'
+SRC_DIR = os.path.dirname(os.path.abspath(__file__))
+ROW_KEY_COL = 'match_key'
+
+def hash_file(path, block_size=2**20):
+    """
+    Compute the SHA-256 of a file's contents.
+
+    Args:
+        path (str): File path
+        block_size (int): Bytes read at a time
+
+    Returns:
+        str: Hex digest, or None if the file does not exist
+    """
+    if not os.path.exists(path):
+        return None
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for block in iter(lambda: f.read(block_size), b''):
+            digest.update(block)
+    return digest.hexdigest()
+
+def get_row_keys(df):
+    """
+    Build a unique key per row from match_key and its occurrence number.
+
+    match_key is not unique in the catalog, so repeated keys are told apart by the order
+    in which they appear.
+
+    Args:
+        df (DataFrame): Rows with a match_key column
+
+    Returns:
+        ndarray: object array of 'match_key#occurrence' strings
+    """
+    occurrence = df.groupby(ROW_KEY_COL, dropna=False, sort=False).cumcount()
+    return (df[ROW_KEY_COL].astype(str) + '#' + occurrence.astype(str)).to_numpy(dtype=object)
+
+def get_row_hashes(df):
+    """
+    Hash every row's values, without its row label.
+
+    Rows are matched to their previous hashes by get_row_keys (match_key and occurrence),
+    and every transform only looks at the row's own values, so inserting or removing a
+    product does not mark the rows after it as changed.
+
+    Args:
+        df (DataFrame): Input rows
+
+    Returns:
+        ndarray: uint64 hash per row
+    """
+    return pd.util.hash_pandas_object(df, index=False).to_numpy()
+
+def read_state(stage_name):
+    """
+    Load what a stage recorded on its last successful run.
+
+    Args:
+        stage_name (str): Stage name
+
+    Returns:
+        tuple: (dict of recorded file hashes, empty if the stage never ran;
+                DataFrame of row keys and row hashes for row stages, or None)
+    """
+    state_path = os.path.join(STATE_DIR, f'{stage_name}.json')
+    if not os.path.exists(state_path):
+        return {}, None
+    with open(state_path) as f:
+        state = json.load(f)
+    rows_path = os.path.join(STATE_DIR, f'{stage_name}_rows.parquet')
+    row_state = pd.read_parquet(rows_path) if os.path.exists(rows_path) else None
+    return state, row_state
+
+def write_state(stage, input_hashes, row_keys=None, row_hashes=None):
+    """
+    Record the input and output hashes of a finished stage (and its row hashes).
+
+    Args:
+        stage (dict): Stage definition
+        input_hashes (dict): Input path -> content hash the stage was run on
+        row_keys (ndarray): Optional row keys of the row input
+        row_hashes (ndarray): Optional row hashes of the row input
+    """
+    os.makedirs(STATE_DIR, exist_ok=True)
+    if row_keys is not None:
+        pd.DataFrame({'row_key': row_keys, 'row_hash': row_hashes}).to_parquet(
+            os.path.join(STATE_DIR, f"{stage['name']}_rows.parquet"), index=False)
+    state = {
+        'inputs': input_hashes,
+        'outputs': {path: hash_file(path) for path in stage['outputs']}
+    }
+    with open(os.path.join(STATE_DIR, f"{stage['name']}.json"), 'w') as f:
+        json.dump(state, f, indent=2)
+
+def find_reusable_rows(df, row_keys, row_hashes, row_state, output_path):
+    """
+    Match unchanged input rows to their rows in the previous stage output.
+
+    Args:
+        df (DataFrame): Current row input
+        row_keys (ndarray): Row keys of df
+        row_hashes (ndarray): Row hashes of df
+        row_state (DataFrame): Row keys and hashes recorded on the last run
+        output_path (str): Previous row output CSV
+
+    Returns:
+        tuple: (bool mask of unchanged rows of df, DataFrame of their previous output rows
+                relabelled with the current row labels), or (all-False mask, None) when
+                the previous output cannot be reused
+    """
+    unchanged = np.zeros(len(df), dtype=bool)
+    if row_state is None or not os.path.exists(output_path):
+        return unchanged, None
+    recorded = pd.Index(row_state['row_key']).get_indexer(row_keys)
+    known = recorded >= 0
+    unchanged[known] = row_state['row_hash'].to_numpy()[recorded[known]] == row_hashes[known]
+    previous_output = pd.read_csv(output_path, low_memory=False)
+    output_positions = pd.Index(get_row_keys(previous_output)).get_indexer(row_keys[unchanged])
+    if (output_positions < 0).any():
+        return np.zeros(len(df), dtype=bool), None
+    reused = previous_output.iloc[output_positions]
+    reused.index = df.index[unchanged]
+    return unchanged, reused
+
+def run_row_stage(stage, row_state, force=False):
+    """
+    Run a stage whose transform works row by row, reprocessing only new or changed rows.
+
+    Rows are diffed by match_key against the row hashes of the last run. Unchanged rows
+    are copied from the previous output; the stage's finalize step (catalog-wide
+    columns and exports) then runs over the combined rows. Only the transform is
+    incremental: reading the input and the previous output, hashing, finalize and
+    writing the output still scale with the catalog size.
+
+    Args:
+        stage (dict): Stage definition with 'rows', 'transform' and 'finalize'
+        row_state (DataFrame): Row hashes of the last run, or None
+        force (bool): Reprocess every row
+
+    Returns:
+        tuple: (row keys, row hashes) of the processed input
+    """
+    df = pd.read_csv(stage['rows'], low_memory=False)
+    row_keys, row_hashes = get_row_keys(df), get_row_hashes(df)
+    output_path = stage['outputs'][0]
+    unchanged, reused = np.zeros(len(df), dtype=bool), None
+    if not force:
+        unchanged, reused = find_reusable_rows(df, row_keys, row_hashes, row_state, output_path)
+    print(f"[{stage['name']}] {int((~unchanged).sum())} of {len(df)} rows new or changed")
+
+    parts = [] if reused is None else [reused]
+    if (~unchanged).any() or reused is None:
+        parts.append(stage['transform'](df[~unchanged]))
+    combined = pd.concat(parts).loc[df.index] if len(parts) > 1 else parts[0]
+    combined = stage['finalize'](combined)
+    combined.to_csv(output_path, index=False)
+    return row_keys, row_hashes
+
+def run_matching_stage():
+    run_matching(base_path=BASE_PRODUCTS_PATH, sephora_path=SEPHORA_PRODUCTS_PATH, category_dir=CATEGORY_DIR,
+                 merged_path=MERGED_PRODUCTS_PATH, matches_path=POTENTIAL_MATCHES_PATH, output_path=MATCHED_PRODUCTS_PATH)
+
+def add_ingredient_rows(df):
+    return add_ingredient_details(df, build_ingredient_dict(pd.read_csv(PAULA_PATH, low_memory=False)))
+
+def export_ingredient_rows(df):
+    export_snapshot(df, SNAPSHOT_DIR)
+    return df
+
+# Stage inputs include the scripts themselves and the src modules they import, so a code
+# change also reruns the stage.
+# Row stages list their row input under 'rows'; every other input change reprocesses all rows.
+STAGES = [
+    {
+        'name': 'match',
+        'inputs': [BASE_PRODUCTS_PATH, SEPHORA_PRODUCTS_PATH, MERGED_PRODUCTS_PATH]
+                  + [os.path.join(CATEGORY_DIR, file_name) for file_name in CATEGORY_FILES.values()]
+                  + [os.path.join(SRC_DIR, script) for script in ['product_data_inspect.py', 'near_duplicates.py']],
+        'outputs': [MATCHED_PRODUCTS_PATH, POTENTIAL_MATCHES_PATH],
+        'run': run_matching_stage
+    },
+    {
+        'name': 'products',
+        'rows': MATCHED_PRODUCTS_PATH,
+        'inputs': [os.path.join(SRC_DIR, script) for script in ['product_data_prep.py', 'chunked_csv.py']],
+        'outputs': [PRODUCTS_PATH],
+        'transform': prepare_products,
+        'finalize': add_loves_bins
+    },
+    {
+        'name': 'ingredients',
+        'rows': PRODUCTS_PATH,
+        'inputs': [PAULA_PATH] + [os.path.join(SRC_DIR, script) for script in [
+            'ingredient_data_prep.py', 'catalog_store.py', 'ingredient_rules.py', 'similarity.py',
+            'near_duplicates.py', 'ingredient_stats.py', 'chunked_csv.py'
+        ]],
+        'outputs': [PRODUCTS_INGREDIENTS_PATH, os.path.join(SNAPSHOT_DIR, 'manifest.json')],
+        'transform': add_ingredient_rows,
+        'finalize': export_ingredient_rows
+    }
+]
+
+def run_pipeline(stage_names=None, force=False):
+    """
+    Run the prep stages in order, skipping those whose inputs and outputs are unchanged.
+
+    Args:
+        stage_names (list): Optional subset of stage names to run
+        force (bool): Rerun every selected stage from scratch
+
+    Returns:
+        list: Names of the stages that ran
+    """
+    ran = []
+    for stage in STAGES:
+        if stage_names and stage['name'] not in stage_names:
+            continue
+        input_paths = ([stage['rows']] if 'rows' in stage else []) + stage['inputs']
+        input_hashes = {path: hash_file(path) for path in input_paths}
+        missing = [path for path, digest in input_hashes.items() if digest is None]
+        if missing:
+            raise FileNotFoundError(f"Stage '{stage['name']}' is missing inputs: {', '.join(missing)}")
+
+        state, row_state = read_state(stage['name'])
+        outputs_intact = all(state.get('outputs', {}).get(path) == hash_file(path) for path in stage['outputs'])
+        if not force and state.get('inputs') == input_hashes and outputs_intact:
+            print(f"[{stage['name']}] inputs unchanged, skipping")
+            continue
+
+        print(f"\n[{stage['name']}] running...")
+        if 'rows' in stage:
+            # Side inputs (lookup tables, code) change the result of every row
+            side_inputs_changed = any(state.get('inputs', {}).get(path) != input_hashes[path] for path in stage['inputs'])
+            row_keys, row_hashes = run_row_stage(stage, row_state, force or side_inputs_changed or not outputs_intact)
+            write_state(stage, input_hashes, row_keys, row_hashes)
+        else:
+            stage['run']()
+            write_state(stage, input_hashes)
+        ran.append(stage['name'])
+    return ran
+
+def main():
+    parser = argparse.ArgumentParser(description='Run the data preparation pipeline incrementally (from the repository root).')
+    parser.add_argument('--stages', nargs='+', choices=[stage['name'] for stage in STAGES],
+                      help='Only run these stages (default: all)')
+    parser.add_argument('--force', action='store_true',
+                      help='Rerun the selected stages from scratch even if their inputs are unchanged')
+    args = parser.parse_args()
+
+    ran = run_pipeline(args.stages, args.force)
+    print(f"\nPipeline complete: {', '.join(ran) if ran else 'nothing to do'}")
+
+if __name__ == "__main__":
+    main()
@@ -5,7 +5,31 @@ import numpy as np
 from collections import Counter
 import re
 import argparse
-from Levenshtein import ratio
+from concurrent.futures import ProcessPoolExecutor
+from rapidfuzz import process
+from rapidfuzz.distance import Indel
+from near_duplicates import minhash_signatures, band_keys
+
+NAME_LSH_BANDS = 32
+NAME_LSH_ROWS = 3
+NAME_LSH_EXTRA_ROWS = 2
+NAME_LSH_MAX_BUCKET_PAIRS = 10000
+# Catalog pairs up to which names are compared exhaustively instead of through the LSH index
+MAX_EXHAUSTIVE_PAIRS = 2**24
+# Work units handed to each worker process; fixed sizes keep the chunking independent of --workers
+STANDARDIZE_CHUNK_SIZE = 2**14
+SCORE_CHUNK_PAIRS = 2**20
+
+BASE_PRODUCTS_PATH = 'data/raw/cosmetics.csv'
+SEPHORA_PRODUCTS_PATH = 'data/raw/skincare_df.csv'
+CATEGORY_DIR = 'data/raw'
+CATEGORY_FILES = {
+    "Moisturizers": "moisturizers.csv",
+    "Eye Care": "eyecare.csv",
+    "Treatments": "treatments.csv"
+}
+MERGED_PRODUCTS_PATH = 'data/processed/final_merged_products.csv'
+POTENTIAL_MATCHES_PATH = 'data/processed/potential_product_matches.csv'
 
 def standardize_name(name):
     """
@@ -57,23 +81,39 @@ def standardize_brand_name(brand):
     
     return brand
 
-def process_category_files():
+def apply_to_values(func, values):
+    """Apply a function to every value of a chunk (runs in a worker process)"""
+    return [func(value) for value in values]
+
+def standardize_column(series, func, executor=None):
+    """
+    Apply a standardization function to a column, in chunks over a process pool if given.
+
+    Args:
+        series (Series): Values to standardize
+        func (callable): Module-level function such as standardize_name (must be picklable)
+        executor (ProcessPoolExecutor): Optional pool; None applies func in this process
+
+    Returns:
+        Series: Standardized values with the index of series, in the original order
+    """
+    if executor is None:
+        return series.apply(func)
+    values = series.to_numpy(dtype=object)
+    chunks = [values[start:start + STANDARDIZE_CHUNK_SIZE] for start in range(0, len(values), STANDARDIZE_CHUNK_SIZE)]
+    results = [value for chunk in executor.map(apply_to_values, [func] * len(chunks), chunks) for value in chunk]
+    return pd.Series(results, index=series.index, name=series.name)
+
+def process_category_files(executor=None, base_path=CATEGORY_DIR):
     """Process category files and create product to category mapping"""
     category_product_data = []
-    category_files_info = {
-        "Moisturizers": "moisturizers.csv",
-        "Eye Care": "eyecare.csv",
-        "Treatments": "treatments.csv"
-    }
 
-    base_path = "/Users/alexvalone/Desktop/Data_Science/DS_Q3/Visualization/skincare_project/data/seph_skin_products"
-    
-    for category, file_path in category_files_info.items():
+    for category, file_path in CATEGORY_FILES.items():
         full_path = f"{base_path}/{file_path}"
         df_cat_file = pd.read_csv(full_path)
         # Standardize brand and name to create match_key
-        df_cat_file['brand_name_std'] = df_cat_file['brand'].apply(standardize_name)
-        df_cat_file['product_name_std'] = df_cat_file['name'].apply(standardize_name)
+        df_cat_file['brand_name_std'] = standardize_column(df_cat_file['brand'], standardize_name, executor)
+        df_cat_file['product_name_std'] = standardize_column(df_cat_file['name'], standardize_name, executor)
         df_cat_file['match_key'] = df_cat_file['brand_name_std'] + "_" + df_cat_file['product_name_std']
         
         df_cat_file['category'] = category
@@ -82,9 +122,221 @@ def process_category_files():
     df_all_cat_strings = pd.concat(category_product_data, ignore_index=True)
     return df_all_cat_strings.drop_duplicates(subset=['match_key'], keep='first').set_index('match_key')['category'].to_dict()
 
-def find_potential_matches(df_base, df_sephora, name_threshold=0.8, brand_threshold=0.85):
+def unique_sorted(values):
+    """
+    Sort an integer array and drop repeated values (faster than np.unique on large arrays).
+
+    Args:
+        values (ndarray): Integer array
+
+    Returns:
+        ndarray: Sorted distinct values
+    """
+    values = np.sort(values)
+    keep = np.ones(len(values), dtype=bool)
+    keep[1:] = values[1:] != values[:-1]
+    return values[keep]
+
+def get_gram_ids(names, gram_size=3):
+    """
+    Encode every name's character n-grams as integer ids in CSR layout.
+
+    Names are laid out as a matrix of code points so all n-grams are extracted at once.
+    Repeated n-grams of a name are kept, which does not change its MinHash signature.
+
+    Args:
+        names (ndarray): Lowercased standardized names
+        gram_size (int): Length of the character n-grams; shorter names are one gram
+
+    Returns:
+        tuple: (int64 ndarray of per-name offsets of length len(names) + 1,
+                int32 ndarray of gram ids, number of distinct grams)
+    """
+    names = np.asarray(names, dtype=str)
+    lengths = np.char.str_len(names)
+    width = max(names.dtype.itemsize // 4, gram_size)
+    code_points = names.astype(f'U{width}').view(np.uint32).reshape(len(names), width).astype(np.uint64)
+    # Pack each n-gram's code points (21 bits each) into one integer key
+    gram_keys = np.zeros((len(code_points), width - gram_size + 1), dtype=np.uint64)
+    for pos in range(gram_size):
+        gram_keys = (gram_keys << np.uint64(21)) | code_points[:, pos:width - gram_size + 1 + pos]
+    counts = np.maximum(lengths - gram_size + 1, 1)
+    valid = np.arange(gram_keys.shape[1])[None, :] < counts[:, None]
+    offsets = np.zeros(len(counts) + 1, dtype=np.int64)
+    np.cumsum(counts, out=offsets[1:])
+    gram_ids, grams = pd.factorize(gram_keys[valid])
+    return offsets, gram_ids.astype(np.int32), len(grams)
+
+def find_candidate_pairs(base_names, sephora_names, threshold, num_bands=NAME_LSH_BANDS, rows_per_band=NAME_LSH_ROWS,
+                         extra_rows=NAME_LSH_EXTRA_ROWS, max_bucket_pairs=NAME_LSH_MAX_BUCKET_PAIRS):
+    """
+    Find base x Sephora name pairs that likely share most of their character n-grams.
+
+    Names are MinHashed over their 3-gram sets and split into num_bands bands of
+    rows_per_band values; a pair is a candidate when any band is equal. With the default
+    32 x 3 banding, a pair whose n-gram sets have a Jaccard similarity of 0.5 (about the
+    lowest seen for names with a Levenshtein ratio above 0.8) is found with probability
+    0.99, one at 0.1 with probability 0.03. Buckets holding more than max_bucket_pairs
+    pairs, which collect names made of the same common words, are split by up to
+    extra_rows further signature values. Pairs whose lengths alone rule out the threshold
+    (the Levenshtein ratio is at most 2 * shorter length / total length) are dropped.
+
+    Args:
+        base_names (ndarray): Lowercased standardized base names
+        sephora_names (ndarray): Lowercased standardized Sephora names
+        threshold (float): Name similarity threshold the candidates will be scored against
+        num_bands (int): Number of LSH bands
+        rows_per_band (int): Signature values per band
+        extra_rows (int): Additional signature values per band for splitting large buckets
+        max_bucket_pairs (int): Bucket size (in pairs) above which a bucket is split
+
+    Returns:
+        tuple: (int64 ndarray of base rows, int64 ndarray of Sephora rows)
+    """
+    offsets, gram_ids, num_grams = get_gram_ids(np.concatenate((base_names, sephora_names)))
+    band_width = rows_per_band + extra_rows
+    signatures = minhash_signatures(offsets, gram_ids, num_grams, num_perm=num_bands * band_width)
+    num_base = len(base_names)
+    # Name lengths from the n-gram counts; names shorter than 3 count as 3, which only keeps more pairs
+    base_lengths, sephora_lengths = np.diff(offsets)[:num_base] + 2, np.diff(offsets)[num_base:] + 2
+    band_pair_keys = []
+    for band in range(num_bands):
+        band_values = signatures[:, band * band_width:(band + 1) * band_width]
+        bucket_keys = band_keys(band_values[:, :rows_per_band])
+        for num_rows in range(rows_per_band, band_width + 1):
+            bucket_codes = pd.factorize(bucket_keys)[0].astype(np.int64)
+            num_buckets = bucket_codes.max() + 1
+            bucket_pairs = (np.bincount(bucket_codes[:num_base], minlength=num_buckets) *
+                            np.bincount(bucket_codes[num_base:], minlength=num_buckets))
+            in_large_bucket = (bucket_pairs > max_bucket_pairs)[bucket_codes]
+            if num_rows == band_width or not in_large_bucket.any():
+                break
+            bucket_keys[in_large_bucket] = band_keys(band_values[in_large_bucket, :num_rows + 1])
+        shared = np.flatnonzero(bucket_pairs)
+        base_rows, sephora_rows = expand_block_pairs(shared, shared, bucket_codes[:num_base], bucket_codes[num_base:])
+        shorter = np.minimum(base_lengths[base_rows], sephora_lengths[sephora_rows])
+        possible = 2 * shorter > threshold * (base_lengths[base_rows] + sephora_lengths[sephora_rows])
+        base_rows, sephora_rows = base_rows[possible], sephora_rows[possible]
+        band_pair_keys.append(base_rows * len(sephora_names) + sephora_rows)
+    pair_keys = unique_sorted(np.concatenate(band_pair_keys))
+    return pair_keys // max(len(sephora_names), 1), pair_keys % max(len(sephora_names), 1)
+
+def group_rows(codes, num_blocks):
+    """
+    Group row positions by block code (CSR layout).
+
+    Args:
+        codes (ndarray): Non-negative block code of every row
+        num_blocks (int): Number of blocks
+
+    Returns:
+        tuple: (row positions ordered by block, int64 ndarray of per-block offsets)
+    """
+    order = np.argsort(codes, kind='stable')
+    offsets = np.zeros(num_blocks + 1, dtype=np.int64)
+    np.cumsum(np.bincount(codes, minlength=num_blocks), out=offsets[1:])
+    return order, offsets
+
+def expand_block_pairs(left_blocks, right_blocks, left_codes, right_codes):
+    """
+    List every (left row, right row) pair of the given pairs of blocks.
+
+    Args:
+        left_blocks (ndarray): Block code on the left side of each block pair
+        right_blocks (ndarray): Block code on the right side of each block pair
+        left_codes (ndarray): Block code of every left row
+        right_codes (ndarray): Block code of every right row
+
+    Returns:
+        tuple: (int64 ndarray of left rows, int64 ndarray of right rows)
+    """
+    num_blocks = int(max(left_codes.max(initial=-1), right_codes.max(initial=-1), left_blocks.max(initial=-1), right_blocks.max(initial=-1))) + 1
+    left_order, left_offsets = group_rows(left_codes, num_blocks)
+    right_order, right_offsets = group_rows(right_codes, num_blocks)
+    left_counts = left_offsets[left_blocks + 1] - left_offsets[left_blocks]
+    right_counts = right_offsets[right_blocks + 1] - right_offsets[right_blocks]
+    sizes = left_counts * right_counts
+    block_of_pair = np.repeat(np.arange(len(sizes)), sizes)
+    within = np.arange(sizes.sum()) - np.repeat(np.cumsum(sizes) - sizes, sizes)
+    left_rows = left_order[left_offsets[left_blocks[block_of_pair]] + within // right_counts[block_of_pair]]
+    right_rows = right_order[right_offsets[right_blocks[block_of_pair]] + within % right_counts[block_of_pair]]
+    return left_rows, right_rows
+
+def score_pair_chunk(left_names, right_names):
+    """Score aligned name pairs on one core (runs in a worker process)"""
+    return process.cpdist(left_names, right_names, scorer=Indel.normalized_similarity, dtype=np.float64, workers=1)
+
+def score_row_chunk(base_names, sephora_names, threshold):
+    """Score a block of base names against every Sephora name on one core, keeping pairs above threshold"""
+    similarities = process.cdist(base_names, sephora_names, scorer=Indel.normalized_similarity, dtype=np.float64, workers=1)
+    rows, cols = np.nonzero(similarities > threshold)
+    return rows, cols, similarities[rows, cols]
+
+def score_pairs(left_names, right_names, executor=None):
+    """
+    Compute the Levenshtein ratio of aligned name pairs.
+
+    Args:
+        left_names (ndarray): First name of every pair
+        right_names (ndarray): Second name of every pair
+        executor (ProcessPoolExecutor): Optional pool; pairs are scored in chunks of
+            SCORE_CHUNK_PAIRS and concatenated in order. None scores them here on all cores.
+
+    Returns:
+        ndarray: float64 similarity per pair
+    """
+    if executor is None:
+        return process.cpdist(left_names, right_names, scorer=Indel.normalized_similarity, dtype=np.float64, workers=-1)
+    starts = range(0, len(left_names), SCORE_CHUNK_PAIRS)
+    chunks = executor.map(score_pair_chunk, [left_names[start:start + SCORE_CHUNK_PAIRS] for start in starts],
+                          [right_names[start:start + SCORE_CHUNK_PAIRS] for start in starts])
+    return np.concatenate([np.zeros(0)] + list(chunks))
+
+def score_all_pairs(base_names, sephora_names, threshold, executor=None):
+    """
+    Compare every base name with every Sephora name.
+
+    Args:
+        base_names (ndarray): Base names
+        sephora_names (ndarray): Sephora names
+        threshold (float): Pairs with a similarity above this are kept
+        executor (ProcessPoolExecutor): Optional pool; base names are scored in row blocks of
+            about SCORE_CHUNK_PAIRS pairs. None scores them here on all cores.
+
+    Returns:
+        tuple: (base rows, Sephora rows, similarities) of the kept pairs in row-major order
+    """
+    if executor is None:
+        similarities = process.cdist(base_names, sephora_names, scorer=Indel.normalized_similarity, dtype=np.float64, workers=-1)
+        base_rows, sephora_rows = np.nonzero(similarities > threshold)
+        return base_rows, sephora_rows, similarities[base_rows, sephora_rows]
+    block_rows = max(1, SCORE_CHUNK_PAIRS // max(1, len(sephora_names)))
+    starts = list(range(0, len(base_names), block_rows))
+    chunks = list(executor.map(score_row_chunk, [base_names[start:start + block_rows] for start in starts],
+                               [sephora_names] * len(starts), [threshold] * len(starts)))
+    base_rows = np.concatenate([np.zeros(0, dtype=np.int64)] + [rows + start for start, (rows, _, _) in zip(starts, chunks)])
+    sephora_rows = np.concatenate([np.zeros(0, dtype=np.int64)] + [cols for _, cols, _ in chunks])
+    return base_rows, sephora_rows, np.concatenate([np.zeros(0)] + [scores for _, _, scores in chunks])
+
+def find_potential_matches(df_base, df_sephora, name_threshold=0.8, brand_threshold=0.85, executor=None):
     """
     Find potential matches between base and Sephora DataFrames based on similarity thresholds.
+
+    A pair is reported when its name similarity exceeds name_threshold or its brand
+    similarity exceeds brand_threshold (Levenshtein ratio). Instead of scoring every
+    base x Sephora pair, brands are compared once per distinct brand pair; every pair of
+    products from similar brands qualifies and is scored in one block per brand pair.
+    Name matches across the other brands are scored exhaustively for up to
+    MAX_EXHAUSTIVE_PAIRS pairs, and beyond that only on the candidates of the n-gram LSH
+    index of find_candidate_pairs.
+
+    With an executor, name scoring is split into fixed-size chunks that run in the worker
+    processes and are merged in chunk order, so the result does not depend on the number
+    of workers.
+
+    Returns:
+        tuple: (DataFrame of potential matches in base row, Sephora row order,
+                unmatched base rows, unmatched Sephora rows)
     """
     unmatched_base = df_base[~df_base['match_key'].isin(df_sephora['match_key'])]
     unmatched_sephora = df_sephora[~df_sephora['match_key'].isin(df_base['match_key'])]
@@ -92,35 +344,57 @@ def find_potential_matches(df_base, df_sephora, name_threshold=0.8, brand_thresh
     print(f"\nBefore analysis:")
     print(f"Unmatched products in base DataFrame: {len(unmatched_base)}")
     print(f"Unmatched products in Sephora DataFrame: {len(unmatched_sephora)}")
-    
-    potential_matches = []
-    for _, base_row in unmatched_base.iterrows():
-        base_name = base_row['product_name_std']
-        base_brand = base_row['brand_name_std']
-        
-        for _, sephora_row in unmatched_sephora.iterrows():
-            sephora_name = sephora_row['product_name_std']
-            sephora_brand = sephora_row['brand_name_std']
-            
-            name_similarity = ratio(str(base_name).lower(), str(sephora_name).lower())
-            brand_similarity = ratio(str(base_brand).lower(), str(sephora_brand).lower())
-            
-            if name_similarity > name_threshold or brand_similarity > brand_threshold:
-                potential_matches.append({
-                    'base_name': base_row['Name'],
-                    'base_brand': base_row['Brand'],
-                    'base_name_std': base_name,
-                    'base_brand_std': base_brand,
-                    'sephora_name': sephora_row['name'],
-                    'sephora_brand': sephora_row['brand'],
-                    'sephora_name_std': sephora_name,
-                    'sephora_brand_std': sephora_brand,
-                    'name_similarity': name_similarity,
-                    'brand_similarity': brand_similarity,
-                    'should_merge': name_similarity >= name_threshold,
-                    'match_type': 'exact' if name_similarity == 1.0 else 'high_similarity'
-                })
-    
+
+    base_names = unmatched_base['product_name_std'].astype(str).str.lower().to_numpy(dtype=object)
+    sephora_names = unmatched_sephora['product_name_std'].astype(str).str.lower().to_numpy(dtype=object)
+    base_brand_codes, base_brands = pd.factorize(unmatched_base['brand_name_std'].astype(str).str.lower())
+    sephora_brand_codes, sephora_brands = pd.factorize(unmatched_sephora['brand_name_std'].astype(str).str.lower())
+    brand_similarities = process.cdist(list(base_brands), list(sephora_brands), scorer=Indel.normalized_similarity, dtype=np.float64, workers=-1)
+
+    # Every pair of products from similar brands qualifies regardless of name
+    base_brand_order, base_brand_offsets = group_rows(base_brand_codes, len(base_brands))
+    sephora_brand_order, sephora_brand_offsets = group_rows(sephora_brand_codes, len(sephora_brands))
+    base_parts, sephora_parts = [np.zeros(0, dtype=np.int64)], [np.zeros(0, dtype=np.int64)]
+    for base_brand, sephora_brand in zip(*np.nonzero(brand_similarities > brand_threshold)):
+        block_base = base_brand_order[base_brand_offsets[base_brand]:base_brand_offsets[base_brand + 1]]
+        block_sephora = sephora_brand_order[sephora_brand_offsets[sephora_brand]:sephora_brand_offsets[sephora_brand + 1]]
+        base_parts.append(np.repeat(block_base, len(block_sephora)))
+        sephora_parts.append(np.tile(block_sephora, len(block_base)))
+    base_parts, sephora_parts = [np.concatenate(base_parts)], [np.concatenate(sephora_parts)]
+    similarity_parts = [score_pairs(base_names[base_parts[0]], sephora_names[sephora_parts[0]], executor)]
+
+    # Name matches across the other brands: small catalogs are scored exhaustively, larger
+    # ones only on the candidate pairs of the n-gram LSH index
+    if len(base_names) * len(sephora_names) <= MAX_EXHAUSTIVE_PAIRS:
+        base_rows, sephora_rows, name_similarity = score_all_pairs(base_names, sephora_names, name_threshold, executor)
+    else:
+        base_rows, sephora_rows = find_candidate_pairs(base_names, sephora_names, name_threshold)
+        name_similarity = score_pairs(base_names[base_rows], sephora_names[sephora_rows], executor)
+    similar_names = (name_similarity > name_threshold) & (brand_similarities[base_brand_codes[base_rows], sephora_brand_codes[sephora_rows]] <= brand_threshold)
+    base_parts.append(base_rows[similar_names])
+    sephora_parts.append(sephora_rows[similar_names])
+    similarity_parts.append(name_similarity[similar_names])
+
+    # Report pairs in base row, Sephora row order, as a full scan would
+    base_rows, sephora_rows, name_similarity = np.concatenate(base_parts), np.concatenate(sephora_parts), np.concatenate(similarity_parts)
+    order = np.lexsort((sephora_rows, base_rows))
+    base_rows, sephora_rows, name_similarity = base_rows[order], sephora_rows[order], name_similarity[order]
+    brand_similarity = brand_similarities[base_brand_codes[base_rows], sephora_brand_codes[sephora_rows]]
+
+    potential_matches = pd.DataFrame({
+        'base_name': unmatched_base['Name'].to_numpy()[base_rows],
+        'base_brand': unmatched_base['Brand'].to_numpy()[base_rows],
+        'base_name_std': unmatched_base['product_name_std'].to_numpy()[base_rows],
+        'base_brand_std': unmatched_base['brand_name_std'].to_numpy()[base_rows],
+        'sephora_name': unmatched_sephora['name'].to_numpy()[sephora_rows],
+        'sephora_brand': unmatched_sephora['brand'].to_numpy()[sephora_rows],
+        'sephora_name_std': unmatched_sephora['product_name_std'].to_numpy()[sephora_rows],
+        'sephora_brand_std': unmatched_sephora['brand_name_std'].to_numpy()[sephora_rows],
+        'name_similarity': name_similarity,
+        'brand_similarity': brand_similarity,
+        'should_merge': name_similarity >= name_threshold,
+        'match_type': np.where(name_similarity == 1.0, 'exact', 'high_similarity')
+    })
     return potential_matches, unmatched_base, unmatched_sephora
 
 def analyze_similarity_distribution(potential_matches_df):
@@ -160,51 +434,60 @@ def analyze_similarity_distribution(potential_matches_df):
             print(f"\n{lower:.2f}-{upper:.2f} range examples:")
             print(matches[['base_name', 'sephora_name', 'name_similarity']].to_string())
 
-def main():
-    parser = argparse.ArgumentParser(description='Process and merge skincare product data.')
-    parser.add_argument('--name-threshold', type=float, default=0.8,
-                      help='Name similarity threshold for matching (default: 0.8)')
-    parser.add_argument('--brand-threshold', type=float, default=0.85,
-                      help='Brand similarity threshold for matching (default: 0.85)')
-    parser.add_argument('--analyze-only', action='store_true',
-                      help='Only analyze matches without performing merge')
-    parser.add_argument('--show-all', action='store_true',
-                      help='Show all matches instead of just top 10')
-    
-    args = parser.parse_args()
+def run_matching(base_path=BASE_PRODUCTS_PATH, sephora_path=SEPHORA_PRODUCTS_PATH, category_dir=CATEGORY_DIR,
+                 merged_path=MERGED_PRODUCTS_PATH, matches_path=POTENTIAL_MATCHES_PATH, output_path=MERGED_PRODUCTS_PATH,
+                 name_threshold=0.8, brand_threshold=0.85, analyze_only=False, show_all=False, workers=1):
+    """
+    Standardize both product sources, match unmatched products and merge the Sephora columns.
+
+    Args:
+        base_path (str): Base products CSV (cosmetics.csv)
+        sephora_path (str): Sephora products CSV (skincare_df.csv)
+        category_dir (str): Directory with the Sephora category files
+        merged_path (str): Merged products CSV the Sephora columns are merged into
+        matches_path (str): Output CSV of potential matches
+        output_path (str): Output CSV of the merged products (the merged_path itself by default)
+        name_threshold (float): Name similarity threshold for matching
+        brand_threshold (float): Brand similarity threshold for matching
+        analyze_only (bool): Only analyze matches without performing merge
+        show_all (bool): Show all matches instead of just top 10
+        workers (int): Worker processes for name standardization and scoring
+    """
+    executor = ProcessPoolExecutor(max_workers=workers) if workers > 1 else None
     
     # Load the data
     print("Loading data...")
-    df_base = pd.read_csv("/Users/alexvalone/Desktop/Data_Science/DS_Q3/Visualization/skincare_project/data/cosmetics_skin_type/cosmetics.csv")
-    df_sephora = pd.read_csv("/Users/alexvalone/Desktop/Data_Science/DS_Q3/Visualization/skincare_project/data/seph_skin_products/skincare_df.csv")
+    df_base = pd.read_csv(base_path)
+    df_sephora = pd.read_csv(sephora_path)
     
     # Standardize names in base DataFrame
     print("\nStandardizing names in base DataFrame...")
-    df_base['product_name_std'] = df_base['Name'].apply(standardize_name)
-    df_base['brand_name_std'] = df_base['Brand'].apply(standardize_brand_name).apply(standardize_name)
-    df_base['product_type_std'] = df_base['Label'].apply(standardize_name)
+    df_base['product_name_std'] = standardize_column(df_base['Name'], standardize_name, executor)
+    df_base['brand_name_std'] = standardize_column(standardize_column(df_base['Brand'], standardize_brand_name, executor), standardize_name, executor)
+    df_base['product_type_std'] = standardize_column(df_base['Label'], standardize_name, executor)
     df_base['match_key'] = df_base['brand_name_std'] + "_" + df_base['product_name_std']
     
     # Standardize names in Sephora DataFrame
     print("Standardizing names in Sephora DataFrame...")
-    df_sephora['product_name_std'] = df_sephora['name'].apply(standardize_name)
-    df_sephora['brand_name_std'] = df_sephora['brand'].apply(standardize_brand_name).apply(standardize_name)
+    df_sephora['product_name_std'] = standardize_column(df_sephora['name'], standardize_name, executor)
+    df_sephora['brand_name_std'] = standardize_column(standardize_column(df_sephora['brand'], standardize_brand_name, executor), standardize_name, executor)
     df_sephora['match_key'] = df_sephora['brand_name_std'] + "_" + df_sephora['product_name_std']
     df_sephora.dropna(subset=['match_key'], inplace=True)
     
     # Process category files and add categories to Sephora DataFrame
     print("\nProcessing category files...")
-    product_to_category_map = process_category_files()
+    product_to_category_map = process_category_files(executor, category_dir)
     df_sephora['category'] = df_sephora['match_key'].map(product_to_category_map)
     
     # Find potential matches
     potential_matches, unmatched_base, unmatched_sephora = find_potential_matches(
-        df_base, df_sephora, args.name_threshold, args.brand_threshold
+        df_base, df_sephora, name_threshold, brand_threshold, executor
     )
+    if executor is not None:
+        executor.shutdown()
     
-    if potential_matches:
-        potential_matches_df = pd.DataFrame(potential_matches)
-        potential_matches_df = potential_matches_df.sort_values(
+    if not potential_matches.empty:
+        potential_matches_df = potential_matches.sort_values(
             by=['match_type', 'name_similarity', 'brand_similarity'],
             ascending=[False, False, False]
         )
@@ -215,7 +498,7 @@ def main():
         
         print(f"\nFound {len(potential_matches_df)} potential matches!")
         print(f"- {len(exact_matches)} exact matches (similarity = 1.0)")
-        print(f"- {len(high_similarity)} high similarity matches (>{args.name_threshold})")
+        print(f"- {len(high_similarity)} high similarity matches (>{name_threshold})")
         
         # Analyze similarity distribution
         analyze_similarity_distribution(potential_matches_df)
@@ -223,22 +506,22 @@ def main():
         # Print matches
         print("\nExact matches:")
         pd.set_option('display.max_colwidth', None)
-        if args.show_all:
+        if show_all:
             print(exact_matches[['base_name', 'base_brand', 'sephora_name', 'sephora_brand', 'name_similarity']].to_string())
         else:
             print(exact_matches[['base_name', 'base_brand', 'sephora_name', 'sephora_brand', 'name_similarity']].head(10).to_string())
         
         print("\nHigh similarity matches:")
-        if args.show_all:
+        if show_all:
             print(high_similarity[['base_name', 'base_brand', 'sephora_name', 'sephora_brand', 'name_similarity']].to_string())
         else:
             print(high_similarity[['base_name', 'base_brand', 'sephora_name', 'sephora_brand', 'name_similarity']].head(10).to_string())
         
         # Save potential matches to CSV
-        potential_matches_df.to_csv('/Users/alexvalone/Desktop/Data_Science/DS_Q3/Visualization/skincare_project/data/potential_product_matches.csv', index=False)
-        print("\nSaved all potential matches to 'data/potential_product_matches.csv'")
+        potential_matches_df.to_csv(matches_path, index=False)
+        print(f"\nSaved all potential matches to '{matches_path}'")
         
-        if not args.analyze_only:
+        if not analyze_only:
             # Create match key mapping for all high similarity matches
             print("\nUpdating match keys for high similarity matches...")
             match_key_mapping = {}
@@ -250,7 +533,7 @@ def main():
             print(f"\nCreated mapping for {len(match_key_mapping)} matches")
             
             # Load the final merged DataFrame
-            df_final_merged = pd.read_csv('/Users/alexvalone/Desktop/Data_Science/DS_Q3/Visualization/skincare_project/data/final_merged_products.csv')
+            df_final_merged = pd.read_csv(merged_path)
             
             # Update match keys in Sephora DataFrame
             df_sephora['original_match_key'] = df_sephora['match_key']
@@ -292,11 +575,28 @@ def main():
             
             # Save the merged DataFrame
             print("\nSaving merged data...")
-            df_final_merged.to_csv('/Users/alexvalone/Desktop/Data_Science/DS_Q3/Visualization/skincare_project/data/final_merged_products.csv', index=False)
-            print("Saved merged data to 'data/final_merged_products.csv'")
+            df_final_merged.to_csv(output_path, index=False)
+            print(f"Saved merged data to '{output_path}'")
     else:
         print("\nNo potential matches found with similarity threshold > 0.8")
 
+def main():
+    parser = argparse.ArgumentParser(description='Process and merge skincare product data.')
+    parser.add_argument('--name-threshold', type=float, default=0.8,
+                      help='Name similarity threshold for matching (default: 0.8)')
+    parser.add_argument('--brand-threshold', type=float, default=0.85,
+                      help='Brand similarity threshold for matching (default: 0.85)')
+    parser.add_argument('--analyze-only', action='store_true',
+                      help='Only analyze matches without performing merge')
+    parser.add_argument('--show-all', action='store_true',
+                      help='Show all matches instead of just top 10')
+    parser.add_argument('--workers', type=int, default=1,
+                      help='Worker processes for name standardization and scoring; output is identical for any value (default: 1)')
+    
+    args = parser.parse_args()
+    run_matching(name_threshold=args.name_threshold, brand_threshold=args.brand_threshold, analyze_only=args.analyze_only,
+                 show_all=args.show_all, workers=args.workers)
+
 if __name__ == "__main__":
     main()
 
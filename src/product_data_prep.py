@@ -2,118 +2,147 @@ import pandas as pd
 import matplotlib.pyplot as plt
 import seaborn as sns
 import numpy as np
-from collections import Counter
 import re
+import argparse
+from chunked_csv import scan_csv, iter_csv_chunks, write_csv_chunks
 
-# --- Load and Process Main Product Data ---
-print("Loading main product data...")
-df_final = pd.read_csv(".../data/processed/final_merged_products.csv", low_memory=False)
-
-print(df_final.head())
-print(df_final.info())
-print(df_final.describe(include='all'))
-
-# --- Category Processing ---
-print("\nProcessing categories...")
-df_final = df_final.rename(columns={
-    'category': 'category_2',
-    'Label': 'category_1'
-})
-
-categories = []
-mismatch_count = 0
-
-for idx, row in df_final.iterrows():
-    cat1 = str(row['category_1']).strip().lower()
-    cat2_raw = row['category_2']
-    
-    if pd.isna(cat2_raw):
-        categories.append(cat1)
-    else:
-        cat2 = str(cat2_raw).strip().lower()
-        if cat1 == cat2 or cat1 + 's' == cat2:
+MERGED_PRODUCTS_PATH = 'data/processed/final_merged_products.csv'
+PRODUCTS_PATH = 'data/processed/final_products.csv'
+LOVES_BIN_LABELS = ['Very Low', 'Low', 'Medium', 'High', 'Very High']
+
+# Rule 3+: Product-specific fixes, keyed by match_key so they do not depend on row order
+cat1s_keys = [
+    'clinique_acne_solutions_cleansing_foam', 'murad_time_release_acne_cleanser',
+    'tata_harper_nourishing_oil_cleanser', 'shiseido_perfect_cleansing_oil',
+    'caudalie_make_up_removing_cleansing_oil', 'fresh_seaberry_skin_nutrition_cleansing_oil',
+    "l'occitane_shea_cleansing_oil", 'charlotte_tilbury_multi_miracle_glow_cleansing_balm',
+    'lancer_the_method:_polish_blemish_control',
+    'clinique_blackhead_solutions_7_day_deep_pore_cleanse_scrub', 'peter_thomas_roth_acne_clearing_wash',
+    'sk_ii_facial_treatment_cleansing_oil', "kiehl's_since_1851_blue_herbal_acne_cleanser_treatment",
+    'kate_somerville_age_arrest_anti_wrinkle_cream',
+    'ren_clean_skincare_bio_retinoid_anti_wrinkle_concentrate_oil', 'clarins_lotus_face_treatment_oil',
+    'dermadoctor_calm_cool_corrected', 'algenist_advanced_anti_aging_repairing_oil',
+    'belif_hydra_sebum_control_essence', 'laneige_time_freeze_sleeping_mask',
+    'korres_greek_yoghurt_advanced_nourishing_sleeping_facial',
+    'fresh_peony_brightening_night_treatment_mask', 'erno_laszlo_hydra_therapy_memory_sleep_mask',
+    'dr._jart_water_fuse_hydro_sleep_mask', 'ren_clean_skincare_flash_rinse_1_minute_facial',
+    'clinique_acne_solutions_oil_control_cleansing_mask', 'erborian_bamboo_waterlock_mask',
+    'dr._jart_pore_master_patch', 'anthony_deep_pore_cleansing_clay',
+    'algenist_splash_absolute_hydration_replenishing_sleeping_pack'
+]
+cat2s_keys = [
+    'murad_eye_lift_firming_treatment',
+    'peter_thomas_roth_24k_gold_pure_luxury_lift_firm_hydra_gel_eye_patches'
+]
+cat2s_plural_keys = [
+    'biossance_squalane_glycolic_renewal_facial',
+    'caudalie_vinopure_natural_salicylic_acid_pore_minimizing_toner',
+    'clinique_blackhead_solutions_self_heating_blackhead_extractor',
+    'clinique_acne_solutions_clarifying_lotion', 'first_aid_beauty_fab_skin_lab_resurfacing_liquid_10_aha',
+    'skin_inc_supplement_bar_pure_revival_peel', 'dr._dennis_gross_skincare_one_step_acne_eliminating_pads',
+    'clinique_fresh_pressed_7_day_system_with_pure_vitamin_c',
+    'blithe_vital_treatment_essence_for_hydrating', 'caudalie_vinopure_natural_oil_control_moisturizer',
+    'perricone_md_high_potency_classics:_hyaluronic_intensive_moisturizer',
+    'algenist_elevate_advanced_lift_contouring_cream'
+]
+toner_keys = [
+    'murad_clarifying_toner', 'algenist_hydrating_essence_toner'
+]
+treatment_keys = [
+    'boscia_balancing_facial_tonic', 'erborian_eau_ginseng'
+]
+# Manual category overrides: match_key -> category ('category_1' keeps the row's own Label)
+category_overrides = {
+    'murad_clarifying_cleanser': 'category_1',
+    'philosophy_a_glowing_regimen_trial_set': 'treatment',
+    'first_aid_beauty_eye_duty_triple_remedy_overnight_balm': 'eye care'
+}
+
+def reconcile_categories(df_final, verbose=True):
+    """
+    Reconcile the two category columns into a single 'category' column.
+
+    Every rule only looks at the row itself (product-specific fixes are keyed by its
+    match_key), so any subset of rows can be processed on its own, in any order.
+
+    Args:
+        df_final (DataFrame): Merged products with 'Label', 'category' and 'match_key' columns
+        verbose (bool): Print the mismatch count and category distribution
+
+    Returns:
+        DataFrame: Products with 'category_1', 'category_2' and the reconciled 'category'
+    """
+    if verbose:
+        print("\nProcessing categories...")
+    df_final = df_final.rename(columns={
+        'category': 'category_2',
+        'Label': 'category_1'
+    })
+
+    categories = []
+    mismatch_count = 0
+
+    for idx, row in df_final.iterrows():
+        cat1 = str(row['category_1']).strip().lower()
+        cat2_raw = row['category_2']
+
+        if pd.isna(cat2_raw):
             categories.append(cat1)
         else:
-            #print(f"[Index {idx}] Mismatch: {row['Name']} | category_1: {cat1} | category_2: {cat2}")
-            categories.append(np.nan)
-            mismatch_count += 1
-
-# Assign the new 'category' column
-df_final['category'] = categories
-
-# Step 4: Summary output
-print(f"\nTotal mismatches (NaN in 'category'): {df_final['category'].isna().sum()} (Counted: {mismatch_count})")
-
-# Apply category fixes
-print("\nApplying category fixes...")
-# Rule 1: If cat1 is 'sun protect'
-sun_protect_fix = df_final['category_1'].str.strip().str.lower() == 'sun protect'
-
-# Rule 2: cat1 is 'eye cream' and cat2 is 'eye care'
-eye_fix = (
-    df_final['category_1'].str.strip().str.lower() == 'eye cream'
-) & (
-    df_final['category_2'].str.strip().str.lower() == 'eye care'
-)
-
-# Rule 3+: Index-specific fixes
-cat1s_indices = [363,384,422,427,436,441,446,448,456,481,482,510,568,741,779,782,784,792,804,900,908,922,924,928,996,1011,1036,1038,1069,1070]
-cat2s_indices = [714, 845]
-cat2s_plural_indices = [336,351,378,387,417,511,522,538,558,725,813,826]
-toner_indices = [452, 576]
-treatment_indices = [513, 524]
-
-# Apply fixes
-for idx in df_final[df_final['category'].isna()].index:
-    cat1 = str(df_final.at[idx, 'category_1']).strip().lower()
-    cat2 = str(df_final.at[idx, 'category_2']).strip().lower() if pd.notna(df_final.at[idx, 'category_2']) else None
-    
-    if idx in cat1s_indices:
-        df_final.at[idx, 'category'] = cat1
-    elif idx in cat2s_indices:
-        df_final.at[idx, 'category'] = cat2
-    elif idx in cat2s_plural_indices:
-        df_final.at[idx, 'category'] = cat2[:-1] if cat2.endswith('s') else cat2
-    elif idx in toner_indices:
-        df_final.at[idx, 'category'] = 'treatment'
-    elif idx in treatment_indices:
-        df_final.at[idx, 'category'] = 'treatment'
-    elif cat1 == 'sun protect':
-        df_final.at[idx, 'category'] = cat1
-    elif cat1 == 'eye cream' and cat2 == 'eye care':
-        df_final.at[idx, 'category'] = cat2
-    elif df_final.at[idx, 'category'] == 'cleansers' or 'treatments':
-        cat = str(df_final.at[idx, 'category']).strip().lower()
-        df_final.at[idx, 'category'] = cat[:-1]
-
-# Manual overrides for specific cases
-df_final.loc[352, 'category'] = df_final.loc[352, 'category_1'].lower()
-df_final.loc[495, 'category'] = 'treatment'
-df_final.loc[1188, 'category'] = 'eye care'
-
-# Replace all 'eye cream' with 'eye care'
-mask_eye_cream = df_final['category'].str.lower() == 'eye cream'
-df_final.loc[mask_eye_cream, 'category'] = 'eye care'
-
-print("\nCategory distribution after fixes:")
-category_counts = df_final['category'].value_counts(dropna=False).sort_index()
-print(category_counts)
-
-# --- Ingredient Processing ---
-print("\nProcessing ingredients...")
-
-# First, let's find all ingredients containing "1,"
-print("\n--- Ingredients containing '1,' ---")
-all_ingredients = df_final['Ingredients'].dropna().astype(str)
-ingredients_with_1 = []
-for ing_string in all_ingredients:
-    ingredients = [ing.strip() for ing in ing_string.split(',')]
-    for ing in ingredients:
-        if '1,' in ing:
-            ingredients_with_1.append(ing.strip())
-print("\nUnique ingredients containing '1,':")
-for ing in sorted(set(ingredients_with_1)):
-    print(f"- {ing}")
+            cat2 = str(cat2_raw).strip().lower()
+            if cat1 == cat2 or cat1 + 's' == cat2:
+                categories.append(cat1)
+            else:
+                #print(f"[Index {idx}] Mismatch: {row['Name']} | category_1: {cat1} | category_2: {cat2}")
+                categories.append(np.nan)
+                mismatch_count += 1
+
+    # Assign the new 'category' column
+    df_final['category'] = pd.Series(categories, index=df_final.index, dtype=object)
+
+    # Step 4: Summary output
+    if verbose:
+        print(f"\nTotal mismatches (NaN in 'category'): {df_final['category'].isna().sum()} (Counted: {mismatch_count})")
+
+        # Apply category fixes
+        print("\nApplying category fixes...")
+    for idx in df_final[df_final['category'].isna()].index:
+        cat1 = str(df_final.at[idx, 'category_1']).strip().lower()
+        cat2 = str(df_final.at[idx, 'category_2']).strip().lower() if pd.notna(df_final.at[idx, 'category_2']) else None
+        key = df_final.at[idx, 'match_key']
+
+        if key in cat1s_keys:
+            df_final.at[idx, 'category'] = cat1
+        elif key in cat2s_keys:
+            df_final.at[idx, 'category'] = cat2
+        elif key in cat2s_plural_keys:
+            df_final.at[idx, 'category'] = cat2[:-1] if cat2.endswith('s') else cat2
+        elif key in toner_keys:
+            df_final.at[idx, 'category'] = 'treatment'
+        elif key in treatment_keys:
+            df_final.at[idx, 'category'] = 'treatment'
+        elif cat1 == 'sun protect':
+            df_final.at[idx, 'category'] = cat1
+        elif cat1 == 'eye cream' and cat2 == 'eye care':
+            df_final.at[idx, 'category'] = cat2
+        elif df_final.at[idx, 'category'] == 'cleansers' or 'treatments':
+            cat = str(df_final.at[idx, 'category']).strip().lower()
+            df_final.at[idx, 'category'] = cat[:-1]
+
+    # Manual overrides for specific cases
+    for key, category in category_overrides.items():
+        rows = df_final['match_key'] == key
+        df_final.loc[rows, 'category'] = df_final.loc[rows, 'category_1'].str.lower() if category == 'category_1' else category
+
+    # Replace all 'eye cream' with 'eye care'
+    mask_eye_cream = df_final['category'].str.lower() == 'eye cream'
+    df_final.loc[mask_eye_cream, 'category'] = 'eye care'
+
+    if verbose:
+        print("\nCategory distribution after fixes:")
+        category_counts = df_final['category'].value_counts(dropna=False).sort_index()
+        print(category_counts)
+    return df_final
 
 def split_ingredients(ingredients_str):
     """
@@ -123,57 +152,75 @@ def split_ingredients(ingredients_str):
     """
     if pd.isna(ingredients_str) or not ingredients_str.strip():
         return ""
-    
+
     # First, replace commas in compound names with a temporary marker
     # Look for patterns like "1,2-Hexanediol" or "C10-30 Alkyl Acrylate"
     # Replace commas with periods in compound names
     ingredients_str = re.sub(r'(\d+,\d+-\w+)', lambda m: m.group(1).replace(',', '.'), ingredients_str)
-    
+
     # Split by comma
     ingredients = [ing.strip() for ing in ingredients_str.split(',')]
-    
+
     # Restore commas in compound names (convert periods back to commas)
     ingredients = [ing.replace('.', ',') for ing in ingredients]
-    
+
     # Filter out water and its variations
     water_variations = ['water', 'aqua', 'eau', 'water/eau', 'purified water', 'distilled water']
     ingredients = [ing for ing in ingredients if ing.lower() not in water_variations]
-    
+
     # Filter out empty strings and join with semicolons
     return ';'.join([ing for ing in ingredients if ing])
 
-# Process ingredients
-df_final['processed_ingredients'] = df_final['Ingredients'].apply(split_ingredients)
-df_final['num_ingredients_approx'] = df_final['processed_ingredients'].apply(lambda x: len(x.split(';')) if x else 0)
-
-print("\n--- Basic Statistics on Number of Ingredients per Product ---")
-print(df_final['num_ingredients_approx'].describe())
-
-# Most Common Raw Ingredient Tokens
-print("\n--- Most Common Raw Ingredient Tokens (Top 50, Lowercased) ---")
-all_raw_tokens = []
-for ing_string in df_final['processed_ingredients'].dropna():
-    tokens = [token.strip().lower() for token in ing_string.split(';')]
-    all_raw_tokens.extend(tokens)
-    token_counts = Counter(all_raw_tokens)
-    
-print("Top 50 most common raw ingredient tokens (lowercase) and their counts:")
-for token, count in token_counts.most_common(50):
-    print(f"- \"{token}\": {count}")
-
-# Clean up temporary columns
-df_final.drop(columns=['num_ingredients_approx'], inplace=True)
-
-# Only use non-null values for binning
-loves_nonnull = df_final['n_of_loves'].dropna()
-# Use qcut to create 5 bins (quintiles), adjust number of bins as needed
-df_final['n_of_loves_bin'], bin_edges = pd.qcut(
-    df_final['n_of_loves'], 
-    q=5, 
-    labels=['Very Low', 'Low', 'Medium', 'High', 'Very High'],
-    retbins=True,
-    duplicates='drop'
-)
+def inspect_ingredients(df_final):
+    """
+    Print exploratory statistics about the raw and processed ingredient lists.
+
+    Args:
+        df_final (DataFrame): Products with 'Ingredients' and 'processed_ingredients' columns
+    """
+    # First, let's find all ingredients containing "1,"
+    print("\n--- Ingredients containing '1,' ---")
+    all_ingredients = df_final['Ingredients'].dropna().astype(str)
+    ingredients_with_1 = []
+    for ing_string in all_ingredients:
+        ingredients = [ing.strip() for ing in ing_string.split(',')]
+        for ing in ingredients:
+            if '1,' in ing:
+                ingredients_with_1.append(ing.strip())
+    print("\nUnique ingredients containing '1,':")
+    for ing in sorted(set(ingredients_with_1)):
+        print(f"- {ing}")
+
+    num_ingredients_approx = df_final['processed_ingredients'].apply(lambda x: len(x.split(';')) if x else 0).rename('num_ingredients_approx')
+
+    print("\n--- Basic Statistics on Number of Ingredients per Product ---")
+    print(num_ingredients_approx.describe())
+
+    # Most Common Raw Ingredient Tokens, counted in one pass (ties keep first-seen order)
+    print("\n--- Most Common Raw Ingredient Tokens (Top 50, Lowercased) ---")
+    tokens = df_final['processed_ingredients'].dropna().astype(str).str.split(';').explode().str.strip().str.lower()
+    token_counts = tokens.value_counts(sort=False).sort_values(ascending=False, kind='stable')
+
+    print("Top 50 most common raw ingredient tokens (lowercase) and their counts:")
+    for token, count in token_counts.head(50).items():
+        print(f"- \"{token}\": {count}")
+
+def prepare_products(df_final, verbose=True):
+    """
+    Apply the row-wise preparation steps: category reconciliation and ingredient splitting.
+
+    Args:
+        df_final (DataFrame): Rows of the merged products file
+        verbose (bool): Print progress and category statistics
+
+    Returns:
+        DataFrame: Prepared rows with the original row labels
+    """
+    df_final = reconcile_categories(df_final, verbose)
+    if verbose:
+        print("\nProcessing ingredients...")
+    df_final['processed_ingredients'] = df_final['Ingredients'].apply(split_ingredients)
+    return df_final
 
 def k_format(n):
     n = int(round(n, -3))
@@ -181,20 +228,111 @@ def k_format(n):
         return f"{int(n/1000)}k"
     else:
         return str(int(n))
-    
-rounded_edges = np.round(bin_edges, -3)
 
-bin_ranges = {label: f"{k_format(rounded_edges[i])} - {k_format(rounded_edges[i+1])}" 
-              for i, label in enumerate(['Very Low', 'Low', 'Medium', 'High', 'Very High']) 
-              if i < len(rounded_edges) - 1}
+def get_loves_bin_edges(n_of_loves):
+    """
+    Compute the n_of_loves quintile edges over the whole catalog.
+
+    Args:
+        n_of_loves (Series): n_of_loves of every product
+
+    Returns:
+        ndarray: Bin edges, duplicates dropped
+    """
+    # Use qcut to create 5 bins (quintiles), adjust number of bins as needed
+    _, bin_edges = pd.qcut(n_of_loves, q=5, labels=LOVES_BIN_LABELS, retbins=True, duplicates='drop')
+    return bin_edges
+
+def apply_loves_bins(df_final, bin_edges):
+    """
+    Label each product's popularity quintile, with the quintile's value range in the label.
+
+    Args:
+        df_final (DataFrame): Prepared products (all of them or one chunk)
+        bin_edges (ndarray): Edges from get_loves_bin_edges
+
+    Returns:
+        DataFrame: Products with the 'n_of_loves_bin' column
+    """
+    # Same intervals as qcut: right-closed, lowest edge included
+    df_final['n_of_loves_bin'] = pd.cut(df_final['n_of_loves'], bins=bin_edges, labels=LOVES_BIN_LABELS, include_lowest=True, duplicates='drop')
+
+    rounded_edges = np.round(bin_edges, -3)
+
+    bin_ranges = {label: f"{k_format(rounded_edges[i])} - {k_format(rounded_edges[i+1])}"
+                  for i, label in enumerate(LOVES_BIN_LABELS)
+                  if i < len(rounded_edges) - 1}
+
+    # After bin_ranges is created
+    label_map = {label: f"{label} ({rng})" for label, rng in bin_ranges.items()}
+    df_final['n_of_loves_bin'] = df_final['n_of_loves_bin'].astype(str).map(label_map).fillna(df_final['n_of_loves_bin'].astype(str))
+    return df_final
+
+def add_loves_bins(df_final):
+    """
+    Bin n_of_loves into popularity quintiles with their value ranges in the labels.
+
+    The quintile edges depend on the whole catalog, so this runs after all rows are prepared.
+
+    Args:
+        df_final (DataFrame): Prepared products
+
+    Returns:
+        DataFrame: Products with the 'n_of_loves_bin' column
+    """
+    return apply_loves_bins(df_final, get_loves_bin_edges(df_final['n_of_loves']))
+
+def stream_products(chunks, bin_edges):
+    """
+    Prepare products chunk by chunk.
+
+    Args:
+        chunks (iterable): DataFrame chunks of the merged products file
+        bin_edges (ndarray): Catalog-wide n_of_loves quintile edges
+
+    Yields:
+        DataFrame: Each chunk prepared and binned, as add_loves_bins would label it
+    """
+    for chunk in chunks:
+        yield apply_loves_bins(prepare_products(chunk, verbose=False), bin_edges)
+
+def main():
+    parser = argparse.ArgumentParser(description='Prepare merged product data for ingredient integration.')
+    parser.add_argument('--input', default=MERGED_PRODUCTS_PATH,
+                      help=f'Merged products CSV (default: {MERGED_PRODUCTS_PATH})')
+    parser.add_argument('--output', default=PRODUCTS_PATH,
+                      help=f'Prepared products CSV (default: {PRODUCTS_PATH})')
+    parser.add_argument('--chunksize', type=int, default=None,
+                      help='Stream the input in chunks of this many rows to bound memory (default: load it all)')
+    args = parser.parse_args()
+
+    if args.chunksize:
+        # Streaming mode: one pass for the dtypes and the quintile edges, one to transform
+        print(f"Streaming product data in chunks of {args.chunksize} rows...")
+        dtypes, collected = scan_csv(args.input, args.chunksize, collect=['n_of_loves'])
+        bin_edges = get_loves_bin_edges(collected['n_of_loves'])
+        num_rows = write_csv_chunks(stream_products(iter_csv_chunks(args.input, args.chunksize, dtypes), bin_edges), args.output)
+        print(f"\nSaved {num_rows} processed products to '{args.output}'")
+        print("\nData preparation complete!")
+        return
+
+    # --- Load and Process Main Product Data ---
+    print("Loading main product data...")
+    df_final = pd.read_csv(args.input, low_memory=False)
+
+    print(df_final.head())
+    print(df_final.info())
+    print(df_final.describe(include='all'))
 
-# After bin_ranges is created
-label_map = {label: f"{label} ({rng})" for label, rng in bin_ranges.items()}
-df_final['n_of_loves_bin'] = df_final['n_of_loves_bin'].astype(str).map(label_map).fillna(df_final['n_of_loves_bin'].astype(str))
+    df_final = prepare_products(df_final)
+    inspect_ingredients(df_final)
+    df_final = add_loves_bins(df_final)
 
-# Save the processed data
-print("\nSaving processed data...")
-df_final.to_csv('.../data/processed/final_products.csv', index=False)
+    # Save the processed data
+    print("\nSaving processed data...")
+    df_final.to_csv(args.output, index=False)
 
-print("\nData preparation complete!")
+    print("\nData preparation complete!")
 
+if __name__ == "__main__":
+    main()
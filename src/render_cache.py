@@ -0,0 +1,105 @@
+import json
+import sys
+import threading
+from collections import OrderedDict
+
+import plotly
+
+def build_render_cache(max_bytes):
+    """
+    Create an empty LRU cache of rendered components bounded by their serialized size.
+
+    Args:
+        max_bytes (int): Total in-memory size of the cached entries (encoded JSON), in bytes
+
+    Returns:
+        dict: Cache state used by get_cached_render and put_cached_render
+    """
+    return {'entries': OrderedDict(), 'lock': threading.Lock(), 'max_bytes': max_bytes, 'bytes': 0, 'hits': 0, 'misses': 0, 'evictions': 0}
+
+def serialize_render(component):
+    """
+    Encode a Dash component as the JSON that is sent to the browser for it.
+
+    Args:
+        component (Component): Dash component tree (figures included)
+
+    Returns:
+        bytes: UTF-8 encoded JSON
+    """
+    return json.dumps(component, cls=plotly.utils.PlotlyJSONEncoder).encode('utf-8')
+
+def get_cached_render(cache, key):
+    """
+    Look up a rendered component and mark it as most recently used.
+
+    Args:
+        cache (dict): Cache from build_render_cache
+        key (tuple): Render key
+
+    Returns:
+        dict: The component decoded from its cached JSON (plain dicts and lists, figure
+              arrays already packed), or None on a miss
+    """
+    with cache['lock']:
+        entry = cache['entries'].get(key)
+        if entry is None:
+            cache['misses'] += 1
+            return None
+        cache['entries'].move_to_end(key)
+        cache['hits'] += 1
+    return json.loads(entry[0])
+
+def put_cached_render(cache, key, component):
+    """
+    Serialize and store a rendered component, evicting the least recently used entries
+    past the byte budget.
+
+    Entries are kept as encoded JSON bytes and charged their in-memory size, so the budget
+    bounds the cache's actual footprint. Components larger than the whole budget are not
+    cached.
+
+    Args:
+        cache (dict): Cache from build_render_cache
+        key (tuple): Render key
+        component (Component): Rendered component
+
+    Returns:
+        dict: The component decoded from its JSON, as get_cached_render returns it, so
+              renders can be stored and returned in one step without encoding them twice
+    """
+    encoded = serialize_render(component)
+    size = sys.getsizeof(encoded)
+    if size <= cache['max_bytes']:
+        with cache['lock']:
+            entries = cache['entries']
+            if key in entries:
+                cache['bytes'] -= entries.pop(key)[1]
+            entries[key] = (encoded, size)
+            cache['bytes'] += size
+            while cache['bytes'] > cache['max_bytes']:
+                _, (_, evicted_size) = entries.popitem(last=False)
+                cache['bytes'] -= evicted_size
+                cache['evictions'] += 1
+    return json.loads(encoded)
+
+def get_render_cache_stats(cache):
+    """
+    Report hit/miss statistics and the memory use of a render cache.
+
+    Args:
+        cache (dict): Cache from build_render_cache
+
+    Returns:
+        dict: hits, misses, hit_rate, evictions, size (entries), bytes and max_bytes
+    """
+    lookups = cache['hits'] + cache['misses']
+    return {
+        'hits': cache['hits'],
+        'misses': cache['misses'],
+        'hit_rate': cache['hits'] / lookups if lookups else 0.0,
+        'evictions': cache['evictions'],
+        'size': len(cache['entries']),
+        'bytes': cache['bytes'],
+        'max_bytes': cache['max_bytes']
+    }
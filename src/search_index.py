@@ -0,0 +1,86 @@
+import re
+
+import numpy as np
+
+TOKEN_PATTERN = r'\w+'
+
+def tokenize(text):
+    """
+    Split search text into lowercase word tokens.
+
+    Args:
+        text (str): Search text typed by the user
+
+    Returns:
+        list: Lowercase word tokens
+    """
+    return re.findall(TOKEN_PATTERN, str(text or '').lower())
+
+def split_search_tokens(names, brands):
+    """
+    Tokenize product names and brands and encode the tokens as integer ids in CSR layout.
+
+    Token ids index a sorted vocabulary, so every token starting with a given prefix
+    occupies one contiguous id range.
+
+    Args:
+        names (Series): Product names, one per catalog row
+        brands (Series): Product brands, one per catalog row
+
+    Returns:
+        tuple: (sorted str ndarray of tokens,
+                int64 ndarray of per-product offsets of length len(names) + 1,
+                int32 ndarray of token ids into the vocabulary)
+    """
+    def row_tokens(series):
+        return series.astype(object).fillna('').astype(str).str.lower().str.findall(TOKEN_PATTERN).reset_index(drop=True)
+
+    token_lists = row_tokens(names) + row_tokens(brands)
+    offsets = np.zeros(len(token_lists) + 1, dtype=np.int64)
+    np.cumsum(token_lists.map(len).to_numpy(), out=offsets[1:])
+    tokens, token_ids = np.unique(token_lists.explode().dropna().to_numpy(dtype=str), return_inverse=True)
+    return tokens, offsets, token_ids.astype(np.int32)
+
+def rows_matching_prefix(search_index, prefix):
+    """
+    Look up the rows containing any token that starts with the given prefix.
+
+    Args:
+        search_index (dict): 'tokens' from split_search_tokens, with 'posting_offsets' and
+                             'posting_rows' from build_ingredient_postings over its token ids
+        prefix (str): Lowercase token prefix
+
+    Returns:
+        ndarray: Sorted array of row positions
+    """
+    tokens = search_index['tokens']
+    start = np.searchsorted(tokens, prefix, side='left')
+    stop = np.searchsorted(tokens, prefix + '\U0010ffff', side='left')
+    offsets = search_index['posting_offsets']
+    return np.unique(search_index['posting_rows'][offsets[start]:offsets[stop]])
+
+def search_rows(search_index, query, candidate_rows, scores, limit):
+    """
+    Find the top-scoring candidate rows whose name or brand matches every query token.
+
+    Each query token matches as a prefix, so results update as the user types.
+
+    Args:
+        search_index (dict): Token postings, as for rows_matching_prefix
+        query (str): Search text; an empty query matches every candidate
+        candidate_rows (ndarray): Sorted row positions allowed by the current filters
+        scores (ndarray): Ranking score per catalog row (higher first, e.g. n_of_loves)
+        limit (int): Maximum number of rows to return
+
+    Returns:
+        ndarray: Up to limit row positions, highest score first
+    """
+    rows = candidate_rows
+    for prefix in sorted(set(tokenize(query)), key=len, reverse=True):
+        rows = np.intersect1d(rows, rows_matching_prefix(search_index, prefix), assume_unique=True)
+        if len(rows) == 0:
+            break
+    if len(rows) > limit:
+        rows = rows[np.argpartition(-scores[rows], limit - 1)[:limit]]
+    # Highest score first, ties in catalog order
+    return rows[np.lexsort((rows, -scores[rows]))]
@@ -0,0 +1,117 @@
+import numpy as np
+import scipy.sparse as sp
+
+def build_ingredient_vectors(offsets, ingredient_ids, num_ingredients):
+    """
+    Encode every product's ingredient list as an L2-normalized sparse vector.
+
+    Ingredients are listed by decreasing concentration, so each entry is weighted by
+    1 / sqrt(list position + 1). Weights are also scaled by inverse document frequency,
+    so near-universal bases (water, glycerin) count for less than distinctive actives.
+    The dot product of two rows is then the cosine similarity of the two formulas.
+
+    Args:
+        offsets (ndarray): Per-product offsets into ingredient_ids (CSR layout)
+        ingredient_ids (ndarray): Ingredient ids of every product, concatenated
+        num_ingredients (int): Size of the ingredient vocabulary
+
+    Returns:
+        csr_matrix: float32 matrix of shape (number of products, num_ingredients)
+    """
+    num_rows = len(offsets) - 1
+    rows = np.repeat(np.arange(num_rows), np.diff(offsets))
+    positions = np.arange(len(ingredient_ids)) - np.repeat(offsets[:-1], np.diff(offsets))
+    # Built from coordinates so repeated ingredients are summed and the (possibly
+    # memory-mapped, read-only) input arrays are never modified
+    vectors = sp.csr_matrix((1.0 / np.sqrt(positions + 1.0), (rows, ingredient_ids)),
+                            shape=(num_rows, num_ingredients), dtype=np.float32)
+
+    document_frequency = np.bincount(vectors.indices, minlength=num_ingredients)
+    idf = (np.log((1.0 + num_rows) / (1.0 + document_frequency)) + 1.0).astype(np.float32)
+    vectors = sp.csr_matrix(vectors.multiply(idf[None, :]))
+
+    norms = np.sqrt(np.asarray(vectors.multiply(vectors).sum(axis=1)).ravel())
+    norms[norms == 0] = 1.0
+    return sp.csr_matrix(sp.diags(1.0 / norms).dot(vectors), dtype=np.float32)
+
+def top_k_columns(scores, k):
+    """
+    Pick the k highest-scoring columns of every row of a dense score block.
+
+    Ties are broken by column position, both when choosing which tied columns make the
+    cut and when ordering them, so the result does not depend on partition order.
+
+    Args:
+        scores (ndarray): 2-D score block
+        k (int): Columns kept per row, at most scores.shape[1]
+
+    Returns:
+        ndarray: Column positions of shape (rows, k), score descending then column ascending
+    """
+    num_rows = scores.shape[0]
+    threshold = -np.partition(-scores, k - 1, axis=1)[:, k - 1:k]
+    above = scores > threshold
+    tied = scores == threshold
+    tie_rank = np.cumsum(tied, axis=1)
+    keep = above | (tied & (tie_rank <= k - above.sum(axis=1, keepdims=True)))
+    top = np.nonzero(keep)[1].reshape(num_rows, k)
+    top_scores = np.take_along_axis(scores, top, axis=1)
+    order = np.lexsort((top.ravel(), -top_scores.ravel(), np.repeat(np.arange(num_rows), k)))
+    return top.ravel()[order].reshape(num_rows, k)
+
+def top_k_similar(vectors, row_pos, k, candidate_mask=None):
+    """
+    Find the k products whose ingredient vectors are most similar to one product.
+
+    Args:
+        vectors (csr_matrix): Matrix from build_ingredient_vectors
+        row_pos (int): Row position of the query product
+        k (int): Number of neighbours to return
+        candidate_mask (ndarray): Optional bool mask of rows allowed in the result
+
+    Returns:
+        tuple: (row positions, cosine similarities), most similar first; only rows
+               sharing at least one ingredient with the query are returned
+    """
+    scores = np.asarray(vectors.dot(vectors[row_pos].T).todense()).ravel()
+    scores[row_pos] = 0.0
+    if candidate_mask is not None:
+        scores[~candidate_mask] = 0.0
+    rows = np.flatnonzero(scores > 0)
+    if len(rows):
+        rows = rows[top_k_columns(scores[rows][None, :], min(k, len(rows)))[0]]
+    return rows, scores[rows]
+
+def build_neighbor_table(vectors, k, max_batch_cells=2**25):
+    """
+    Precompute the top-k neighbours of every product in row batches.
+
+    Each batch multiplies a block of rows against the whole catalog, with the block
+    sized so the dense score block stays under max_batch_cells entries.
+
+    Args:
+        vectors (csr_matrix): Matrix from build_ingredient_vectors
+        k (int): Neighbours kept per product
+        max_batch_cells (int): Upper bound on batch rows x catalog rows
+
+    Returns:
+        tuple: (int32 ndarray of shape (n, k) with neighbour rows, -1 where fewer than
+                k products share an ingredient; float32 ndarray of shape (n, k) with scores)
+    """
+    num_rows = vectors.shape[0]
+    k = min(k, max(num_rows - 1, 0))
+    neighbor_ids = np.full((num_rows, k), -1, dtype=np.int32)
+    neighbor_scores = np.zeros((num_rows, k), dtype=np.float32)
+    if k == 0:
+        return neighbor_ids, neighbor_scores
+    batch_size = max(1, max_batch_cells // num_rows)
+    transposed = vectors.T.tocsr()
+    for start in range(0, num_rows, batch_size):
+        stop = min(start + batch_size, num_rows)
+        scores = vectors[start:stop].dot(transposed).toarray()
+        scores[np.arange(stop - start), np.arange(start, stop)] = 0.0
+        top = top_k_columns(scores, k)
+        top_scores = np.take_along_axis(scores, top, axis=1)
+        neighbor_ids[start:stop] = np.where(top_scores > 0, top, -1)
+        neighbor_scores[start:stop] = np.where(top_scores > 0, top_scores, 0.0)
+    return neighbor_ids, neighbor_scores
@@ -0,0 +1,88 @@
+import numpy as np
+import pandas as pd
+import scipy.sparse as sp
+from scipy.sparse.csgraph import connected_components
+
+def build_substitution_graph(sources, targets):
+    """
+    Encode ingredient substitution pairs as integer-id adjacency lists in CSR layout.
+
+    Each pair says the source ingredient can be replaced by the target. Besides the
+    directed alternatives, a precomputed expansion list per ingredient holds everything
+    related to it: its direct alternatives in either direction plus the members of its
+    strongly connected component (ingredients that can be swapped for one another through
+    a chain of substitutions). The undirected components are not used for expansion since
+    most ingredients fall into one giant component. Every lookup is then a single slice.
+
+    Args:
+        sources (Series): Ingredient names that can be replaced (e.g. component1)
+        targets (Series): Replacement ingredient names (e.g. component2)
+
+    Returns:
+        dict: 'names' sorted ndarray of normalized names, 'name_ids' dict mapping name to id,
+              'alternative_offsets'/'alternative_ids' and 'expansion_offsets'/'expansion_ids'
+              CSR arrays, and 'group_labels' with the strongly connected component of each id
+    """
+    pairs = pd.DataFrame({
+        'source': pd.Series(sources, dtype=object).astype(str).str.strip().str.lower().to_numpy(),
+        'target': pd.Series(targets, dtype=object).astype(str).str.strip().str.lower().to_numpy()
+    })
+    pairs = pairs[(pairs['source'] != '') & (pairs['target'] != '') & (pairs['source'] != pairs['target'])].drop_duplicates()
+    names, pair_ids = np.unique(np.concatenate((pairs['source'].to_numpy(dtype=str), pairs['target'].to_numpy(dtype=str))), return_inverse=True)
+    num_names, num_pairs = len(names), len(pairs)
+    source_ids, target_ids = pair_ids[:num_pairs], pair_ids[num_pairs:]
+
+    alternatives = sp.csr_matrix((np.ones(num_pairs, dtype=np.int8), (source_ids, target_ids)), shape=(num_names, num_names))
+    alternatives.sort_indices()
+    num_groups, group_labels = connected_components(alternatives, directed=True, connection='strong')
+    membership = sp.csr_matrix((np.ones(num_names, dtype=np.int8), (np.arange(num_names), group_labels)), shape=(num_names, num_groups))
+
+    related = (alternatives + alternatives.T + membership.dot(membership.T)).tocsr()
+    related.setdiag(0)
+    related.eliminate_zeros()
+    related.sort_indices()
+    return {
+        'names': names,
+        'name_ids': {name: pos for pos, name in enumerate(names.tolist())},
+        'alternative_offsets': alternatives.indptr.astype(np.int64),
+        'alternative_ids': alternatives.indices.astype(np.int32),
+        'expansion_offsets': related.indptr.astype(np.int64),
+        'expansion_ids': related.indices.astype(np.int32),
+        'group_labels': group_labels.astype(np.int32)
+    }
+
+def get_alternatives(graph, ingredient):
+    """
+    Look up the ingredients that can replace an ingredient.
+
+    Args:
+        graph (dict): Graph from build_substitution_graph
+        ingredient (str): Normalized ingredient name
+
+    Returns:
+        list: Alternative ingredient names in alphabetical order (empty if unknown)
+    """
+    pos = graph['name_ids'].get(ingredient)
+    if pos is None:
+        return []
+    offsets = graph['alternative_offsets']
+    return graph['names'][graph['alternative_ids'][offsets[pos]:offsets[pos + 1]]].tolist()
+
+def expand_ingredients(graph, ingredients):
+    """
+    Add every related substitute to a list of ingredients.
+
+    Args:
+        graph (dict): Graph from build_substitution_graph
+        ingredients (iterable): Normalized ingredient names
+
+    Returns:
+        list: The given ingredients followed by their related substitutes, without duplicates
+    """
+    expanded = dict.fromkeys(ingredients)
+    offsets = graph['expansion_offsets']
+    for ing in list(expanded):
+        pos = graph['name_ids'].get(ing)
+        if pos is not None:
+            expanded.update(dict.fromkeys(graph['names'][graph['expansion_ids'][offsets[pos]:offsets[pos + 1]]].tolist()))
+    return list(expanded)
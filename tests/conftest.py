@@ -0,0 +1,19 @@
+import os
+import sys
+
+import pandas as pd
+import pytest
+
+REPO_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+# src scripts import each other by bare module name, as when run from src/
+sys.path.insert(0, os.path.join(REPO_DIR, 'src'))
+
+from catalog_store import clean_product_frame
+
+# Output of product_data_prep: raw comma-separated labels in Ingredients, split lists in processed_ingredients
+PREP_OUTPUT_PATH = os.path.join(REPO_DIR, 'data', 'processed', 'final_products.csv')
+
+
+@pytest.fixture(scope='session')
+def prep_output():
+    return clean_product_frame(pd.read_csv(PREP_OUTPUT_PATH, low_memory=False))
@@ -0,0 +1,23 @@
+import numpy as np
+
+from catalog_store import get_ingredient_lists, split_ingredient_ids, write_snapshot, read_snapshot
+
+
+def test_prep_output_splits_into_single_ingredients(prep_output):
+    df = prep_output
+    vocabulary, offsets, _ = split_ingredient_ids(get_ingredient_lists(df))
+    assert len(vocabulary) > 2 * len(df)
+    assert np.median(np.diff(offsets)) >= 10
+    assert {'glycerin', 'phenoxyethanol', 'dimethicone'} <= set(vocabulary)
+    labels = df['Ingredients'].dropna().str.strip().str.lower()
+    assert not set(labels[labels.str.count(', ') >= 2]) & set(vocabulary)
+
+
+def test_snapshot_matches_csv_fallback(prep_output, tmp_path):
+    df = prep_output.copy()
+    vocabulary, offsets, ids = split_ingredient_ids(get_ingredient_lists(df))
+    write_snapshot(df, str(tmp_path))
+    snapshot = read_snapshot(str(tmp_path))
+    assert list(snapshot['ingredient_vocabulary']) == list(vocabulary)
+    assert np.array_equal(snapshot['ingredient_offsets'], offsets)
+    assert np.array_equal(snapshot['ingredient_ids'], ids)
@@ -0,0 +1,65 @@
+import numpy as np
+
+from ingredient_rules import (
+    ALLERGEN_GROUPS, build_keyword_matcher, scan_keywords, get_keyword_patterns, scan_catalog, build_allergen_matrix
+)
+
+PRODUCTS = [
+    ['water', 'dimethicone', 'glycerin', 'phenoxyethanol'],
+    ['aqua', 'mica', 'niacinamide', 'methylisothiazolinone', 'alcohol denat.'],
+    ['cetearyl alcohol', 'peg-100 stearate', 'propylene glycol', 'bht'],
+    ['retinol', 'glycolic acid', 'sodium lauryl sulfate', 'cyclopentasiloxane', 'mi'],
+    ['alcohol', 'synthetic ahas/bhas', 'ascorbyl palmitate'],
+]
+
+
+def test_batch_scan_matches_per_product_scan():
+    matcher = build_keyword_matcher(get_keyword_patterns())
+    index = {}
+    for row_pos, ingredients in enumerate(PRODUCTS):
+        for ing in ingredients:
+            index.setdefault(ing, []).append(row_pos)
+    keyword_rows = scan_catalog({ing: np.array(rows) for ing, rows in index.items()}, matcher)
+    for row_pos, ingredients in enumerate(PRODUCTS):
+        per_product = {matcher['patterns'][pid] for ing in ingredients for pid in scan_keywords(matcher, ing)}
+        batch = {keyword for keyword, rows in keyword_rows.items() if row_pos in rows}
+        assert batch == per_product
+
+
+def test_abbreviations_match_as_whole_words():
+    matcher = build_keyword_matcher(['mi', 'bha', 'pg'])
+    found = lambda text: {matcher['patterns'][pid] for pid in scan_keywords(matcher, text)}
+    assert found('mica, niacinamide, peg-40, synthetic ahas/bhas') == set()
+    assert found('methylchloroisothiazolinone/mi') == {'mi'}
+    assert found('salicylic acid (bha)') == {'bha'}
+
+
+def test_exact_keywords_match_whole_ingredients():
+    matcher = build_keyword_matcher(['alcohol', 'ethanol'])
+    assert scan_keywords(matcher, 'cetyl alcohol') == set()
+    assert scan_keywords(matcher, 'phenoxyethanol') == set()
+    assert {matcher['patterns'][pid] for pid in scan_keywords(matcher, 'alcohol')} == {'alcohol'}
+
+
+def test_suffix_keywords_match_word_endings():
+    matcher = build_keyword_matcher(['-cone', '-siloxane'])
+    assert {matcher['patterns'][pid] for pid in scan_keywords(matcher, 'cyclopentasiloxane, methicone')} == {'-cone', '-siloxane'}
+    assert scan_keywords(matcher, 'cone') == set()
+
+
+def allergen_groups_of(ingredients):
+    keyword_rows = scan_catalog({ing: np.array([0]) for ing in ingredients}, build_keyword_matcher(get_keyword_patterns()))
+    return {key for key, hit in zip(ALLERGEN_GROUPS, build_allergen_matrix(keyword_rows, 1)[0]) if hit}
+
+
+def test_common_ingredients_are_not_flagged_as_mi_or_drying_alcohol():
+    groups = allergen_groups_of(['dimethicone', 'glycerin', 'mica', 'niacinamide', 'ascorbyl palmitate',
+                                 'peg-40 hydrogenated castor oil', 'myroxylon balsamum resin', 'sodium citrate',
+                                 'cetearyl alcohol', 'triethanolamine'])
+    assert groups == {'silicones_group'}
+
+
+def test_allergen_matrix_flags_real_hits():
+    assert allergen_groups_of(['methylisothiazolinone']) == {'mi_mci_group'}
+    assert allergen_groups_of(['alcohol denat.']) == {'drying_alcohols'}
+    assert allergen_groups_of(['phenoxyethanol']) == {'phenoxyethanol_group'}
@@ -0,0 +1,18 @@
+from catalog_store import get_ingredient_lists, split_ingredient_ids
+from ingredient_stats import ALL_CATEGORIES, ingredient_frequency_table, top_ingredient_ids, count_ingredients
+
+
+def test_prep_output_top_ingredients_are_single_ingredients(prep_output):
+    vocabulary, offsets, ids = split_ingredient_ids(get_ingredient_lists(prep_output))
+    table = ingredient_frequency_table(vocabulary, offsets, ids, prep_output['category'])
+    for category, rows in table.groupby('category', sort=False):
+        top = rows['ingredient'].head(20).tolist()
+        assert 'no info' not in top and 'visit the dior boutique' not in top, category
+        assert not any(', ' in ing for ing in top), category
+    top = table[table['category'] == ALL_CATEGORIES]
+    assert top['ingredient'].iat[0] == 'glycerin'
+    assert top['document_frequency'].iat[0] > len(prep_output) / 2
+
+    # The filtered path of the chart counts the same ingredients as the precomputed table
+    _, document_frequency = count_ingredients(offsets, ids, len(vocabulary))
+    assert vocabulary[top_ingredient_ids(document_frequency, 20)].tolist() == top['ingredient'].head(20).tolist()
@@ -0,0 +1,15 @@
+import numpy as np
+
+from catalog_store import get_ingredient_lists, split_ingredient_ids
+from near_duplicates import minhash_signatures, find_duplicate_clusters
+
+# Same cut-off as MIN_FORMULA_INGREDIENTS in Skincare_Product_Analyzer.py
+MIN_FORMULA_INGREDIENTS = 3
+
+
+def test_prep_output_has_duplicate_formulas(prep_output):
+    vocabulary, offsets, ids = split_ingredient_ids(get_ingredient_lists(prep_output))
+    labels = find_duplicate_clusters(minhash_signatures(offsets, ids, len(vocabulary)),
+                                     valid_mask=np.diff(offsets) >= MIN_FORMULA_INGREDIENTS)
+    priced = labels[(labels >= 0) & prep_output['Price'].notna().to_numpy()]
+    assert (np.bincount(priced) >= 2).any()
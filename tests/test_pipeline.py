@@ -0,0 +1,40 @@
+import os
+
+import pandas as pd
+
+from pipeline import run_row_stage, get_row_keys, get_row_hashes
+from product_data_prep import prepare_products, add_loves_bins
+
+# Row input of the products stage, as written by the matching stage
+MATCHED_PATH = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))),
+                            'data', 'processed', 'final_merged_products_updated.csv')
+
+
+def make_stage(rows_path, output_path):
+    return {'name': 'products', 'rows': rows_path, 'outputs': [output_path],
+            'transform': lambda df: prepare_products(df, verbose=False), 'finalize': add_loves_bins}
+
+
+def test_inserted_product_only_reprocesses_itself(tmp_path, capsys):
+    df = pd.read_csv(MATCHED_PATH, low_memory=False)
+    rows_path, output_path = str(tmp_path / 'rows.csv'), str(tmp_path / 'out.csv')
+    df.to_csv(rows_path, index=False)
+    row_keys, row_hashes = run_row_stage(make_stage(rows_path, output_path), None)
+    row_state = pd.DataFrame({'row_key': row_keys, 'row_hash': row_hashes})
+
+    new_row = df.iloc[[10]].assign(match_key='new_brand_new_product', Name='New Product')
+    pd.concat([df.iloc[:500], new_row, df.iloc[500:]]).to_csv(rows_path, index=False)
+    capsys.readouterr()
+    run_row_stage(make_stage(rows_path, output_path), row_state)
+    assert '1 of 1473 rows new or changed' in capsys.readouterr().out
+    incremental = pd.read_csv(output_path, low_memory=False)
+
+    run_row_stage(make_stage(rows_path, output_path), None, force=True)
+    pd.testing.assert_frame_equal(incremental, pd.read_csv(output_path, low_memory=False))
+
+
+def test_row_hashes_ignore_row_labels():
+    df = pd.read_csv(MATCHED_PATH, low_memory=False, nrows=50)
+    shifted = df.set_axis(df.index + 1)
+    assert (get_row_hashes(df) == get_row_hashes(shifted)).all()
+    assert (get_row_keys(df) == get_row_keys(shifted)).all()
@@ -0,0 +1,43 @@
+from concurrent.futures import ProcessPoolExecutor
+
+import pandas as pd
+import pytest
+
+import product_data_inspect
+from product_data_inspect import standardize_column, standardize_name, standardize_brand_name, find_potential_matches
+
+BASE = pd.DataFrame({
+    'Name': ['Hydrating Face Cream', 'Gentle Foaming Cleanser', 'Vitamin C Serum 15%', 'Retinol Night Oil',
+             'Daily Moisturizer SPF 30', 'Clay Detox Mask', 'Eye Repair Gel', 'Rose Toner'],
+    'Brand': ['CLINIQUE', 'Fresh', 'Drunk Elephant', 'SUNDAY RILEY', 'Kiehl\'s', 'GLAMGLOW', 'Origins', 'Fresh'],
+})
+SEPHORA = pd.DataFrame({
+    'name': ['Hydrating Face Creme', 'Gentle Foam Cleanser', 'C-Firma Vitamin C Serum', 'Retinol Night Oils',
+             'Daily Moisturiser SPF30', 'Clay Detox Masque', 'Eye Repair Gel', 'Rose Facial Toner', 'Lip Balm'],
+    'brand': ['Clinique', 'fresh', 'Drunk Elephant', 'Sunday Riley', 'Kiehls Since 1851', 'GlamGlow', 'Origins',
+              'Fresh', 'Laneige'],
+})
+
+
+def match_csv(executor):
+    df_base, df_sephora = BASE.copy(), SEPHORA.copy()
+    df_base['product_name_std'] = standardize_column(df_base['Name'], standardize_name, executor)
+    df_base['brand_name_std'] = standardize_column(standardize_column(df_base['Brand'], standardize_brand_name, executor), standardize_name, executor)
+    df_base['match_key'] = df_base['brand_name_std'] + "_" + df_base['product_name_std']
+    df_sephora['product_name_std'] = standardize_column(df_sephora['name'], standardize_name, executor)
+    df_sephora['brand_name_std'] = standardize_column(standardize_column(df_sephora['brand'], standardize_brand_name, executor), standardize_name, executor)
+    df_sephora['match_key'] = df_sephora['brand_name_std'] + "_" + df_sephora['product_name_std']
+    potential_matches, _, _ = find_potential_matches(df_base, df_sephora, 0.8, 0.85, executor)
+    return potential_matches.to_csv(index=False).encode('utf-8')
+
+
+@pytest.mark.parametrize('max_exhaustive_pairs', [2**24, 0], ids=['exhaustive', 'lsh'])
+def test_workers_produce_identical_matches(monkeypatch, max_exhaustive_pairs):
+    monkeypatch.setattr(product_data_inspect, 'MAX_EXHAUSTIVE_PAIRS', max_exhaustive_pairs)
+    monkeypatch.setattr(product_data_inspect, 'STANDARDIZE_CHUNK_SIZE', 3)
+    monkeypatch.setattr(product_data_inspect, 'SCORE_CHUNK_PAIRS', 5)
+    single = match_csv(None)
+    with ProcessPoolExecutor(max_workers=2) as executor:
+        pooled = match_csv(executor)
+    assert pooled == single
+    assert single.count(b'\n') > 1
@@ -0,0 +1,15 @@
+import numpy as np
+
+from catalog_store import get_ingredient_lists, split_ingredient_ids
+from similarity import build_ingredient_vectors, top_k_similar, build_neighbor_table
+
+
+def test_neighbor_table_matches_top_k_similar(prep_output):
+    vocabulary, offsets, ids = split_ingredient_ids(get_ingredient_lists(prep_output))
+    vectors = build_ingredient_vectors(offsets, ids, len(vocabulary))
+    # A small batch bound so the table is built across many batches
+    neighbor_ids, neighbor_scores = build_neighbor_table(vectors, 5, max_batch_cells=5000)
+    for row_pos in range(vectors.shape[0]):
+        rows, scores = top_k_similar(vectors, row_pos, 5)
+        assert np.array_equal(neighbor_ids[row_pos][neighbor_ids[row_pos] >= 0], rows)
+        assert np.array_equal(neighbor_scores[row_pos][:len(rows)], scores)
@@ -0,0 +1,19 @@
+"""
+Production entry point for serving the dashboard with a multi-worker WSGI server.
+
+    gunicorn -c gunicorn.conf.py wsgi:server
+
+Importing this module loads the catalog and runs the warm-up, so a worker only starts
+accepting requests once its first-request costs are paid. With preload_app (the default
+in gunicorn.conf.py), this happens once in the master and the forked workers share the
+loaded data copy-on-write. Because warm-up completes before any worker accepts a request,
+/_ready answers 200 from every worker; it tells a load balancer the server is up and
+warmed, not that an individual worker finished a warm-up of its own.
+"""
+from Skincare_Product_Analyzer import app, warm_up
+
+timings = warm_up()
+print(f"Warm-up finished in {sum(timings.values()):.2f}s "
+      f"(slowest: {max(timings, key=timings.get)}, {max(timings.values()):.2f}s)")
+
+server = app.server